@@ -0,0 +1,39 @@
+"""
+Gemeinsamer JSON-Shim: orjson wenn installiert, sonst stdlib json.
+
+Ein Vertrag für alle Module:
+- loads(data) nimmt bytes oder str (UTF-8) und liefert Python-Objekte.
+- dumps(obj, default=None) liefert kompakte UTF-8-Bytes, Nicht-ASCII bleibt erhalten,
+  Nicht-String-Keys (int, float, bool, None) werden wie bei json.dumps zu Strings.
+- dumps_str(obj) wie dumps, aber als str.
+orjson.JSONDecodeError erbt von json.JSONDecodeError — bestehende except-Zweige greifen weiter.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable
+
+try:
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - optional dependency
+    _orjson = None
+
+JSONDecodeError = json.JSONDecodeError
+
+
+if _orjson is not None:
+    _OPTIONS = _orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any, default: Callable[[Any], Any] | None = None) -> bytes:
+        return _orjson.dumps(obj, default=default, option=_OPTIONS)
+
+    loads = _orjson.loads
+else:  # pragma: no cover - optional dependency
+    def dumps(obj: Any, default: Callable[[Any], Any] | None = None) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default).encode("utf-8")
+
+    loads = json.loads
+
+
+def dumps_str(obj: Any, default: Callable[[Any], Any] | None = None) -> str:
+    return dumps(obj, default=default).decode("utf-8")
@@ -25,14 +25,22 @@ _failed_attempts: dict[str, list[float]] = {}  # key → list of timestamps
 
 _auth_file_lock = threading.Lock()  # Schützt Read-Modify-Write auf JSON-Dateien
 
+# RAM-Cache der autorisierten Nutzer: Pfad -> ((mtime_ns, size, inode), {(platform, user_id)}).
+# is_authorized läuft bei jeder Chat-Nachricht — statt JSON lesen+parsen nur ein stat();
+# jede Änderung der Datei (add_authorized via os.replace, Handarbeit) ändert den Stempel → Neuladen.
+_authorized_cache: dict[str, tuple[tuple[int, int, int], frozenset[tuple[str, str]]]] = {}
+# Bereits angelegte Auth-Verzeichnisse (resolve + mkdir nur einmal pro config_dir)
+_auth_dir_cache: dict[str, Path] = {}
+
 
 def _auth_dir(config_dir: str | None = None) -> Path:
     """Auth-Verzeichnis: config_dir/auth wenn angegeben (gleiche Config wie die App), sonst get_config_dir()/auth."""
-    if config_dir and str(config_dir).strip():
-        d = Path(config_dir).expanduser().resolve() / "auth"
-    else:
-        d = Path(get_config_dir()).expanduser().resolve() / "auth"
-    d.mkdir(parents=True, exist_ok=True)
+    base = str(config_dir).strip() if config_dir and str(config_dir).strip() else get_config_dir()
+    d = _auth_dir_cache.get(base)
+    if d is None:
+        d = Path(base).expanduser().resolve() / "auth"
+        d.mkdir(parents=True, exist_ok=True)
+        _auth_dir_cache[base] = d
     return d
 
 
@@ -200,18 +208,33 @@ def add_authorized(platform: str, user_id: str, config_dir: str | None = None) -
         _save_json(path, data)
 
 
-def is_authorized(platform: str, user_id: str, config_dir: str | None = None) -> bool:
-    """Prüft, ob der Nutzer autorisiert ist."""
+def _authorized_set(config_dir: str | None = None) -> frozenset[tuple[str, str]]:
+    """Autorisierte (platform, user_id)-Paare; aus RAM solange authorized.json unverändert ist."""
     path = _authorized_path(config_dir)
+    try:
+        st = path.stat()
+    except OSError:
+        return frozenset()
+    key = str(path)
+    stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+    cached = _authorized_cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
     data = _load_json(path, [])
-    if not isinstance(data, list):
-        return False
+    entries = frozenset(
+        (e.get("platform"), e.get("user_id"))
+        for e in (data if isinstance(data, list) else [])
+        if isinstance(e, dict)
+    )
+    _authorized_cache[key] = (stamp, entries)
+    return entries
+
+
+def is_authorized(platform: str, user_id: str, config_dir: str | None = None) -> bool:
+    """Prüft, ob der Nutzer autorisiert ist."""
     plat = (platform or "").strip().lower()
     uid = (user_id or "").strip()
-    for entry in data:
-        if isinstance(entry, dict) and entry.get("platform") == plat and entry.get("user_id") == uid:
-            return True
-    return False
+    return (plat, uid) in _authorized_set(config_dir)
 
 
 def list_authorized(platform: str | None = None, config_dir: str | None = None) -> list[dict[str, str]]:
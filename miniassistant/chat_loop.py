@@ -36,7 +36,7 @@ from miniassistant.ollama_client import (
     model_supports_vision,
     resolve_model,
 )
-from miniassistant.tools import run_exec, web_search as tool_web_search, web_search_multi as tool_web_search_multi, check_url as tool_check_url, read_url as tool_read_url
+from miniassistant.tools import run_exec, web_search as tool_web_search, web_search_multi as tool_web_search_multi, check_url as tool_check_url, read_url as tool_read_url, read_urls as tool_read_urls
 from miniassistant.memory import append_exchange
 import miniassistant.agent_actions_log as _aal
 import miniassistant.context_log as _ctx_log
@@ -1067,7 +1067,7 @@ def _dispatch_chat(
     provider_type = get_provider_type(config, model_name)
     base_url = get_base_url_for_model(config, model_name)
     api_key = get_api_key_for_model(config, model_name)
-    _, api_model = get_provider_config(config, model_name)
+    _prov_cfg, api_model = get_provider_config(config, model_name)
     api_model = api_model or model_name
 
     if provider_type == "google":
@@ -1089,7 +1089,8 @@ def _dispatch_chat(
             messages, api_key=api_key, model=api_model,
             system=system, thinking=think, tools=tools,
             options=options, base_url=base_url or _default_urls.get(provider_type, "http://127.0.0.1:8000"),
-            timeout=int(timeout), extra_body=_extra,
+            timeout=int(timeout), extra_body=_extra, http2=bool(_prov_cfg.get("http2")),
+            gzip_requests=bool(_prov_cfg.get("gzip_requests")),
         )
     if provider_type == "anthropic":
         from miniassistant.claude_client import api_chat as anthropic_chat
@@ -1120,6 +1121,7 @@ def _dispatch_chat(
         base_url, messages, model=api_model,
         system=system, think=think, tools=tools,
         options=options or None, api_key=api_key, timeout=timeout,
+        http2=bool(_prov_cfg.get("http2")),
     )
 
 
@@ -1138,7 +1140,7 @@ def _dispatch_chat_stream(
     provider_type = get_provider_type(config, model_name)
     base_url = get_base_url_for_model(config, model_name)
     api_key = get_api_key_for_model(config, model_name)
-    _, api_model = get_provider_config(config, model_name)
+    _prov_cfg, api_model = get_provider_config(config, model_name)
     api_model = api_model or model_name
 
     if provider_type == "google":
@@ -1157,7 +1159,8 @@ def _dispatch_chat_stream(
             messages, api_key=api_key, model=api_model,
             system=system, thinking=think, tools=tools,
             options=options, base_url=base_url or _default_urls.get(provider_type, "http://127.0.0.1:8000"),
-            extra_body=_extra,
+            extra_body=_extra, http2=bool(_prov_cfg.get("http2")),
+            gzip_requests=bool(_prov_cfg.get("gzip_requests")),
         )
         return
     if provider_type == "anthropic":
@@ -1186,6 +1189,7 @@ def _dispatch_chat_stream(
         base_url, messages, model=api_model,
         system=system, think=think, tools=tools,
         options=options or None, api_key=api_key, timeout=timeout,
+        http2=bool(_prov_cfg.get("http2")),
     )
 
 
@@ -1257,10 +1261,13 @@ def _build_no_api_tools_prompt(tools_schema: list[dict[str, Any]]) -> str:
     return "\n".join(lines)
 
 
-def _ollama_available_models(config: dict[str, Any], provider_name: str | None = None) -> tuple[list[str], str]:
+def _ollama_available_models(
+    config: dict[str, Any], provider_name: str | None = None, *, force_refresh: bool = False,
+) -> tuple[list[str], str]:
     """Liefert (Liste der verfügbaren Modellnamen, Fehlermeldung oder '').
     Unterstützt Ollama, Google, OpenAI, Anthropic und Claude-Code Provider.
-    provider_name: wenn gesetzt, nur Modelle dieses Providers (case-insensitive). Sonst default provider."""
+    provider_name: wenn gesetzt, nur Modelle dieses Providers (case-insensitive). Sonst default provider.
+    force_refresh: gecachte Modell-Liste (OpenAI-kompatibel) ignorieren."""
     from miniassistant.ollama_client import _find_provider
     providers = config.get("providers") or {}
     if provider_name:
@@ -1286,7 +1293,10 @@ def _ollama_available_models(config: dict[str, Any], provider_name: str | None =
         try:
             from miniassistant.openai_client import api_list_models as openai_list
             _default_urls = {"deepseek": "https://api.deepseek.com", "openai": "https://api.openai.com"}
-            raw = openai_list(api_key or "", base_url=prov.get("base_url") or _default_urls.get(prov_type, "http://127.0.0.1:8000"))
+            raw = openai_list(
+                api_key or "", base_url=prov.get("base_url") or _default_urls.get(prov_type, "http://127.0.0.1:8000"),
+                http2=bool(prov.get("http2")), force_refresh=force_refresh,
+            )
             names = [m.get("name", "") for m in raw if m.get("name")]
             return (names, "")
         except Exception as e:
@@ -5544,6 +5554,16 @@ def _run_subagent_with_tools(
             if nudge_tc:
                 _log.info("Subagent %s nudge: %d Tool-Call(s) — führe aus", resolved_name, len(nudge_tc))
                 msgs.append(nudge_msg)
+                # read_url-Calls der Nudge-Runde vorab parallel holen (Ergebnisse in Call-Reihenfolge)
+                _nudge_ru_calls: list[dict[str, Any]] = []
+                for tc_name, tc_args in nudge_tc:
+                    if tc_name == "read_url" and tc_name in _ALLOWED_SUB_TOOLS:
+                        try:
+                            _ru_mc = int(tc_args.get("max_chars")) if tc_args.get("max_chars") is not None else 8000
+                        except (TypeError, ValueError):
+                            _ru_mc = 8000
+                        _nudge_ru_calls.append({"url": tc_args.get("url", ""), "max_chars": _ru_mc, "proxy": tc_args.get("proxy"), "js": bool(tc_args.get("js", False))})
+                _nudge_ru = iter(tool_read_urls(_nudge_ru_calls, config=config, concurrency=_SUBAGENT_FETCH_WORKERS) if _nudge_ru_calls else [])
                 for tc_name, tc_args in nudge_tc:
                     if tc_name in _ALLOWED_SUB_TOOLS:
                         if tc_name == "exec":
@@ -5556,11 +5576,7 @@ def _run_subagent_with_tools(
                                 consecutive_fails=_consecutive_search_fails, max_fails=_MAX_SEARCH_FAILS,
                             )
                         elif tc_name == "read_url":
-                            try:
-                                _ru_mc = int(tc_args.get("max_chars")) if tc_args.get("max_chars") is not None else 8000
-                            except (TypeError, ValueError):
-                                _ru_mc = 8000
-                            _ru_r = tool_read_url(tc_args.get("url", ""), max_chars=_ru_mc, config=config, proxy=tc_args.get("proxy"), js=bool(tc_args.get("js", False)))
+                            _ru_r = next(_nudge_ru)
                             tool_result = _ru_r.get("content", "") if _ru_r.get("ok") else f"Error: {_ru_r.get('error', 'unknown')}"
                         elif tc_name == "check_url":
                             _cu_r = tool_check_url(tc_args.get("url", ""))
@@ -7852,6 +7868,9 @@ def _handle_group_model_command(
     from miniassistant.ollama_client import _split_provider_prefix
     prov_prefix, _clean = _split_provider_prefix(resolved)
     available, err_msg = _ollama_available_models(config, provider_name=prov_prefix)
+    if not err_msg and api_name not in available:
+        # Liste evtl. gecacht → vor dem Abbruch einmal frisch abfragen (gerade geladenes Modell)
+        available, err_msg = _ollama_available_models(config, provider_name=prov_prefix, force_refresh=True)
     if err_msg:
         return f"Modellwechsel abgebrochen: {err_msg}.", session, None, None, None, None
     if api_name not in available:
@@ -7962,6 +7981,8 @@ def handle_user_input(
         from miniassistant.ollama_client import _split_provider_prefix
         prov_prefix, _ = _split_provider_prefix(resolved)
         available, err_msg = _ollama_available_models(config, provider_name=prov_prefix)
+        if not err_msg and api_name not in available:
+            available, err_msg = _ollama_available_models(config, provider_name=prov_prefix, force_refresh=True)
         if err_msg:
             return f"Modellwechsel abgebrochen: {err_msg}. Bitte Ollama starten oder base_url prüfen.", session, None, None, None, None
         if api_name not in available:
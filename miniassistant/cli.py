@@ -182,10 +182,13 @@ def config_cmd(ctx: click.Context) -> None:
         models_cfg = prov["models"]
         models_cfg["aliases"] = models_cfg.get("aliases") or {}
         model_names: list[str] = []
+        reasoning_names: set[str] = set()
         try:
-            from miniassistant.ollama_client import list_models, model_supports_thinking
-            raw = list_models(base_url)
+            from miniassistant.ollama_client import list_models_with_caps
+            # Caps aller Modelle parallel abfragen statt pro Modell nacheinander (/api/show)
+            raw = list_models_with_caps(base_url)
             model_names = [m.get("name") or m.get("model") or "" for m in raw if (m.get("name") or m.get("model"))]
+            reasoning_names = {m.get("name") or m.get("model") for m in raw if (m.get("caps") or {}).get("thinking")}
         except Exception as e:
             console.print(f"[yellow]Ollama-Modelle konnten nicht geladen werden:[/yellow] {e}")
         if model_names:
@@ -194,11 +197,7 @@ def config_cmd(ctx: click.Context) -> None:
                 import questionary
                 choices = []
                 for name in model_names:
-                    try:
-                        is_reasoning = model_supports_thinking(base_url, name)
-                    except Exception:
-                        is_reasoning = False
-                    label = f"{name} (Reasoning)" if is_reasoning else name
+                    label = f"{name} (Reasoning)" if name in reasoning_names else name
                     choices.append(label)
                 # Multi-Select: Leerzeichen = an/ab, Enter = bestätigen; erstes gewähltes = Standard
                 current_default = (models_cfg.get("default") or "").strip()
@@ -309,16 +308,10 @@ def config_cmd(ctx: click.Context) -> None:
             config["search_engines"] = {}
             config["default_search_engine"] = None
 
+        from miniassistant.ollama_client import _coerce_model_list
+
         # Vision-Modelle (optional, mehrere mit Komma)
-        current_vision_list = config.get("vision") or []
-        if isinstance(current_vision_list, list):
-            current_vision_str = ", ".join(current_vision_list)
-        elif isinstance(current_vision_list, dict):
-            current_vision_str = (current_vision_list.get("model") or "")
-        elif isinstance(current_vision_list, str):
-            current_vision_str = current_vision_list
-        else:
-            current_vision_str = ""
+        current_vision_str = ", ".join(_coerce_model_list(config.get("vision")))
         vision_input = _prompt_text(
             "Vision-Modelle (Komma-getrennt, z.B. google/gemini-2.5-flash, openai/gpt-4o, llava:13b – leer = keins)",
             default=current_vision_str, use_questionary=_use_q,
@@ -330,15 +323,7 @@ def config_cmd(ctx: click.Context) -> None:
             config.pop("vision", None)
 
         # Image-Generation-Modelle (optional, mehrere mit Komma)
-        current_img_list = config.get("image_generation") or []
-        if isinstance(current_img_list, list):
-            current_img_str = ", ".join(current_img_list)
-        elif isinstance(current_img_list, dict):
-            current_img_str = (current_img_list.get("model") or "")
-        elif isinstance(current_img_list, str):
-            current_img_str = current_img_list
-        else:
-            current_img_str = ""
+        current_img_str = ", ".join(_coerce_model_list(config.get("image_generation")))
         img_input = _prompt_text(
             "Bildgenerierungs-Modelle (Komma-getrennt, z.B. google/gemini-2.0-flash-exp, openai/dall-e-3 – leer = keins)",
             default=current_img_str, use_questionary=_use_q,
@@ -757,7 +742,8 @@ def _fetch_models_for_provider(prov_name: str, prov_cfg: dict, timeout: int = 5)
             raise RuntimeError("api_key fehlt")
         _default_urls = {"deepseek": "https://api.deepseek.com", "openai": "https://api.openai.com"}
         base_url = prov_cfg.get("base_url") or _default_urls.get(prov_type, "http://127.0.0.1:8000")
-        models = openai_list(api_key, base_url=base_url)
+        # Explizite Modell-Auswahl/Liste → immer frisch (lokale vLLM/llama.cpp laden Modelle zur Laufzeit)
+        models = openai_list(api_key, base_url=base_url, force_refresh=True)
         return [m.get("name", "") for m in models if m.get("name")]
     elif prov_type == "anthropic":
         from miniassistant.claude_client import api_list_models, ANTHROPIC_API_URL, _api_headers
@@ -281,6 +281,7 @@ def load_config(project_dir: str | None = None) -> dict[str, Any]:
 
         if not path.exists():
             result = _default_config()
+            _warm_alias_index(result)
             _config_cache = result
             _config_cache_path = path_str
             _config_cache_mtime = 0.0
@@ -317,6 +318,7 @@ def load_config(project_dir: str | None = None) -> dict[str, Any]:
             if _dir_val:
                 Path(_dir_val).expanduser().mkdir(parents=True, exist_ok=True)
 
+        _warm_alias_index(merged)
         _config_cache = merged
         _config_cache_path = path_str
         _config_cache_mtime = current_mtime
@@ -324,6 +326,13 @@ def load_config(project_dir: str | None = None) -> dict[str, Any]:
         return dict(merged)
 
 
+def _warm_alias_index(config: dict[str, Any]) -> None:
+    """Provider/Alias-Tabelle einmal pro Laden bauen; die Shallow-Copies aus load_config teilen sie
+    (Cache in ollama_client, nicht im Config-dict — das muss JSON-serialisierbar bleiben)."""
+    from miniassistant.ollama_client import get_alias_index
+    get_alias_index(config)
+
+
 def invalidate_config_cache() -> None:
     """Cache sofort invalidieren (nach Config-Speicherung)."""
     global _config_cache, _config_cache_time
@@ -571,6 +580,8 @@ def _parse_provider(raw: dict[str, Any]) -> dict[str, Any]:
         "num_ctx": raw.get("num_ctx"),
         "think": raw.get("think"),
         "no_api_tools": bool(raw.get("no_api_tools", False)),
+        "http2": bool(raw.get("http2", False)),
+        "gzip_requests": bool(raw.get("gzip_requests", False)),
         "options": options,
         "model_options": model_options,
         "models": models,
@@ -766,6 +777,9 @@ def save_config(config: dict[str, Any], project_dir: str | None = None) -> Path:
     path = path.resolve()
     path.parent.mkdir(parents=True, exist_ok=True)
     backup_config(path)
+    # Provider wurden evtl. in-place geändert → vorberechnete Alias-Tabelle verwerfen (wird bei Bedarf neu gebaut)
+    from miniassistant.ollama_client import forget_alias_index
+    forget_alias_index(config.get("providers"))
     # Alle Provider speichern (ollama, ollama2, ...)
     all_providers = config.get("providers") or {}
     models_cfg = config.get("models") or {}
@@ -787,6 +801,10 @@ def save_config(config: dict[str, Any], project_dir: str | None = None) -> Path:
             out_prov["think"] = prov_cfg["think"]
         if prov_cfg.get("no_api_tools"):
             out_prov["no_api_tools"] = prov_cfg["no_api_tools"]
+        if prov_cfg.get("http2"):
+            out_prov["http2"] = prov_cfg["http2"]
+        if prov_cfg.get("gzip_requests"):
+            out_prov["gzip_requests"] = prov_cfg["gzip_requests"]
         if prov_cfg.get("permission_mode"):
             out_prov["permission_mode"] = prov_cfg["permission_mode"]
         if prov_cfg.get("allowed_tools"):
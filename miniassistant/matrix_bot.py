@@ -5,13 +5,101 @@ oder (wenn autorisiert) KI-Antwort. Verschlüsselte Räume optional (encrypted_r
 from __future__ import annotations
 
 import asyncio
+import binascii
 import logging
+import random
+import re
+import struct
+import time
 import uuid
+from collections import deque
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# Zeichen, ab denen mistune überhaupt etwas rendern kann. Fehlen alle → Plaintext reicht,
+# kein Parser-Lauf (die meisten Status-/Fehlermeldungen des Bots sind reiner Text).
+_MARKDOWN_CHARS = "*_`#[>|~<\n"
+
+# Magic-Bytes gültiger Bild-Header (JPEG/BMP: 2 Bytes, PNG/GIF/WebP: 4 Bytes)
+_VALID_IMG_HEADERS_2 = frozenset({b'\xff\xd8', b'BM'})
+_VALID_IMG_HEADERS_4 = frozenset({b'\x89PNG', b'GIF8', b'RIFF'})
+
+# SOF-Segment ab Länge: (seg_len, precision, height, width, n_components)
+_JPEG_SOF = struct.Struct(">HBHHB")
+_JPEG_SEG_LEN = struct.Struct(">H")
+
+# Typing-Indikator: Server-Timeout 30s, Refresh kurz davor — halbiert die PUTs gegenüber 15s-Takt
+_TYPING_TIMEOUT_MS = 30000
+_TYPING_REFRESH_S = 25
+
+# keys_claim: max. Devices pro Request (wie hydrogen-web / matrix-rust-sdk). Synapse arbeitet /keys/claim
+# pro Device ab — große Claims in Häppchen parallel statt ein langer Request.
+_KEYS_CLAIM_CHUNK = 250
+
+# Raum-Beitritt: Backoff bei vorübergehenden Fehlern (Start, Obergrenze in Sekunden)
+_JOIN_BACKOFF_START = 5.0
+_JOIN_BACKOFF_MAX = 300.0
+# Max. gleichzeitige Raum-Beitritte pro Sync-Tick
+_JOIN_CONCURRENCY = 4
+# Fehler-Text, ab dem wir die Einladung als "nicht beitretbar" ablehnen
+_UNRECOVERABLE_JOIN_RE = re.compile(r"no servers|M_UNKNOWN|M_FORBIDDEN|M_NOT_FOUND")
+
+
+def _chunk_key_claims(users: dict[str, Any], size: int = _KEYS_CLAIM_CHUNK) -> list[dict[str, list[str]]]:
+    """Teilt {user_id: devices} in Teil-Dicts mit je max. size Devices (Form bleibt erhalten)."""
+    chunks: list[dict[str, list[str]]] = []
+    cur: dict[str, list[str]] = {}
+    n = 0
+    for uid, devices in users.items():
+        for dev in devices:
+            if n >= size:
+                chunks.append(cur)
+                cur, n = {}, 0
+            cur.setdefault(uid, []).append(dev)
+            n += 1
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+
+def _jpeg_dims(data: bytes) -> tuple[int, int] | None:
+    """(Breite, Höhe) eines JPEG aus dem SOF0/SOF2-Marker, None wenn nicht gefunden oder Daten abgeschnitten/kaputt.
+    Schnellpfad: SOF per bytes.find suchen und Segment plausibilisieren. Ein Treffer in DQT/DHT-Tabellen
+    oder im EXIF-Thumbnail (eingebettetes SOI davor) wird verworfen → Fallback auf Marker-Walk."""
+    n = len(data)
+    cands = [i for i in (data.find(b'\xff\xc0', 2), data.find(b'\xff\xc2', 2)) if i >= 0]
+    if cands:
+        pos = min(cands)
+        thumb = data.find(b'\xff\xd8', 2)
+        if (thumb < 0 or thumb > pos) and n >= pos + 2 + _JPEG_SOF.size:
+            seg_len, precision, h, w, ncomp = _JPEG_SOF.unpack_from(data, pos + 2)
+            if precision in (8, 12) and ncomp in (1, 3, 4) and seg_len == 8 + 3 * ncomp and w and h:
+                return w, h
+    # Marker-Walk: jede Länge vor dem Lesen gegen das Pufferende prüfen
+    off = 2
+    while off + 2 + _JPEG_SEG_LEN.size <= n:
+        if data[off] != 0xFF:
+            return None
+        marker = data[off + 1]
+        if marker == 0xFF:  # Füllbyte vor dem eigentlichen Marker
+            off += 1
+            continue
+        if marker in (0xC0, 0xC2):
+            if off + 2 + _JPEG_SOF.size > n:
+                return None
+            _, _, h, w, _ = _JPEG_SOF.unpack_from(data, off + 2)
+            return (w, h) if w and h else None
+        if marker in (0xD9, 0xDA):  # EOI/SOS vor einem SOF → kein Frame-Header
+            return None
+        seg_len = _JPEG_SEG_LEN.unpack_from(data, off + 2)[0]
+        if seg_len < 2:
+            return None
+        off += 2 + seg_len
+    return None
+
 
 def markdown_to_matrix_html(text: str) -> str | None:
     """Konvertiert Markdown zu HTML für Matrix (org.matrix.custom.html). Bei fehlendem mistune: None."""
@@ -25,12 +113,18 @@ def markdown_to_matrix_html(text: str) -> str | None:
         return None
 
 
-# Globale Referenzen fuer Notify-Integration (Scheduler -> Bot-Client mit E2EE)
-_bot_client: Any = None
-_bot_loop: Any = None
-_bot_send_fn: Any = None  # async fn(client, room_id, body)
-_bot_send_image_fn: Any = None  # async fn(client, room_id, image_path, caption)
-_bot_send_audio_fn: Any = None  # async fn(client, room_id, wav_bytes)
+@dataclass(slots=True)
+class _BotHandle:
+    """Laufender Bot: Client, Event-Loop und Sende-Coroutinen — werden immer zusammen gesetzt."""
+    client: Any
+    loop: asyncio.AbstractEventLoop
+    send_fn: Any  # async fn(client, room_id, body)
+    send_image_fn: Any  # async fn(client, room_id, image_path, caption)
+    send_audio_fn: Any  # async fn(client, room_id, wav_bytes)
+
+
+# Globale Referenz fuer Notify-Integration (Scheduler -> Bot-Client mit E2EE). None = Bot läuft nicht.
+_BOT: _BotHandle | None = None
 
 # Cache: room_id -> inviter user_id. None means "looked up, no inviter found".
 _inviter_cache: dict[str, str | None] = {}
@@ -179,9 +273,10 @@ def get_inviter_cache() -> dict[str, str | None]:
 def list_joined_rooms() -> list[dict[str, Any]]:
     """List currently joined Matrix rooms with display name + member count + auth info for non-bot users.
     Returns [] if bot is not running. Safe to call from any thread."""
-    cl = _bot_client
-    if not cl:
+    h = _BOT
+    if h is None:
         return []
+    cl = h.client
     try:
         from miniassistant.chat_auth import is_authorized
     except Exception:
@@ -241,9 +336,10 @@ def list_joined_rooms() -> list[dict[str, Any]]:
 
 def leave_room(room_id: str) -> tuple[bool, str]:
     """Bot leaves a Matrix room + forgets it (no longer in joined-list). Thread-safe."""
-    if not _bot_client or not _bot_loop:
+    h = _BOT
+    if h is None:
         return False, "Matrix-Bot läuft nicht"
-    cl = _bot_client
+    cl = h.client
 
     async def _do_leave() -> tuple[bool, str]:
         try:
@@ -278,7 +374,7 @@ def leave_room(room_id: str) -> tuple[bool, str]:
         return True, "ok"
 
     try:
-        future = asyncio.run_coroutine_threadsafe(_do_leave(), _bot_loop)
+        future = asyncio.run_coroutine_threadsafe(_do_leave(), h.loop)
         return future.result(timeout=30)
     except Exception as e:
         return False, str(e)
@@ -287,10 +383,10 @@ def leave_room(room_id: str) -> tuple[bool, str]:
 def _download_mxc_bytes_sync(mxc_url: str) -> tuple[bytes, str] | None:
     """Modul-Level mxc-Download (für Profile-Avatare etc.). Returns (bytes, content_type) oder None.
     Keine E2EE-Decryption — Avatare sind immer plain."""
-    cl = _bot_client
-    loop = _bot_loop
-    if not cl or not loop or not mxc_url:
+    h = _BOT
+    if h is None or not mxc_url:
         return None
+    cl, loop = h.client, h.loop
 
     async def _do() -> tuple[bytes, str] | None:
         try:
@@ -328,10 +424,10 @@ def get_user_profile(user_id: str, save_dir: str, room_id: str | None = None) ->
     Returns {display_name, avatar_path (host-Pfad), avatar_url (mxc://)}.
     room_id: wenn gesetzt, wird user_id gegen die Mitgliederliste des Raums geprüft —
     Profile von Nicht-Mitgliedern werden NICHT aufgelöst (kein globaler Lookup im Group-Mode)."""
-    cl = _bot_client
-    loop = _bot_loop
-    if not cl or not loop:
+    h = _BOT
+    if h is None:
         return {"display_name": "", "avatar_path": "", "avatar_url": "", "error": "matrix bot not running"}
+    cl, loop = h.client, h.loop
     if not user_id or not user_id.startswith("@"):
         return {"display_name": "", "avatar_path": "", "avatar_url": "", "error": "invalid matrix user_id (expected @user:server)"}
     # Membership-Gate: nur Profile von Nutzern IN diesem Raum auflösen.
@@ -391,10 +487,10 @@ def fetch_recent_messages(room_id: str, limit: int = 20, skip_event_id: str | No
     Messages: älteste→neueste. Jede: {sender, display, body, ts (epoch ms), event_id}.
     Thread-safe; bei Fehler/leerem Raum kommt aussagekräftige Diagnose im 'diagnostic' Feld.
     """
-    cl = _bot_client
-    loop = _bot_loop
-    if not cl or not loop:
+    h = _BOT
+    if h is None:
         return {"messages": [], "diagnostic": "matrix bot not running", "encrypted_count": 0, "total_scanned": 0, "room_encrypted": False}
+    cl, loop = h.client, h.loop
     if limit <= 0:
         return {"messages": [], "diagnostic": None, "encrypted_count": 0, "total_scanned": 0, "room_encrypted": False}
     limit = min(limit, 100)
@@ -507,10 +603,10 @@ def search_chat_history(
     Scrollt bis zu max_scan Events zurück, returnt Hits mit ±context_lines Kontext.
     Returns {hits: [{ts, sender, display, body, ev_id, is_hit}], scanned: int, encrypted_skipped: int, query: str}.
     """
-    cl = _bot_client
-    loop = _bot_loop
-    if not cl or not loop or not query:
+    h = _BOT
+    if h is None or not query:
         return {"hits": [], "scanned": 0, "encrypted_skipped": 0, "query": query, "diagnostic": "no client or empty query"}
+    cl, loop = h.client, h.loop
     max_scan = max(10, min(int(max_scan), 500))
     context_lines = max(0, min(int(context_lines), 5))
 
@@ -626,48 +722,82 @@ def search_chat_history(
         return {"hits": [], "scanned": 0, "encrypted_skipped": 0, "query": query, "diagnostic": f"exception: {e}"}
 
 
+def _find_room_for_user(cl: Any, target_user_id: str) -> str | None:
+    """Raum für einen User: erster Raum mit ihm als Mitglied, sonst erster mit offener Einladung.
+    Ein Durchlauf über client.rooms; Einladungs-Treffer werden nur als Fallback gemerkt."""
+    invited_rid: str | None = None
+    for rid, room in (getattr(cl, "rooms", {}) or {}).items():
+        if target_user_id in (getattr(room, "users", None) or ()):
+            return rid
+        if invited_rid is None and target_user_id in (getattr(room, "invited_users", None) or ()):
+            invited_rid = rid
+    return invited_rid
+
+
 def send_message_to_user(target_user_id: str, message: str) -> bool:
     """Thread-safe: Sendet eine Nachricht ueber den laufenden Bot-Client (mit E2EE).
     Wird von notify.py aufgerufen. Gibt True bei Erfolg zurueck."""
-    if not _bot_client or not _bot_loop or not _bot_send_fn:
+    h = _BOT
+    if h is None:
         return False
     import concurrent.futures
 
     async def _do_send() -> bool:
-        cl = _bot_client
-        # Raum finden: joined_rooms durchsuchen
-        rooms = getattr(cl, "rooms", {}) or {}
-        for rid, room in rooms.items():
-            members = getattr(room, "users", {}) or {}
-            if target_user_id in members:
-                await _bot_send_fn(cl, rid, message)
-                return True
-        # Fallback: invited_members pruefen
-        for rid, room in rooms.items():
-            invited = getattr(room, "invited_users", {}) or {}
-            if target_user_id in invited:
-                await _bot_send_fn(cl, rid, message)
-                return True
-        return False
+        rid = _find_room_for_user(h.client, target_user_id)
+        if rid is None:
+            return False
+        await h.send_fn(h.client, rid, message)
+        return True
 
     try:
-        future = asyncio.run_coroutine_threadsafe(_do_send(), _bot_loop)
+        future = asyncio.run_coroutine_threadsafe(_do_send(), h.loop)
         return future.result(timeout=60)
     except Exception as e:
         logger.warning("Matrix send_message_to_user fehlgeschlagen: %s", e)
         return False
 
 
+def send_message_to_users(target_user_ids: list[str], message: str) -> dict[str, bool]:
+    """Thread-safe: Wie send_message_to_user, aber für mehrere User in EINEM Aufruf —
+    die Sends laufen per asyncio.gather parallel im Bot-Loop (ein Thread-Wechsel statt einer pro User).
+    Gibt {user_id: Erfolg} zurück; ohne laufenden Bot alle False."""
+    h = _BOT
+    if h is None or not target_user_ids:
+        return {uid: False for uid in target_user_ids}
+
+    async def _send_one(uid: str) -> bool:
+        rid = _find_room_for_user(h.client, uid)
+        if rid is None:
+            return False
+        try:
+            await h.send_fn(h.client, rid, message)
+            return True
+        except Exception as e:
+            logger.warning("Matrix send_message_to_users -> %s fehlgeschlagen: %s", uid, e)
+            return False
+
+    async def _do_send() -> list[bool]:
+        return await asyncio.gather(*(_send_one(uid) for uid in target_user_ids))
+
+    try:
+        future = asyncio.run_coroutine_threadsafe(_do_send(), h.loop)
+        return dict(zip(target_user_ids, future.result(timeout=60)))
+    except Exception as e:
+        logger.warning("Matrix send_message_to_users fehlgeschlagen: %s", e)
+        return {uid: False for uid in target_user_ids}
+
+
 def send_message_to_room(room_id: str, message: str, keep_typing: bool = True) -> bool:
     """Thread-safe: Sendet eine Textnachricht in einen bestimmten Raum.
     keep_typing=True (default): Typing-Indikator nach dem Senden wiederherstellen (für status_update mid-processing).
     keep_typing=False: Typing-Indikator nach dem Senden ausschalten (für finale Nachrichten, z.B. Scheduler)."""
-    if not _bot_client or not _bot_loop or not _bot_send_fn:
+    h = _BOT
+    if h is None:
         return False
 
     async def _do_send() -> bool:
-        await _bot_send_fn(_bot_client, room_id, message)
-        room_typing = getattr(_bot_client, "room_typing", None)
+        await h.send_fn(h.client, room_id, message)
+        room_typing = getattr(h.client, "room_typing", None)
         if callable(room_typing):
             try:
                 await room_typing(room_id, keep_typing)
@@ -676,7 +806,7 @@ def send_message_to_room(room_id: str, message: str, keep_typing: bool = True) -
         return True
 
     try:
-        future = asyncio.run_coroutine_threadsafe(_do_send(), _bot_loop)
+        future = asyncio.run_coroutine_threadsafe(_do_send(), h.loop)
         return future.result(timeout=30)
     except Exception as e:
         logger.warning("Matrix send_message_to_room fehlgeschlagen: %s", e)
@@ -687,13 +817,14 @@ def send_image_to_room(room_id: str, image_path: str, caption: str = "") -> bool
     """Thread-safe: Sendet ein Bild in einen bestimmten Raum ueber den laufenden Bot-Client.
     Wird von chat_loop._run_tool (send_image) aufgerufen. Gibt True bei Erfolg zurueck.
     Stellt Typing-Indikator nach dem Senden wieder her."""
-    if not _bot_client or not _bot_loop or not _bot_send_image_fn:
+    h = _BOT
+    if h is None:
         return False
 
     async def _do_send() -> bool:
-        await _bot_send_image_fn(_bot_client, room_id, image_path, caption)
+        await h.send_image_fn(h.client, room_id, image_path, caption)
         # Typing-Indikator wiederherstellen (Senden löscht ihn serverseitig)
-        room_typing = getattr(_bot_client, "room_typing", None)
+        room_typing = getattr(h.client, "room_typing", None)
         if callable(room_typing):
             try:
                 await room_typing(room_id, True)
@@ -702,7 +833,7 @@ def send_image_to_room(room_id: str, image_path: str, caption: str = "") -> bool
         return True
 
     try:
-        future = asyncio.run_coroutine_threadsafe(_do_send(), _bot_loop)
+        future = asyncio.run_coroutine_threadsafe(_do_send(), h.loop)
         return future.result(timeout=120)
     except Exception as e:
         logger.warning("Matrix send_image_to_room fehlgeschlagen: %s", e)
@@ -712,17 +843,18 @@ def send_image_to_room(room_id: str, image_path: str, caption: str = "") -> bool
 def set_typing(room_id: str, typing: bool = True) -> bool:
     """Thread-safe: Setzt den Typing-Indikator in einem Matrix-Raum.
     Wird z.B. vom Debate-Tool aufgerufen, um zwischen Runden den Typing-Status zu halten."""
-    if not _bot_client or not _bot_loop:
+    h = _BOT
+    if h is None:
         return False
 
     async def _do_typing() -> bool:
-        room_typing = getattr(_bot_client, "room_typing", None)
+        room_typing = getattr(h.client, "room_typing", None)
         if callable(room_typing):
             await room_typing(room_id, typing)
         return True
 
     try:
-        future = asyncio.run_coroutine_threadsafe(_do_typing(), _bot_loop)
+        future = asyncio.run_coroutine_threadsafe(_do_typing(), h.loop)
         return future.result(timeout=10)
     except Exception:
         return False
@@ -730,43 +862,66 @@ def set_typing(room_id: str, typing: bool = True) -> bool:
 
 def send_image_to_user(target_user_id: str, image_path: str, caption: str = "") -> bool:
     """Thread-safe: Sendet ein Bild an einen User (sucht passenden Raum)."""
-    if not _bot_client or not _bot_loop or not _bot_send_image_fn:
+    h = _BOT
+    if h is None:
         return False
 
     async def _do_send() -> bool:
-        cl = _bot_client
-        rooms = getattr(cl, "rooms", {}) or {}
-        for rid, room in rooms.items():
-            members = getattr(room, "users", {}) or {}
-            if target_user_id in members:
-                await _bot_send_image_fn(cl, rid, image_path, caption)
-                return True
-        for rid, room in rooms.items():
-            invited = getattr(room, "invited_users", {}) or {}
-            if target_user_id in invited:
-                await _bot_send_image_fn(cl, rid, image_path, caption)
-                return True
-        return False
+        rid = _find_room_for_user(h.client, target_user_id)
+        if rid is None:
+            return False
+        await h.send_image_fn(h.client, rid, image_path, caption)
+        return True
 
     try:
-        future = asyncio.run_coroutine_threadsafe(_do_send(), _bot_loop)
+        future = asyncio.run_coroutine_threadsafe(_do_send(), h.loop)
         return future.result(timeout=120)
     except Exception as e:
         logger.warning("Matrix send_image_to_user fehlgeschlagen: %s", e)
         return False
 
 
+def send_image_to_users(target_user_ids: list[str], image_path: str, caption: str = "") -> dict[str, bool]:
+    """Thread-safe: Wie send_image_to_user, aber für mehrere User in EINEM Aufruf (asyncio.gather im Bot-Loop).
+    Gibt {user_id: Erfolg} zurück; ohne laufenden Bot alle False."""
+    h = _BOT
+    if h is None or not target_user_ids:
+        return {uid: False for uid in target_user_ids}
+
+    async def _send_one(uid: str) -> bool:
+        rid = _find_room_for_user(h.client, uid)
+        if rid is None:
+            return False
+        try:
+            await h.send_image_fn(h.client, rid, image_path, caption)
+            return True
+        except Exception as e:
+            logger.warning("Matrix send_image_to_users -> %s fehlgeschlagen: %s", uid, e)
+            return False
+
+    async def _do_send() -> list[bool]:
+        return await asyncio.gather(*(_send_one(uid) for uid in target_user_ids))
+
+    try:
+        future = asyncio.run_coroutine_threadsafe(_do_send(), h.loop)
+        return dict(zip(target_user_ids, future.result(timeout=120)))
+    except Exception as e:
+        logger.warning("Matrix send_image_to_users fehlgeschlagen: %s", e)
+        return {uid: False for uid in target_user_ids}
+
+
 def send_audio_to_room(room_id: str, wav_bytes: bytes) -> bool:
     """Thread-safe: Sendet Audio in einen bestimmten Raum über den laufenden Bot-Client."""
-    if not _bot_client or not _bot_loop or not _bot_send_audio_fn:
+    h = _BOT
+    if h is None:
         return False
 
     async def _do_send() -> bool:
-        await _bot_send_audio_fn(_bot_client, room_id, wav_bytes)
+        await h.send_audio_fn(h.client, room_id, wav_bytes)
         return True
 
     try:
-        future = asyncio.run_coroutine_threadsafe(_do_send(), _bot_loop)
+        future = asyncio.run_coroutine_threadsafe(_do_send(), h.loop)
         return future.result(timeout=60)
     except Exception as e:
         logger.warning("Matrix send_audio_to_room fehlgeschlagen: %s", e)
@@ -775,26 +930,19 @@ def send_audio_to_room(room_id: str, wav_bytes: bytes) -> bool:
 
 def send_audio_to_user(target_user_id: str, wav_bytes: bytes) -> bool:
     """Thread-safe: Sendet Audio an einen User (sucht passenden Raum)."""
-    if not _bot_client or not _bot_loop or not _bot_send_audio_fn:
+    h = _BOT
+    if h is None:
         return False
 
     async def _do_send() -> bool:
-        cl = _bot_client
-        rooms = getattr(cl, "rooms", {}) or {}
-        for rid, room in rooms.items():
-            members = getattr(room, "users", {}) or {}
-            if target_user_id in members:
-                await _bot_send_audio_fn(cl, rid, wav_bytes)
-                return True
-        for rid, room in rooms.items():
-            invited = getattr(room, "invited_users", {}) or {}
-            if target_user_id in invited:
-                await _bot_send_audio_fn(cl, rid, wav_bytes)
-                return True
-        return False
+        rid = _find_room_for_user(h.client, target_user_id)
+        if rid is None:
+            return False
+        await h.send_audio_fn(h.client, rid, wav_bytes)
+        return True
 
     try:
-        future = asyncio.run_coroutine_threadsafe(_do_send(), _bot_loop)
+        future = asyncio.run_coroutine_threadsafe(_do_send(), h.loop)
         return future.result(timeout=60)
     except Exception as e:
         logger.warning("Matrix send_audio_to_user fehlgeschlagen: %s", e)
@@ -880,8 +1028,9 @@ def _get_chat_response(
     base_ctx: dict[str, Any] = {"platform": "matrix", "room_id": room_id, "user_id": matrix_user_id}
     # Display-Name des Senders aus room.users[uid] holen — damit Bot dich beim Namen ansprechen kann
     try:
-        if _bot_client and room_id:
-            _room_obj = (getattr(_bot_client, "rooms", {}) or {}).get(room_id)
+        _h = _BOT
+        if _h is not None and room_id:
+            _room_obj = (getattr(_h.client, "rooms", {}) or {}).get(room_id)
             if _room_obj is not None:
                 _u = (getattr(_room_obj, "users", {}) or {}).get(matrix_user_id)
                 if _u is not None:
@@ -901,7 +1050,9 @@ def _get_chat_response(
         ac_count, ac_max = get_auto_context_settings(rs)
         if ac_count > 0:
             try:
-                bot_user_id = getattr(_bot_client, "user_id", None) or getattr(_bot_client, "user", None) or ""
+                _hb = _BOT
+                _bc = _hb.client if _hb is not None else None
+                bot_user_id = getattr(_bc, "user_id", None) or getattr(_bc, "user", None) or ""
                 _frm = fetch_recent_messages(room_id, limit=ac_count + 1)
                 prev = _frm.get("messages") or [] if isinstance(_frm, dict) else (_frm or [])
                 # Trigger-Nachricht (letzte vom aktuellen Sender mit gleichem Body) entfernen falls anwesend
@@ -1030,8 +1181,14 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
     # Sessions pro (room, matrix_user) — LRU mit Cap, sonst wachsen sie unbegrenzt
     from miniassistant.chat_loop import SessionLRU
     matrix_sessions: Any = SessionLRU(max_size=200)
-    # Pending Images: User hat Bild ohne Text geschickt → nächste Textnachricht bekommt das Bild
-    _pending_images: dict[str, list[dict[str, Any]]] = {}
+    # Bot-Loop einmal holen; Callbacks/Executor-Aufrufe laufen alle auf diesem Loop.
+    # Der Bot läuft als Task im uvicorn-Loop — ist uvloop installiert (Extra "fast"), ist das bereits uvloop.
+    bot_loop = asyncio.get_running_loop()
+    logger.debug("Matrix: Event-Loop %s.%s", type(bot_loop).__module__, type(bot_loop).__name__)
+    # Pending Images: User hat Bild ohne Text geschickt → nächste Textnachricht bekommt das Bild.
+    # Ring pro Sender: bei Spam verdrängt das neueste Bild das älteste statt RAM unbegrenzt zu füllen.
+    _PENDING_IMAGES_PER_USER = 5
+    _pending_images: dict[str, deque[dict[str, Any]]] = {}
     # Pending Documents: PDF/DOCX/Text-Anhang ohne Text → naechste Textnachricht bekommt das Dokument
     _pending_docs: dict[str, list[dict[str, Any]]] = {}
     # Group-Mode TTL für Pending-Attachments (Sekunden). Nach Ablauf ohne Trigger werden
@@ -1061,7 +1218,7 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
                 if not kept:
                     store.pop(sender, None)
                 elif len(kept) != len(items):
-                    store[sender] = kept
+                    store[sender] = deque(kept, maxlen=items.maxlen) if isinstance(items, deque) else kept
             # Hard-Cap-Prune: globale Anzahl Group-Pendings begrenzen (FIFO: älteste raus)
             _all_group: list[tuple[float, str, dict[str, Any]]] = []
             for sender, items in store.items():
@@ -1118,7 +1275,7 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
         except Exception as _e_filt:
             logger.debug("Matrix outgoing ping-filter failed: %s", _e_filt)
         content: dict[str, Any] = {"msgtype": "m.text", "body": body}
-        formatted = markdown_to_matrix_html(body)
+        formatted = markdown_to_matrix_html(body) if any(c in body for c in _MARKDOWN_CHARS) else None
         if formatted:
             content["format"] = "org.matrix.custom.html"
             content["formatted_body"] = formatted
@@ -1136,12 +1293,14 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
         """Lädt ein Bild hoch (media repo) und sendet es als m.image im Raum."""
         import io as _io
         p = Path(image_path)
-        if not p.exists():
+        # Disk-I/O im Thread — großes Bild oder langsames FS soll den Bot-Loop nicht blockieren
+        try:
+            img_bytes = await asyncio.to_thread(p.read_bytes)
+        except FileNotFoundError:
             logger.warning("Matrix: Bilddatei nicht gefunden: %s", image_path)
             if caption:
                 await _send_room_message(cl, room_id, f"{caption}\n\n_(Bild nicht gefunden: {image_path})_")
             return
-        img_bytes = p.read_bytes()
         mime = "image/png"
         suffix = p.suffix.lower()
         if suffix in (".jpg", ".jpeg"):
@@ -1153,22 +1312,12 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
         # Bilddimensionen aus Header lesen (Element zeigt ohne w/h als Attachment statt inline)
         img_w, img_h = 0, 0
         try:
-            import struct as _struct
             if img_bytes[:8] == b'\x89PNG\r\n\x1a\n' and len(img_bytes) >= 24:
                 # PNG: IHDR chunk ab Byte 16
-                img_w, img_h = _struct.unpack('>II', img_bytes[16:24])
+                img_w, img_h = struct.unpack('>II', img_bytes[16:24])
             elif img_bytes[:2] == b'\xff\xd8':
                 # JPEG: SOF0/SOF2 Marker suchen
-                _off = 2
-                while _off < len(img_bytes) - 9:
-                    if img_bytes[_off] != 0xFF:
-                        break
-                    marker = img_bytes[_off + 1]
-                    seg_len = _struct.unpack('>H', img_bytes[_off + 2:_off + 4])[0]
-                    if marker in (0xC0, 0xC2):
-                        img_h, img_w = _struct.unpack('>HH', img_bytes[_off + 5:_off + 9])
-                        break
-                    _off += 2 + seg_len
+                img_w, img_h = _jpeg_dims(img_bytes) or (0, 0)
         except Exception:
             pass
         try:
@@ -1238,11 +1387,36 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
     def _has_body(event: Any) -> bool:
         return isinstance(event, (RoomMessageText, RoomMessageNotice)) or bool(getattr(event, "body", None))
 
-    async def _download_mxc_image(mxc_url: str, file_info: dict[str, Any] | None = None, event_mime: str = "") -> dict[str, Any] | None:
+    def _classify_event(event: Any) -> str:
+        """Event-Art in einem Durchlauf: 'audio' | 'file' | 'image' | 'text' | 'other'.
+        Reihenfolge wichtig: Audio/File VOR dem Bild-Fallback (sonst greift die url/file-Heuristik)."""
+        src = getattr(event, "source", None)
+        content = (src.get("content") or {}) if isinstance(src, dict) else {}
+        msgtype = content.get("msgtype") or ""
+        if (RoomMessageAudio and isinstance(event, RoomMessageAudio)) or msgtype == "m.audio":
+            return "audio"
+        if (RoomMessageFile and isinstance(event, RoomMessageFile)) or msgtype == "m.file":
+            return "file"
+        if (RoomMessageImage and isinstance(event, RoomMessageImage)) or msgtype == "m.image":
+            return "image"
+        # Fallback: event.url oder source.content.file → wahrscheinlich ein Bild.
+        # Nur wenn kein anderer msgtype bekannt (verhindert false-positives bei m.audio etc.)
+        if not msgtype and (getattr(event, "url", None) or content.get("file")):
+            return "image"
+        return "text" if _has_body(event) else "other"
+
+    async def _download_mxc_image(
+        mxc_url: str,
+        file_info: dict[str, Any] | None = None,
+        event_mime: str = "",
+        event_size: int = 0,
+        trust_metadata: bool = False,
+    ) -> dict[str, Any] | None:
         """Lädt ein Bild von einer mxc:// URL herunter und gibt {mime_type, data} zurück.
         Bei verschlüsselten Bildern (file_info mit key/iv/hashes) wird entschlüsselt.
-        event_mime: MIME-Type aus dem Matrix-Event (zuverlässiger bei E2EE als Download-Response)."""
-        import base64 as _b64
+        event_mime: MIME-Type aus dem Matrix-Event (zuverlässiger bei E2EE als Download-Response).
+        trust_metadata: Event von autorisiertem Sender — stimmen event_mime (image/*) und event_size
+        mit dem Download überein, entfällt Header-Validierung und Magic-Byte-Sniffing."""
         try:
             resp = await client.download(mxc_url)
             if not (hasattr(resp, "body") and resp.body):
@@ -1265,14 +1439,17 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
                 except Exception as e:
                     logger.warning("Matrix: Entschlüsselung fehlgeschlagen: %s", e)
                     return None
+            _meta_ok = (
+                trust_metadata and (event_mime or "").startswith("image/")
+                and bool(event_size) and len(img_bytes) == event_size
+            )
             # Validierung: Entschlüsselte Daten müssen mit einem gültigen Bild-Header beginnen
-            _valid_headers = (b'\x89PNG', b'\xff\xd8', b'GIF8', b'RIFF', b'BM')
-            if not any(img_bytes[:4].startswith(h) for h in _valid_headers):
+            if not _meta_ok and not (img_bytes[:2] in _VALID_IMG_HEADERS_2 or img_bytes[:4] in _VALID_IMG_HEADERS_4):
                 logger.warning("Matrix: Entschlüsselte Daten haben keinen gültigen Bild-Header (erste 8 bytes: %s, %d bytes gesamt)",
                                img_bytes[:8].hex(), len(img_bytes))
                 # Trotzdem weitermachen – evtl. unbekanntes Format
             # MIME-Type bestimmen: 1) Event-Metadaten (zuverlässigster bei E2EE), 2) Header-Magic-Bytes, 3) Download-Response
-            if event_mime and event_mime.startswith("image/"):
+            if _meta_ok or (event_mime and event_mime.startswith("image/")):
                 content_type = event_mime
                 logger.debug("Matrix: MIME-Type aus Event-Metadaten: %s", content_type)
             elif not content_type or content_type == "application/octet-stream":
@@ -1288,7 +1465,9 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
                     content_type = "image/png"  # Fallback
                 logger.debug("Matrix: MIME-Type aus Header erkannt: %s", content_type)
             logger.info("Matrix: Bild heruntergeladen: %d bytes, mime=%s", len(img_bytes), content_type)
-            b64_data = _b64.b64encode(img_bytes).decode("ascii")
+            # Internes Bildformat ist base64 (alle Provider betten Bilder als base64 in JSON ein) —
+            # hier ist die einzige Encode-Stelle; b2a_base64 liest den Puffer direkt (kein Wrapper/Kopie).
+            b64_data = binascii.b2a_base64(img_bytes, newline=False).decode("ascii")
             return {"mime_type": content_type, "data": b64_data}
         except Exception as e:
             logger.warning("Matrix: Bild-Download Fehler für %s: %s", mxc_url, e)
@@ -1408,7 +1587,8 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
         if not sender or sender == user_id:
             return
         config_dir = config.get("_config_dir")
-        if not is_authorized("matrix", sender, config_dir):
+        sender_authed = is_authorized("matrix", sender, config_dir)
+        if not sender_authed:
             # Room-Trust via Inviter (gleiche Logik wie in on_message)
             _inv = await _fetch_inviter(client, room_id, user_id)
             if not (_inv and is_authorized("matrix", _inv, config_dir)):
@@ -1443,7 +1623,10 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
         event_size = event_info.get("size", 0) if isinstance(event_info, dict) else 0
         logger.info("Matrix: Bild von %s in %s: %s (verschlüsselt: %s, mime: %s, size: %s)",
                      sender, room_id, mxc_url, bool(file_info), event_mime or "?", event_size or "?")
-        img_data = await _download_mxc_image(mxc_url, file_info=file_info, event_mime=event_mime)
+        img_data = await _download_mxc_image(
+            mxc_url, file_info=file_info, event_mime=event_mime,
+            event_size=event_size if isinstance(event_size, int) else 0, trust_metadata=sender_authed,
+        )
         if not img_data:
             await _send_room_message(client, room_id, "Konnte das Bild nicht herunterladen.")
             return
@@ -1463,7 +1646,7 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
             img_data["_pending_ts"] = _t_p.time()
             _prune_stale_pending()  # opportunistisch alte raustun
         # Pending Image speichern – nächste Textnachricht bekommt es
-        _pending_images.setdefault(sender, []).append(img_data)
+        _pending_images.setdefault(sender, deque(maxlen=_PENDING_IMAGES_PER_USER)).append(img_data)
         if not _is_group_img:
             await _send_room_message(client, room_id, "Bild empfangen 📷 Schreib mir, was ich damit machen soll — oder lade noch weitere Bilder hoch, dann schau ich sie mir zusammen an.")
         else:
@@ -1503,8 +1686,8 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
             async def _keep_typing_audio(_rid: str = room_id) -> None:
                 try:
                     while True:
-                        await room_typing(_rid, True)
-                        await asyncio.sleep(15)
+                        await room_typing(_rid, True, timeout=_TYPING_TIMEOUT_MS)
+                        await asyncio.sleep(_TYPING_REFRESH_S)
                 except asyncio.CancelledError:
                     pass
                 except Exception:
@@ -1560,7 +1743,7 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
         # Agent aufrufen (mit [Voice]-Prefix)
         _room_obj_v = (getattr(client, "rooms", {}) or {}).get(room_id)
         _mc_v = len(getattr(_room_obj_v, "users", {}) or {}) if _room_obj_v else 0
-        response = await asyncio.get_event_loop().run_in_executor(
+        response = await bot_loop.run_in_executor(
             None,
             lambda mc=_mc_v: _get_chat_response(config, sender, f"[Voice] {transcript}", matrix_sessions, room_id=room_id, member_count=mc),
         )
@@ -1607,42 +1790,20 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
     async def on_message(room_id: str, event: Any) -> None:
         # Opportunistisches Prune abgelaufener Group-Pendings am Eingang jedes Events
         _prune_stale_pending()
-        # msgtype früh auslesen — wird für Bild- und Audio-Erkennung benötigt
-        _src_content: dict = {}
-        _ev_source = getattr(event, "source", None) or {}
-        if isinstance(_ev_source, dict):
-            _src_content = _ev_source.get("content") or {}
-        _msgtype: str = _src_content.get("msgtype") or ""
-
-        # Audio-Events: RoomMessageAudio, msgtype=m.audio — VOR Bild-Fallback prüfen
-        _is_audio = (RoomMessageAudio and isinstance(event, RoomMessageAudio)) or _msgtype == "m.audio"
-        if _is_audio:
+        _kind = _classify_event(event)
+        if _kind == "audio":
             logger.info("Matrix: Audio-Event erkannt, delegiere an on_audio")
             await on_audio(room_id, event)
             return
-
-        # File-Events: RoomMessageFile, msgtype=m.file — VOR Bild-Fallback (sonst greift body+url Heuristik)
-        _is_file = (RoomMessageFile and isinstance(event, RoomMessageFile)) or _msgtype == "m.file"
-        if _is_file:
+        if _kind == "file":
             logger.info("Matrix: File-Event erkannt, delegiere an on_file")
             await on_file(room_id, event)
             return
-
-        # Bild-Events abfangen: RoomMessageImage, msgtype=m.image, oder body+url Heuristik
-        _is_image = (RoomMessageImage and isinstance(event, RoomMessageImage)) or _msgtype == "m.image"
-        if not _is_image:
-            # Fallback: event.url oder event.source.content.file vorhanden → wahrscheinlich ein Bild
-            # Nur wenn kein anderer msgtype bekannt (verhindert false-positives bei m.audio etc.)
-            if not _msgtype:
-                if getattr(event, "url", None):
-                    _is_image = True
-                elif isinstance(_src_content, dict) and _src_content.get("file"):
-                    _is_image = True
-        if _is_image:
+        if _kind == "image":
             logger.info("Matrix: Bild-Event in on_message erkannt (%s), delegiere an on_image", type(event).__name__)
             await on_image(room_id, event)
             return
-        if not _has_body(event):
+        if _kind == "other":
             logger.debug("Matrix: Ereignis ignoriert (kein Text/Notice): %s", type(event).__name__)
             return
         sender = getattr(event, "sender", None) or ""
@@ -1786,7 +1947,7 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
             _busy_users.add(sender)
             try:
                 # Pending Images + Documents abholen
-                msg_images = _pending_images.pop(sender, None) or None
+                msg_images = list(_pending_images.pop(sender, ())) or None
                 msg_docs = _pending_docs.pop(sender, None) or None
                 # Reply-to-Image: wenn User dieses Event als Reply auf ein älteres m.image
                 # gesendet hat (Matrix-Quote-UI), das gequotete Bild auflösen + an msg_images anhängen
@@ -1811,8 +1972,13 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
                                     _qmxc = _qfile.get("url", "")
                                 _qinfo = _qc.get("info") or {} if isinstance(_qc.get("info"), dict) else {}
                                 _qmime = _qinfo.get("mimetype", "") if isinstance(_qinfo, dict) else ""
+                                _qsize = _qinfo.get("size", 0) if isinstance(_qinfo, dict) else 0
                                 if _qmxc:
-                                    _qimg = await _download_mxc_image(_qmxc, file_info=_qfile, event_mime=_qmime)
+                                    _qimg = await _download_mxc_image(
+                                        _qmxc, file_info=_qfile, event_mime=_qmime,
+                                        event_size=_qsize if isinstance(_qsize, int) else 0,
+                                        trust_metadata=is_authorized("matrix", getattr(_qe, "sender", "") or "", config_dir),
+                                    )
                                     if _qimg:
                                         if msg_images is None:
                                             msg_images = []
@@ -1841,15 +2007,15 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
                     async def _keep_typing(_rid: str = room_id) -> None:
                         try:
                             while True:
-                                await room_typing(_rid, True)
-                                await asyncio.sleep(15)
+                                await room_typing(_rid, True, timeout=_TYPING_TIMEOUT_MS)
+                                await asyncio.sleep(_TYPING_REFRESH_S)
                         except asyncio.CancelledError:
                             pass
                         except Exception:
                             pass
                     typing_task = asyncio.create_task(_keep_typing())
                 try:
-                    reply = await asyncio.get_event_loop().run_in_executor(
+                    reply = await bot_loop.run_in_executor(
                         None,
                         lambda s=sender, b=body, imgs=msg_images, rid=room_id, mc=len(room_members): _get_chat_response(config, s, b, matrix_sessions, images=imgs, room_id=rid, member_count=mc),
                     )
@@ -1922,20 +2088,24 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
     def _on_room_message(room: Any, event: Any) -> None:
         try:
             room_id = getattr(room, "room_id", None) or ""
-            loop = asyncio.get_running_loop()
-            loop.create_task(on_message(room_id, event))
+            bot_loop.create_task(on_message(room_id, event))
         except Exception as e:
             logger.debug("Matrix callback: %s", e)
 
     def _on_encrypted(room: Any, event: Any) -> None:
         try:
             room_id = getattr(room, "room_id", None) or ""
-            loop = asyncio.get_running_loop()
-            loop.create_task(on_encrypted_message(room_id, event))
+            bot_loop.create_task(on_encrypted_message(room_id, event))
         except Exception as e:
             logger.debug("Matrix callback (encrypted): %s", e)
 
     # ---------- E2EE Key-Management (analog sync_forever) ----------
+    # Methoden einmal auflösen (ändern sich nicht); pro Sync-Tick werden nur noch die Flags gelesen.
+    _keys_upload = getattr(client, "keys_upload", None)
+    _keys_query = getattr(client, "keys_query", None)
+    _keys_claim = getattr(client, "keys_claim", None)
+    _users_for_claim = getattr(client, "get_users_for_key_claiming", None)
+
     async def _e2ee_keys() -> None:
         """Upload / Query / Claim der Device-Keys – nötig damit andere Clients
         dem Bot Megolm-Sessions teilen.  sync_forever() macht das automatisch,
@@ -1943,25 +2113,30 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
         if not getattr(client, "olm", None):
             return
         try:
-            if getattr(client, "should_upload_keys", False):
-                await client.keys_upload()
+            if _keys_upload and client.should_upload_keys:
+                await _keys_upload()
                 logger.debug("Matrix: Device-Keys hochgeladen (keys_upload)")
         except Exception as exc:
             logger.debug("Matrix keys_upload: %s", exc)
         try:
-            if getattr(client, "should_query_keys", False):
-                await client.keys_query()
+            if _keys_query and client.should_query_keys:
+                await _keys_query()
                 logger.debug("Matrix: Device-Keys anderer Nutzer abgefragt (keys_query)")
         except Exception as exc:
             logger.debug("Matrix keys_query: %s", exc)
         try:
-            claim_fn = getattr(client, "keys_claim", None)
-            users_fn = getattr(client, "get_users_for_key_claiming", None)
-            if getattr(client, "should_claim_keys", False) and claim_fn and users_fn:
-                users = users_fn()
+            if _keys_claim and _users_for_claim and client.should_claim_keys:
+                users = _users_for_claim()
                 if users:
-                    await claim_fn(users)
-                    logger.debug("Matrix: Olm-Sessions aufgebaut (keys_claim)")
+                    chunks = _chunk_key_claims(users)
+                    if len(chunks) == 1:
+                        await _keys_claim(users)
+                    else:
+                        results = await asyncio.gather(*(_keys_claim(c) for c in chunks), return_exceptions=True)
+                        for r in results:
+                            if isinstance(r, BaseException):
+                                logger.debug("Matrix keys_claim (Teil-Request): %s", r)
+                    logger.debug("Matrix: Olm-Sessions aufgebaut (keys_claim, %d Request(s))", len(chunks))
         except Exception as exc:
             logger.debug("Matrix keys_claim: %s", exc)
 
@@ -2006,12 +2181,15 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
     )
 
     # Globale Referenzen fuer Notify setzen (Scheduler kann ueber Bot senden)
-    global _bot_client, _bot_loop, _bot_send_fn, _bot_send_image_fn, _bot_send_audio_fn
-    _bot_client = client
-    _bot_loop = asyncio.get_running_loop()
-    _bot_send_fn = _send_room_message
-    _bot_send_image_fn = _send_room_image
-    _bot_send_audio_fn = _send_room_audio
+    global _BOT
+    _handle = _BotHandle(
+        client=client,
+        loop=bot_loop,
+        send_fn=_send_room_message,
+        send_image_fn=_send_room_image,
+        send_audio_fn=_send_room_audio,
+    )
+    _BOT = _handle
 
     _rooms = getattr(client, "rooms", {}) or {}
     if _rooms:
@@ -2027,76 +2205,102 @@ async def run_matrix_bot(config: dict[str, Any]) -> None:
     asyncio.create_task(_prefetch_inviters())
     # Räume, bei denen Beitritt dauerhaft fehlschlägt (z. B. M_UNKNOWN / "no servers") – nicht ewig retry, Einladung ablehnen
     join_failed_rooms: set[str] = set()
-    # Fehler-Text, ab dem wir die Einladung als "nicht beitretbar" ablehnen
-    _unrecoverable_join_errors = ("no servers", "M_UNKNOWN", "M_FORBIDDEN", "M_NOT_FOUND")
+    # Vorübergehend fehlgeschlagene Beitritte: room_id -> (nächster Versuch (monotonic), aktuelles Delay).
+    # Exponentiell mit Jitter statt bei jedem Sync-Tick erneut am Homeserver anzuklopfen.
+    _join_backoff: dict[str, tuple[float, float]] = {}
+
+    def _join_retry_later(rid: str) -> None:
+        _, prev = _join_backoff.get(rid, (0.0, 0.0))
+        delay = min(prev * 2, _JOIN_BACKOFF_MAX) if prev else _JOIN_BACKOFF_START
+        _join_backoff[rid] = (time.monotonic() + delay + random.uniform(0, delay), delay)
+
+    # Einladungen parallel annehmen, aber höchstens _JOIN_CONCURRENCY Joins gleichzeitig (Homeserver-Rate-Limits)
+    _join_sem = asyncio.Semaphore(_JOIN_CONCURRENCY)
+
+    async def _accept_invite(room_id: str, invite_room: Any) -> None:
+        async with _join_sem:
+            # Inviter aus invite_state (best-effort — Synapse liefert oft 0 events,
+            # daher post-join fetch unten als primärer Pfad).
+            try:
+                invite_state = getattr(invite_room, "invite_state", None) or []
+                for ev in invite_state:
+                    ev_type = getattr(ev, "type", None)
+                    state_key = getattr(ev, "state_key", None)
+                    sender = getattr(ev, "sender", None)
+                    content = getattr(ev, "content", None) or {}
+                    membership = content.get("membership") if isinstance(content, dict) else None
+                    if ev_type == "m.room.member" and state_key == user_id and membership == "invite" and sender and sender != user_id:
+                        _inviter_cache[room_id] = sender
+                        _persist_inviter_cache()
+                        logger.info("Matrix: Inviter für %s = %s (via invite_state)", room_id, sender)
+                        break
+            except Exception as e:
+                logger.debug("inviter capture (invite_state) failed for %s: %s", room_id, e)
+            try:
+                resp = await client.join(room_id)
+                if resp and getattr(resp, "room_id", None):
+                    _join_backoff.pop(room_id, None)
+                    logger.info("Matrix: Raum beigetreten: %s", room_id)
+                    # Falls invite_state-capture fehlschlug → jetzt via state event holen
+                    if room_id not in _inviter_cache or _inviter_cache.get(room_id) is None:
+                        _inviter_cache.pop(room_id, None)  # clear null so fetcher re-tries
+                        inv = await _fetch_inviter(client, room_id, user_id)
+                        if inv:
+                            logger.info("Matrix: post-join inviter capture für %s = %s", room_id, inv)
+                else:
+                    err_msg = str(resp) if resp else "unknown"
+                    if _UNRECOVERABLE_JOIN_RE.search(err_msg):
+                        join_failed_rooms.add(room_id)
+                        try:
+                            await client.leave(room_id)
+                            logger.info("Matrix: Einladung abgelehnt (nicht beitretbar): %s", room_id)
+                        except Exception:
+                            pass
+                    else:
+                        _join_retry_later(room_id)
+                        logger.warning("Matrix: Beitritt fehlgeschlagen für %s: %s", room_id, resp)
+            except Exception as e:
+                err_msg = str(e)
+                if _UNRECOVERABLE_JOIN_RE.search(err_msg):
+                    join_failed_rooms.add(room_id)
+                    try:
+                        await client.leave(room_id)
+                        logger.info("Matrix: Einladung abgelehnt (nicht beitretbar): %s", room_id)
+                    except Exception:
+                        pass
+                else:
+                    _join_retry_later(room_id)
+                    logger.warning("Matrix: Beitritt zu Raum %s fehlgeschlagen: %s", room_id, e)
 
     try:
         while True:
             try:
-                await client.sync(timeout=30000, full_state=False)
-                await _e2ee_keys()
+                # Key-Upload/-Query/-Claim (ausgelöst vom vorigen Sync) parallel zum Long-Poll-Sync:
+                # eigene HTTP-Endpunkte, deren RTT verschwindet so hinter den bis zu 30s Sync.
+                keys_task = asyncio.create_task(_e2ee_keys())
+                try:
+                    await client.sync(timeout=30000, full_state=False)
+                except BaseException:
+                    keys_task.cancel()
+                    raise
+                await keys_task
                 invited = getattr(client, "invited_rooms", {}) or {}
-                for room_id in list(invited.keys()):
-                    if room_id in join_failed_rooms:
-                        continue
-                    # Inviter aus invite_state (best-effort — Synapse liefert oft 0 events,
-                    # daher post-join fetch unten als primärer Pfad).
-                    try:
-                        invite_room = invited.get(room_id)
-                        invite_state = getattr(invite_room, "invite_state", None) or []
-                        for ev in invite_state:
-                            ev_type = getattr(ev, "type", None)
-                            state_key = getattr(ev, "state_key", None)
-                            sender = getattr(ev, "sender", None)
-                            content = getattr(ev, "content", None) or {}
-                            membership = content.get("membership") if isinstance(content, dict) else None
-                            if ev_type == "m.room.member" and state_key == user_id and membership == "invite" and sender and sender != user_id:
-                                _inviter_cache[room_id] = sender
-                                _persist_inviter_cache()
-                                logger.info("Matrix: Inviter für %s = %s (via invite_state)", room_id, sender)
-                                break
-                    except Exception as e:
-                        logger.debug("inviter capture (invite_state) failed for %s: %s", room_id, e)
-                    try:
-                        resp = await client.join(room_id)
-                        if resp and getattr(resp, "room_id", None):
-                            logger.info("Matrix: Raum beigetreten: %s", room_id)
-                            # Falls invite_state-capture fehlschlug → jetzt via state event holen
-                            if room_id not in _inviter_cache or _inviter_cache.get(room_id) is None:
-                                _inviter_cache.pop(room_id, None)  # clear null so fetcher re-tries
-                                inv = await _fetch_inviter(client, room_id, user_id)
-                                if inv:
-                                    logger.info("Matrix: post-join inviter capture für %s = %s", room_id, inv)
-                        else:
-                            err_msg = str(resp) if resp else "unknown"
-                            if any(x in err_msg for x in _unrecoverable_join_errors):
-                                join_failed_rooms.add(room_id)
-                                try:
-                                    await client.leave(room_id)
-                                    logger.info("Matrix: Einladung abgelehnt (nicht beitretbar): %s", room_id)
-                                except Exception:
-                                    pass
-                            else:
-                                logger.warning("Matrix: Beitritt fehlgeschlagen für %s: %s", room_id, resp)
-                        await asyncio.sleep(0.5)
-                    except Exception as e:
-                        err_msg = str(e)
-                        if any(x in err_msg for x in _unrecoverable_join_errors):
-                            join_failed_rooms.add(room_id)
-                            try:
-                                await client.leave(room_id)
-                                logger.info("Matrix: Einladung abgelehnt (nicht beitretbar): %s", room_id)
-                            except Exception:
-                                pass
-                        else:
-                            logger.warning("Matrix: Beitritt zu Raum %s fehlgeschlagen: %s", room_id, e)
-                        await asyncio.sleep(0.5)
+                # Abgelehnte Räume per Mengen-Differenz raus, dann noch laufende Backoffs
+                _now = time.monotonic()
+                pending = [
+                    rid for rid in invited.keys() - join_failed_rooms
+                    if rid not in _join_backoff or _now >= _join_backoff[rid][0]
+                ]
+                if pending:
+                    await asyncio.gather(*(_accept_invite(rid, invited.get(rid)) for rid in pending))
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.exception("Matrix Sync-Fehler: %s", e)
                 await asyncio.sleep(5)
     finally:
+        if _BOT is _handle:
+            _BOT = None
         # aiohttp-Session schließen, damit beim Server-Shutdown keine "Unclosed client session"-Warnung entsteht
         session = getattr(client, "client_session", None)
         if session is not None and not session.closed:
@@ -8,17 +8,27 @@ und der System-Prompt nutzt L0+L1 statt raw dump.
 """
 from __future__ import annotations
 
-import json
+import atexit
+import io
 import logging
+import os
 import re
+import stat
+import tempfile
+import threading
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
-from miniassistant.config import load_config, get_config_dir
+from miniassistant._json import dumps as _json_dumps, loads as _json_loads
+from miniassistant.config import config_path, load_config, get_config_dir
 
 _log = logging.getLogger("miniassistant.memory")
 
+# Prozess-umask einmal beim Import lesen (os.umask setzt und liest nur zusammen, nicht thread-safe)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 # --- Noise-Filter: Diese Exchanges verschwenden nur Context-Tokens ---
 _NOISE_PATTERNS: list[re.Pattern[str]] = [
     # Auto-generierte Title/Tag-Requests vom System
@@ -50,11 +60,31 @@ def _is_noise(user_content: str) -> bool:
     return False
 
 
+# (project_dir, config-Pfad) -> (Stempel der Config-Datei, memory_dir). Stempel = (mtime_ns, size)
+# → jede Änderung der Config (auch von außen) baut den Pfad neu auf.
+_memory_dir_cache: dict[tuple[str | None, str], tuple[tuple[int, int] | None, Path]] = {}
+
+
 def memory_dir(project_dir: str | None = None) -> Path:
-    """Verzeichnis für Memory-Dateien (unter Agent-Dir oder get_config_dir()/agent/memory)."""
+    """Verzeichnis für Memory-Dateien (unter Agent-Dir oder get_config_dir()/agent/memory).
+
+    Pro project_dir gecacht (läuft bei jeder Runde), solange die Config-Datei unverändert ist.
+    """
+    cfg_path = str(config_path(project_dir))
+    try:
+        st = os.stat(cfg_path)
+        stamp: tuple[int, int] | None = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        stamp = None
+    key = (project_dir, cfg_path)
+    hit = _memory_dir_cache.get(key)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
     config = load_config(project_dir)
     agent = config.get("agent_dir") or str(Path(get_config_dir()) / "agent")
-    return Path(agent).expanduser().resolve() / "memory"
+    d = Path(agent).expanduser().resolve() / "memory"
+    _memory_dir_cache[key] = (stamp, d)
+    return d
 
 
 def save_summary(summary: str, model_used: str | None = None, project_dir: str | None = None) -> Path | None:
@@ -67,8 +97,24 @@ def save_summary(summary: str, model_used: str | None = None, project_dir: str |
     if model_used:
         meta["last_model"] = model_used
     path = d / "last_summary.json"
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(meta, f, ensure_ascii=False, indent=0)
+    # Atomar: Temp-Datei im selben Verzeichnis + os.replace → kein halb geschriebenes JSON nach Absturz
+    # mkstemp legt 0600 an → Rechte der bisherigen Datei übernehmen bzw. umask-Default wie bei open()
+    try:
+        mode = stat.S_IMODE(path.stat().st_mode)
+    except OSError:
+        mode = 0o666 & ~_UMASK
+    fd, tmp_str = tempfile.mkstemp(dir=d, prefix=".last_summary_", suffix=".json.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_json_dumps(meta))
+        os.chmod(tmp_str, mode)
+        os.replace(tmp_str, path)
+    except Exception:
+        try:
+            os.unlink(tmp_str)
+        except OSError:
+            pass
+        raise
     return path
 
 
@@ -81,8 +127,7 @@ def load_summary(project_dir: str | None = None) -> tuple[str | None, str | None
     if not path.exists():
         return None, None
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = _json_loads(path.read_bytes())
         return data.get("summary"), data.get("last_model")
     except Exception:
         return None, None
@@ -92,6 +137,51 @@ def _today_iso() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
 
+# Offene Append-Handles der Tages-Dateien: Pfad -> Handle (line-buffered, jede Zeile landet sofort
+# in der Datei). Spart open/close pro Runde; beim Tageswechsel werden alte Handles geschlossen.
+_writer_cache: dict[str, io.TextIOWrapper] = {}
+_writer_lock = threading.Lock()
+
+
+def _close_writers() -> None:
+    """Schließt alle offenen Tages-Datei-Handles (atexit)."""
+    with _writer_lock:
+        for f in _writer_cache.values():
+            try:
+                f.close()
+            except Exception:
+                pass
+        _writer_cache.clear()
+
+
+atexit.register(_close_writers)
+
+
+def _append_daily(path: Path, text: str) -> None:
+    """Hängt text an die Tages-Datei an, über ein offen gehaltenes Handle."""
+    key = str(path)
+    with _writer_lock:
+        f = _writer_cache.get(key)
+        if f is not None:
+            try:
+                # Datei extern gelöscht/rotiert → neu öffnen statt ins Leere zu schreiben
+                if os.fstat(f.fileno()).st_nlink == 0:
+                    f.close()
+                    f = None
+            except (OSError, ValueError):
+                f = None
+        if f is None:
+            # Tageswechsel: Handles anderer Tage im selben Verzeichnis schließen
+            for k in [k for k in _writer_cache if Path(k).parent == path.parent]:
+                try:
+                    _writer_cache.pop(k).close()
+                except Exception:
+                    pass
+            f = open(path, "a", encoding="utf-8", buffering=1)
+            _writer_cache[key] = f
+        f.write(text)
+
+
 def append_exchange(
     user_content: str,
     assistant_content: str,
@@ -120,16 +210,45 @@ def append_exchange(
     asst_block = (assistant_content or "").strip()
     user_prefix = f"User [{user_id}]: " if user_id else "User: "
     line = f"{user_prefix}{user_line}\nAssistant: {asst_block}\n\n"
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(line)
+    _append_daily(path, line)
     # mempalace Dual-Write (fire-and-forget, Fehler ignorieren)
     _mempalace_store(user_content, assistant_content, project_dir, user_id)
     return path
 
 
+_TAIL_BLOCK = 8192
+
+
+def _tail_lines(path: Path, n: int, max_chars_per_line: int) -> list[str]:
+    """Letzte n Zeilen einer Datei (n <= 0: alle), rückwärts blockweise gelesen statt komplett.
+    Zeilen länger als max_chars_per_line werden mit "…" gekürzt (0 = keine Kürzung)."""
+    with open(path, "rb") as f:
+        if n > 0:
+            pos = f.seek(0, os.SEEK_END)
+            buf = b""
+            # n+1 Zeilenumbrüche → mindestens n vollständige Zeilen nach dem ersten
+            while pos > 0 and buf.count(b"\n") <= n:
+                step = min(_TAIL_BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+            if pos > 0:
+                # angeschnittene erste Zeile verwerfen
+                buf = buf[buf.index(b"\n") + 1:]
+        else:
+            buf = f.read()
+    lines = buf.decode("utf-8").splitlines()
+    if n > 0 and len(lines) > n:
+        lines = lines[-n:]
+    m = max_chars_per_line
+    if m <= 0:
+        return lines
+    return [ln if len(ln) <= m else ln[: m - 1] + "…" for ln in lines]
+
+
 def _estimate_tokens(text: str) -> int:
-    """Konservative Token-Schätzung (~3 Zeichen/Token)."""
-    return max(1, int(len(text) / 3.0)) if text else 0
+    """Konservative Token-Schätzung (~3 Zeichen/Token, aufgerundet)."""
+    return (len(text) + 2) // 3
 
 
 # ---------------------------------------------------------------------------
@@ -669,33 +788,37 @@ def get_memory_for_prompt(
     """
     if not _memory_enabled(project_dir):
         return None
-    config = load_config(project_dir) if (max_chars_per_line is None or days is None or max_tokens is None) else None
-    if max_chars_per_line is None:
-        max_chars_per_line = int((config.get("memory") or {}).get("max_chars_per_line", 100) or 100)
-    if days is None:
-        days = int((config.get("memory") or {}).get("days", 2) or 2)
-    if max_tokens is None:
-        max_tokens = int((config.get("memory") or {}).get("max_tokens", 1500) or 1500)
+    if max_chars_per_line is None or days is None or max_tokens is None:
+        mem_cfg = load_config(project_dir).get("memory") or {}
+        if max_chars_per_line is None:
+            max_chars_per_line = int(mem_cfg.get("max_chars_per_line", 100) or 100)
+        if days is None:
+            days = int(mem_cfg.get("days", 2) or 2)
+        if max_tokens is None:
+            max_tokens = int(mem_cfg.get("max_tokens", 1500) or 1500)
     d = memory_dir(project_dir)
     if not d.exists():
         return None
     now = datetime.now(timezone.utc)
-    all_lines: list[str] = []
-    # Älteste Tage zuerst einlesen (i=days-1 … i=0) → all_lines = [älteste…neueste]
-    # Damit ist all_lines[-max_lines:] korrekt die neuesten Zeilen.
-    for i in range(days - 1, -1, -1):
+    # Neueste Tage zuerst, jeweils nur das Datei-Ende lesen; ältere Tage nur so weit
+    # wie noch Zeilen fehlen. chunks = [neueste…älteste] → am Ende umdrehen.
+    chunks: list[list[str]] = []
+    missing = max_lines
+    for i in range(days):
         day = (now - timedelta(days=i)).strftime("%Y-%m-%d")
         path = d / f"{day}.md"
         if not path.exists():
             continue
         try:
-            text = path.read_text(encoding="utf-8")
-            for line in text.splitlines():
-                if max_chars_per_line > 0 and len(line) > max_chars_per_line:
-                    line = line[: max_chars_per_line - 1] + "…"
-                all_lines.append(line)
+            lines = _tail_lines(path, missing if max_lines > 0 else 0, max_chars_per_line)
         except Exception:
             continue
+        chunks.append(lines)
+        if max_lines > 0:
+            missing -= len(lines)
+            if missing <= 0:
+                break
+    all_lines = [line for lines in reversed(chunks) for line in lines]
     if not all_lines:
         return None
     # Nur die neuesten max_lines Zeilen behalten (Ende der Liste = neueste)
@@ -705,11 +828,10 @@ def get_memory_for_prompt(
         budget_lines: list[str] = []
         used = 0
         for line in reversed(trimmed):
-            cost = _estimate_tokens(line)
-            if used + cost > max_tokens:
+            used += _estimate_tokens(line)
+            if used > max_tokens:
                 break
             budget_lines.append(line)
-            used += cost
         budget_lines.reverse()
         trimmed = budget_lines
     return "\n".join(trimmed).strip() or None
@@ -5,13 +5,38 @@ Leichtgewichtig: eigene HTTP-Calls, keine laufenden Bot-Instanzen noetig.
 """
 from __future__ import annotations
 
+import functools
+import json
 import logging
+import threading
 import time
 import urllib.parse
-from typing import Any
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Callable, Iterable, TypeVar
 
+import httpx
+
+from miniassistant.chat_auth import list_authorized
 from miniassistant.config import load_config
 
+# Einmal beim Laden statt in jedem Send-Pfad; matrix_bot importiert nio selbst nur optional.
+try:
+    from miniassistant.matrix_bot import (
+        markdown_to_matrix_html,
+        send_audio_to_room,
+        send_audio_to_user,
+        send_image_to_room,
+        send_image_to_users,
+        send_message_to_room,
+        send_message_to_users,
+    )
+except ImportError:  # pragma: no cover
+    markdown_to_matrix_html = send_message_to_room = send_message_to_users = None  # type: ignore[assignment]
+    send_image_to_room = send_image_to_users = send_audio_to_room = send_audio_to_user = None  # type: ignore[assignment]
+
 logger = logging.getLogger(__name__)
 if not logger.handlers:
     _handler = logging.StreamHandler()
@@ -19,6 +44,57 @@ if not logger.handlers:
     logger.addHandler(_handler)
     logger.setLevel(logging.INFO)
 
+# Bild-MIME-Type nach Dateiendung (Default image/png)
+_MIME_BY_EXT = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".gif": "image/gif", ".webp": "image/webp"}
+
+
+_DISCORD_API = "https://discord.com/api/v10"
+# Max. parallele Sends pro Benachrichtigung (mehrere User/Channels gleichzeitig statt nacheinander)
+_FANOUT_MAX_WORKERS = 8
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+# Ein gemeinsamer HTTP-Client (Connection-Pool, Keep-Alive/TLS-Reuse) statt urlopen pro Request.
+# httpx.Client ist thread-safe → auch aus den Fan-out-Threads nutzbar.
+_http_client: httpx.Client | None = None
+_http_client_lock = threading.Lock()
+
+# DM-Channel-Cache: (bot_token, discord_user_id) -> channel_id. Discord liefert für denselben
+# Empfänger immer denselben DM-Channel → nur einmal pro Prozess anlegen; bei 404 verwerfen.
+_dm_channel_cache: dict[tuple[str, str], str] = {}
+
+# Matrix HTTP-Fallback: invertierter Index homeserver -> {mx_user: room_id} aus joined_rooms/joined_members.
+# Einmal (parallel) aufbauen statt pro Notify alle Räume abzuklappern; nach _USER_ROOM_TTL neu.
+_USER_ROOM_TTL = 300.0
+# Neuaufbau single-flight unter _user_room_lock; User ohne gemeinsamen Raum werden _USER_ROOM_MISS_TTL
+# lang negativ gecacht, damit nicht jede Benachrichtigung den kompletten Index neu baut.
+_USER_ROOM_MISS_TTL = 60.0
+_user_room_cache: dict[str, dict[str, str]] = {}
+_user_room_cache_ts: dict[str, float] = {}
+_user_room_misses: dict[str, dict[str, float]] = {}
+_user_room_lock = threading.Lock()
+
+
+def _http() -> httpx.Client:
+    global _http_client
+    c = _http_client
+    if c is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = httpx.Client(timeout=10.0, headers={"User-Agent": "miniassistant/1.0"})
+            c = _http_client
+    return c
+
+
+def _fan_out(fn: Callable[[_T], _R], items: Iterable[_T]) -> list[_R]:
+    """Ruft fn parallel für alle items auf (Reihenfolge bleibt erhalten). fn muss Fehler selbst abfangen."""
+    items = list(items)
+    if len(items) <= 1:
+        return [fn(i) for i in items]
+    with ThreadPoolExecutor(max_workers=min(_FANOUT_MAX_WORKERS, len(items)), thread_name_prefix="notify") as ex:
+        return list(ex.map(fn, items))
+
 
 def _is_valid_discord_id(value: Any) -> bool:
     """Discord-IDs sind dezimale Snowflakes (17-20 Ziffern). Verhindert URL-Path-Injection."""
@@ -26,6 +102,114 @@ def _is_valid_discord_id(value: Any) -> bool:
     return s.isdigit() and 1 <= len(s) <= 32
 
 
+def _discord_headers(bot_token: str, content_type: str = "application/json") -> dict[str, str]:
+    return {"Authorization": f"Bot {bot_token}", "Content-Type": content_type}
+
+
+def _discord_dm_channel(bot_token: str, discord_user_id: str) -> str | None:
+    """DM-Channel zu einem Discord-User anlegen/holen. Gibt die Channel-ID zurück (oder None)."""
+    key = (bot_token, discord_user_id)
+    cid = _dm_channel_cache.get(key)
+    if cid:
+        return cid
+    resp = _http().post(
+        f"{_DISCORD_API}/users/@me/channels",
+        json={"recipient_id": discord_user_id},
+        headers=_discord_headers(bot_token),
+    )
+    resp.raise_for_status()
+    cid = resp.json().get("id")
+    if not cid or not _is_valid_discord_id(cid):
+        return None
+    cid = str(cid)
+    _dm_channel_cache[key] = cid
+    return cid
+
+
+def _forget_dm_channel(channel_id: str) -> list[str]:
+    """Gecachten DM-Channel verwerfen (Discord meldete 404) → beim nächsten Senden neu anlegen.
+    Gibt die Discord-User-IDs zurück, denen der Channel zugeordnet war."""
+    keys = [k for k, v in _dm_channel_cache.items() if v == channel_id]
+    for key in keys:
+        _dm_channel_cache.pop(key, None)
+    return [user_id for _, user_id in keys]
+
+
+def _discord_dm_channels(bot_token: str, config_dir: str | None) -> list[str]:
+    """DM-Channels aller autorisierten Discord-User (parallel aufgelöst)."""
+    try:
+        authorized = list_authorized("discord", config_dir)
+    except Exception:
+        authorized = []
+    user_ids: list[str] = []
+    for entry in authorized:
+        discord_user_id = entry.get("user_id", entry) if isinstance(entry, dict) else entry
+        if discord_user_id and isinstance(discord_user_id, str) and _is_valid_discord_id(discord_user_id):
+            user_ids.append(discord_user_id)
+
+    def _one(discord_user_id: str) -> str | None:
+        try:
+            return _discord_dm_channel(bot_token, discord_user_id)
+        except Exception as e:
+            logger.warning("Discord DM-Channel fuer %s fehlgeschlagen: %s", discord_user_id, e)
+            return None
+
+    return [cid for cid in _fan_out(_one, user_ids) if cid]
+
+
+def _discord_upload(bot_token: str, channel_id: str, content: str, filename: str, mime: str, data: bytes | Path) -> None:
+    """Datei als multipart/form-data (payload_json + files[0]) in einen Discord-Channel hochladen.
+    data als Path wird blockweise aus der Datei gestreamt statt komplett in den RAM gelesen.
+    404 auf einem gecachten DM-Channel → Channel einmal neu anlegen und wiederholen (wie _send_discord)."""
+    payload = json.dumps({"content": content, "attachments": [{"id": 0, "filename": filename}]}, ensure_ascii=False)
+    for attempt in range(2):
+        # Path bei jedem Versuch neu öffnen — der erste Upload hat den Stream bereits verbraucht
+        with (open(data, "rb") if isinstance(data, Path) else nullcontext(data)) as body:
+            resp = _http().post(
+                f"{_DISCORD_API}/channels/{channel_id}/messages",
+                files={
+                    "payload_json": (None, payload, "application/json"),
+                    "files[0]": (filename, body, mime),
+                },
+                headers={"Authorization": f"Bot {bot_token}"},
+                timeout=30.0,
+            )
+        if resp.status_code == 404 and attempt == 0:
+            user_ids = _forget_dm_channel(channel_id)
+            new_cid = _discord_dm_channel(bot_token, user_ids[0]) if user_ids else None
+            if new_cid:
+                channel_id = new_cid
+                continue
+        resp.raise_for_status()
+        return
+
+
+@functools.lru_cache(maxsize=1024)
+def _q(room_id: str) -> str:
+    """URL-quotierte Room-ID (einmal pro Raum statt bei jedem Send)."""
+    return urllib.parse.quote(room_id)
+
+
+def _matrix_text_content(message: str) -> dict[str, Any]:
+    """m.text-Content inkl. HTML-Formatierung (falls Markdown → HTML verfügbar)."""
+    content: dict[str, Any] = {"msgtype": "m.text", "body": message}
+    try:
+        formatted = markdown_to_matrix_html(message) if markdown_to_matrix_html else None
+        if formatted:
+            content["format"] = "org.matrix.custom.html"
+            content["formatted_body"] = formatted
+    except Exception:
+        pass
+    return content
+
+
+def _matrix_put_message(homeserver: str, token: str, room_id: str, content: dict[str, Any]) -> None:
+    """m.room.message per raw HTTP in einen Raum senden (nur unverschlüsselte Räume)."""
+    send_url = f"{homeserver}/_matrix/client/v3/rooms/{_q(room_id)}/send/m.room.message/{uuid.uuid4()}"
+    resp = _http().put(send_url, json=content, headers={"Authorization": f"Bearer {token}"})
+    resp.raise_for_status()
+
+
 def send_notification(
     message: str,
     client: str | None = None,
@@ -75,7 +259,6 @@ def _send_matrix(mc: dict[str, Any], message: str, config_dir: str | None = None
     Fallback auf raw HTTP nur wenn Bot-Client nicht verfuegbar (unverschluesselte Raeume)."""
 
     try:
-        from miniassistant.chat_auth import list_authorized
         authorized = list_authorized("matrix", config_dir)
     except Exception:
         authorized = []
@@ -92,25 +275,34 @@ def _send_matrix(mc: dict[str, Any], message: str, config_dir: str | None = None
     if not target_users:
         return "keine autorisierten Matrix-User"
 
-    # Bevorzugt: ueber den laufenden Bot-Client senden (E2EE-faehig)
-    try:
-        from miniassistant.matrix_bot import send_message_to_user
-    except ImportError:
-        send_message_to_user = None  # type: ignore
+    # Bevorzugt: ueber den laufenden Bot-Client senden (E2EE-faehig), alle User parallel im Bot-Loop
+    via_bot = send_message_to_users(target_users, message) if send_message_to_users else {}
 
     sent_to: list[str] = []
+    fallback: list[str] = []
     for mx_user in target_users:
-        if send_message_to_user and send_message_to_user(mx_user, message):
+        if via_bot.get(mx_user):
             sent_to.append(mx_user)
             logger.info("Matrix -> %s (via Bot)", mx_user)
         else:
-            # Fallback: raw HTTP (nur fuer unverschluesselte Raeume)
-            ok = _send_matrix_http(mc, mx_user, message)
-            if ok:
-                sent_to.append(mx_user)
-                logger.info("Matrix -> %s (via HTTP)", mx_user)
-            else:
-                logger.warning("Matrix -> %s fehlgeschlagen", mx_user)
+            fallback.append(mx_user)
+
+    # Fallback: raw HTTP (nur fuer unverschluesselte Raeume). Räume aller User einmal vorab auflösen
+    # (höchstens ein Index-Neuaufbau), danach die Sends parallel — keine verschachtelten Pools.
+    homeserver = (mc.get("homeserver") or "").rstrip("/")
+    token = mc.get("token", "")
+    rooms = _matrix_rooms_for_users(homeserver, token, fallback) if fallback and homeserver and token else {}
+
+    def _one(mx_user: str) -> bool:
+        rid = rooms.get(mx_user)
+        return bool(rid) and _send_matrix_http(homeserver, token, mx_user, rid, message)
+
+    for mx_user, ok in zip(fallback, _fan_out(_one, fallback)):
+        if ok:
+            sent_to.append(mx_user)
+            logger.info("Matrix -> %s (via HTTP)", mx_user)
+        else:
+            logger.warning("Matrix -> %s fehlgeschlagen", mx_user)
 
     return f"gesendet an {len(sent_to)} User" if sent_to else "senden fehlgeschlagen"
 
@@ -119,38 +311,20 @@ def _send_matrix_to_room(mc: dict[str, Any], message: str, room_id: str) -> str:
     """Sendet eine Nachricht direkt in einen bestimmten Matrix-Raum."""
     # Bevorzugt: ueber den laufenden Bot-Client senden (E2EE-faehig)
     try:
-        from miniassistant.matrix_bot import send_message_to_room
-        if send_message_to_room(room_id, message, keep_typing=False):
+        if send_message_to_room and send_message_to_room(room_id, message, keep_typing=False):
             logger.info("Matrix -> Room %s (via Bot)", room_id)
             return f"gesendet in Raum {room_id}"
-    except (ImportError, Exception) as e:
+    except Exception as e:
         logger.warning("Matrix Bot -> Room %s fehlgeschlagen: %s", room_id, e)
 
     # Fallback: raw HTTP
-    import urllib.request
-    import json
-    import uuid as _uuid
-
     homeserver = (mc.get("homeserver") or "").rstrip("/")
     token = mc.get("token", "")
     if not homeserver or not token:
         return "homeserver/token fehlt"
 
     try:
-        content: dict[str, Any] = {"msgtype": "m.text", "body": message}
-        try:
-            from miniassistant.matrix_bot import markdown_to_matrix_html
-            formatted = markdown_to_matrix_html(message)
-            if formatted:
-                content["format"] = "org.matrix.custom.html"
-                content["formatted_body"] = formatted
-        except Exception:
-            pass
-        send_url = f"{homeserver}/_matrix/client/v3/rooms/{urllib.parse.quote(room_id)}/send/m.room.message/{_uuid.uuid4()}"
-        body = json.dumps(content).encode()
-        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-        req = urllib.request.Request(send_url, data=body, headers=headers, method="PUT")
-        urllib.request.urlopen(req, timeout=10)
+        _matrix_put_message(homeserver, token, room_id, _matrix_text_content(message))
         logger.info("Matrix -> Room %s (via HTTP)", room_id)
         return f"gesendet in Raum {room_id}"
     except Exception as e:
@@ -158,61 +332,70 @@ def _send_matrix_to_room(mc: dict[str, Any], message: str, room_id: str) -> str:
         return f"senden fehlgeschlagen: {e}"
 
 
-def _send_matrix_http(mc: dict[str, Any], mx_user: str, message: str) -> bool:
+def _send_matrix_http(homeserver: str, token: str, mx_user: str, room_id: str, message: str) -> bool:
     """Fallback: raw HTTP fuer unverschluesselte Raeume (ohne Bot-Client)."""
-    import urllib.request
-    import json
-    import uuid as _uuid
-
-    homeserver = (mc.get("homeserver") or "").rstrip("/")
-    token = mc.get("token", "")
-    if not homeserver or not token:
+    try:
+        _matrix_put_message(homeserver, token, room_id, _matrix_text_content(message))
+        return True
+    except Exception as e:
+        # User evtl. nicht mehr im Raum → Eintrag verwerfen, nächster Versuch baut neu auf
+        with _user_room_lock:
+            _user_room_cache.get(homeserver, {}).pop(mx_user, None)
+        logger.warning("Matrix HTTP -> %s: %s", mx_user, e)
         return False
 
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
 
-    # Bestehenden Raum suchen via joined_rooms
+def _matrix_rooms_for_users(homeserver: str, token: str, users: list[str]) -> dict[str, str | None]:
+    """Raum je User (joined_rooms-Reihenfolge, erster Treffer) — aus dem Cache; fehlt ein User, der nicht
+    negativ gecacht ist, wird der Index einmal (single-flight) neu aufgebaut."""
+    with _user_room_lock:
+        now = time.monotonic()
+        index = _user_room_cache.get(homeserver)
+        fresh = index is not None and now - _user_room_cache_ts.get(homeserver, 0.0) < _USER_ROOM_TTL
+        misses = _user_room_misses.setdefault(homeserver, {})
+
+        def _known(u: str) -> bool:
+            return (fresh and u in index) or now - misses.get(u, float("-inf")) < _USER_ROOM_MISS_TTL
+
+        if not all(_known(u) for u in users):
+            new_index = _matrix_build_room_index(homeserver, token)
+            if new_index is not None:
+                index = _user_room_cache[homeserver] = new_index
+                _user_room_cache_ts[homeserver] = now = time.monotonic()
+                misses.clear()
+                for u in users:
+                    if u not in index:
+                        misses[u] = now
+        index = index or {}
+        return {u: index.get(u) for u in users}
+
+
+def _matrix_build_room_index(homeserver: str, token: str) -> dict[str, str] | None:
+    """Invertierter Index {mx_user: room_id} aus joined_rooms + joined_members (Räume parallel).
+    None wenn joined_rooms fehlschlägt. Aufrufer hält _user_room_lock."""
+    headers = {"Authorization": f"Bearer {token}"}
+    client = _http()
     try:
-        req = urllib.request.Request(f"{homeserver}/_matrix/client/v3/joined_rooms", headers=headers)
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            rooms = json.loads(resp.read()).get("joined_rooms", [])
+        resp = client.get(f"{homeserver}/_matrix/client/v3/joined_rooms", headers=headers)
+        resp.raise_for_status()
+        rooms = resp.json().get("joined_rooms", [])
     except Exception:
-        return False
+        return None
 
-    room_id = None
-    for rid in rooms:
+    def _members(rid: str) -> dict[str, Any]:
         try:
-            url = f"{homeserver}/_matrix/client/v3/rooms/{urllib.parse.quote(rid)}/joined_members"
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req, timeout=5) as resp:
-                members = json.loads(resp.read()).get("joined", {})
-            if mx_user in members:
-                room_id = rid
-                break
+            url = f"{homeserver}/_matrix/client/v3/rooms/{_q(rid)}/joined_members"
+            resp = client.get(url, headers=headers, timeout=5.0)
+            resp.raise_for_status()
+            return resp.json().get("joined", {}) or {}
         except Exception:
-            continue
-
-    if not room_id:
-        return False
+            return {}
 
-    try:
-        content: dict[str, Any] = {"msgtype": "m.text", "body": message}
-        try:
-            from miniassistant.matrix_bot import markdown_to_matrix_html
-            formatted = markdown_to_matrix_html(message)
-            if formatted:
-                content["format"] = "org.matrix.custom.html"
-                content["formatted_body"] = formatted
-        except Exception:
-            pass
-        send_url = f"{homeserver}/_matrix/client/v3/rooms/{urllib.parse.quote(room_id)}/send/m.room.message/{_uuid.uuid4()}"
-        body = json.dumps(content).encode()
-        req = urllib.request.Request(send_url, data=body, headers=headers, method="PUT")
-        urllib.request.urlopen(req, timeout=10)
-        return True
-    except Exception as e:
-        logger.warning("Matrix HTTP -> %s: %s", mx_user, e)
-        return False
+    new_index: dict[str, str] = {}
+    for rid, members in zip(rooms, _fan_out(_members, rooms)):
+        for user in members:
+            new_index.setdefault(user, rid)
+    return new_index
 
 
 def send_image(
@@ -252,9 +435,7 @@ def send_image(
 
 def _send_matrix_image(mc: dict[str, Any], image_path: str, caption: str = "", room_id: str | None = None, config_dir: str | None = None) -> str:
     """Sendet ein Bild via Matrix. Bevorzugt: room_id direkt, sonst an alle autorisierten User."""
-    try:
-        from miniassistant.matrix_bot import send_image_to_room, send_image_to_user
-    except ImportError:
+    if send_image_to_room is None or send_image_to_users is None:
         return "matrix-nio nicht verfügbar"
 
     if room_id:
@@ -262,33 +443,28 @@ def _send_matrix_image(mc: dict[str, Any], image_path: str, caption: str = "", r
         return f"Bild gesendet in Raum {room_id}" if ok else f"Bild-Upload fehlgeschlagen für Raum {room_id}"
 
     try:
-        from miniassistant.chat_auth import list_authorized
         authorized = list_authorized("matrix", config_dir)
     except Exception:
         authorized = []
     if not authorized:
         return "keine autorisierten Matrix-User"
 
-    sent_to: list[str] = []
-    for entry in authorized:
-        uid = entry.get("user_id", entry) if isinstance(entry, dict) else entry
-        if uid and isinstance(uid, str):
-            if send_image_to_user(uid, image_path, caption):
-                sent_to.append(uid)
-    return f"Bild gesendet an {len(sent_to)} User" if sent_to else "Bild senden fehlgeschlagen"
+    uids = [
+        uid for uid in (e.get("user_id", e) if isinstance(e, dict) else e for e in authorized)
+        if uid and isinstance(uid, str)
+    ]
+    # Ein Aufruf für alle User: Raumsuche + Uploads laufen im Bot-Loop (asyncio.gather), kein Thread-Pool
+    sent = sum(1 for ok in send_image_to_users(uids, image_path, caption).values() if ok)
+    return f"Bild gesendet an {sent} User" if sent else "Bild senden fehlgeschlagen"
 
 
 def _send_discord_image(dc: dict[str, Any], image_path: str, caption: str = "", channel_id: str | None = None, config_dir: str | None = None) -> str:
     """Sendet ein Bild via Discord API (multipart upload)."""
-    import urllib.request
-    import json
-    from pathlib import Path as _Path
-
     bot_token = dc.get("bot_token", "")
     if not bot_token:
         return "bot_token fehlt"
 
-    p = _Path(image_path)
+    p = Path(image_path)
     if not p.exists():
         return f"Datei nicht gefunden: {image_path}"
 
@@ -299,104 +475,22 @@ def _send_discord_image(dc: dict[str, Any], image_path: str, caption: str = "",
             return "ungueltige channel_id"
         channels.append(str(channel_id).strip())
     else:
-        try:
-            from miniassistant.chat_auth import list_authorized
-            authorized = list_authorized("discord", config_dir)
-        except Exception:
-            authorized = []
-        for entry in authorized:
-            discord_user_id = entry.get("user_id", entry) if isinstance(entry, dict) else entry
-            if not discord_user_id or not isinstance(discord_user_id, str):
-                continue
-            if not _is_valid_discord_id(discord_user_id):
-                continue
-            try:
-                create_url = "https://discord.com/api/v10/users/@me/channels"
-                create_data = json.dumps({"recipient_id": discord_user_id}).encode()
-                req = urllib.request.Request(
-                    create_url,
-                    data=create_data,
-                    headers={
-                        "Authorization": f"Bot {bot_token}",
-                        "Content-Type": "application/json",
-                        "User-Agent": "miniassistant/1.0",
-                    },
-                    method="POST",
-                )
-                with urllib.request.urlopen(req, timeout=10) as resp:
-                    cid = json.loads(resp.read()).get("id")
-                if cid and _is_valid_discord_id(cid):
-                    channels.append(str(cid))
-            except Exception as e:
-                logger.warning("Discord DM-Channel fuer %s fehlgeschlagen: %s", discord_user_id, e)
+        channels = _discord_dm_channels(bot_token, config_dir)
 
     if not channels:
         return "kein Ziel-Channel gefunden"
 
-    img_bytes = p.read_bytes()
-    mime = "image/png"
-    suffix = p.suffix.lower()
-    if suffix in (".jpg", ".jpeg"):
-        mime = "image/jpeg"
-    elif suffix == ".gif":
-        mime = "image/gif"
-    elif suffix == ".webp":
-        mime = "image/webp"
-
-    sent = 0
-    for cid in channels:
+    mime = _MIME_BY_EXT.get(p.suffix.lower(), "image/png")
+
+    def _one(cid: str) -> bool:
         try:
-            import uuid as _uuid
-            boundary = f"boundary-{_uuid.uuid4().hex}"
-
-            payload = {
-                "content": caption or "",
-                "attachments": [
-                    {
-                        "id": 0,
-                        "filename": p.name,
-                    }
-                ],
-            }
-
-            parts = []
-            parts.append(
-                (
-                    f"--{boundary}\r\n"
-                    f'Content-Disposition: form-data; name="payload_json"\r\n'
-                    f"Content-Type: application/json\r\n\r\n"
-                    f"{json.dumps(payload, ensure_ascii=False)}\r\n"
-                ).encode("utf-8")
-            )
-            parts.append(
-                (
-                    f"--{boundary}\r\n"
-                    f'Content-Disposition: form-data; name="files[0]"; filename="{p.name}"\r\n'
-                    f"Content-Type: {mime}\r\n\r\n"
-                ).encode("utf-8")
-                + img_bytes
-                + b"\r\n"
-            )
-            parts.append(f"--{boundary}--\r\n".encode("utf-8"))
-
-            body = b"".join(parts)
-
-            send_url = f"https://discord.com/api/v10/channels/{cid}/messages"
-            req = urllib.request.Request(
-                send_url,
-                data=body,
-                headers={
-                    "Authorization": f"Bot {bot_token}",
-                    "Content-Type": f"multipart/form-data; boundary={boundary}",
-                    "User-Agent": "miniassistant/1.0",
-                },
-                method="POST",
-            )
-            urllib.request.urlopen(req, timeout=30)
-            sent += 1
+            _discord_upload(bot_token, cid, caption or "", p.name, mime, p)
+            return True
         except Exception as e:
             logger.warning("Discord Bild -> Channel %s fehlgeschlagen: %s", cid, e)
+            return False
 
+    sent = sum(1 for ok in _fan_out(_one, channels) if ok)
     return f"Bild gesendet an {sent} Channel" if sent else "Bild senden fehlgeschlagen"
 
 
@@ -452,9 +546,7 @@ def send_audio(
 
 
 def _send_matrix_audio(mc: dict[str, Any], wav_bytes: bytes, room_id: str | None = None, config_dir: str | None = None) -> str:
-    try:
-        from miniassistant.matrix_bot import send_audio_to_room, send_audio_to_user
-    except ImportError:
+    if send_audio_to_room is None or send_audio_to_user is None:
         return "matrix-nio nicht verfügbar"
 
     if room_id:
@@ -462,26 +554,22 @@ def _send_matrix_audio(mc: dict[str, Any], wav_bytes: bytes, room_id: str | None
         return f"Audio gesendet in Raum {room_id}" if ok else f"Audio-Upload fehlgeschlagen für Raum {room_id}"
 
     try:
-        from miniassistant.chat_auth import list_authorized
         authorized = list_authorized("matrix", config_dir)
     except Exception:
         authorized = []
     if not authorized:
         return "keine autorisierten Matrix-User"
 
-    sent_to: list[str] = []
-    for entry in authorized:
-        uid = entry.get("user_id", entry) if isinstance(entry, dict) else entry
-        if uid and isinstance(uid, str):
-            if send_audio_to_user(uid, wav_bytes):
-                sent_to.append(uid)
-    return f"Audio gesendet an {len(sent_to)} User" if sent_to else "Audio senden fehlgeschlagen"
+    uids = [
+        uid for uid in (e.get("user_id", e) if isinstance(e, dict) else e for e in authorized)
+        if uid and isinstance(uid, str)
+    ]
+    oks = _fan_out(lambda uid: send_audio_to_user(uid, wav_bytes), uids)
+    sent = sum(1 for ok in oks if ok)
+    return f"Audio gesendet an {sent} User" if sent else "Audio senden fehlgeschlagen"
 
 
 def _send_discord_audio(dc: dict[str, Any], wav_bytes: bytes, channel_id: str | None = None, config_dir: str | None = None) -> str:
-    import urllib.request
-    import json
-
     bot_token = dc.get("bot_token", "")
     if not bot_token:
         return "bot_token fehlt"
@@ -493,108 +581,30 @@ def _send_discord_audio(dc: dict[str, Any], wav_bytes: bytes, channel_id: str |
             return "ungueltige channel_id"
         channels.append(str(channel_id).strip())
     else:
-        try:
-            from miniassistant.chat_auth import list_authorized
-            authorized = list_authorized("discord", config_dir)
-        except Exception:
-            authorized = []
-        for entry in authorized:
-            discord_user_id = entry.get("user_id", entry) if isinstance(entry, dict) else entry
-            if not discord_user_id or not isinstance(discord_user_id, str):
-                continue
-            if not _is_valid_discord_id(discord_user_id):
-                continue
-            try:
-                create_url = "https://discord.com/api/v10/users/@me/channels"
-                create_data = json.dumps({"recipient_id": discord_user_id}).encode()
-                req = urllib.request.Request(
-                    create_url,
-                    data=create_data,
-                    headers={
-                        "Authorization": f"Bot {bot_token}",
-                        "Content-Type": "application/json",
-                        "User-Agent": "miniassistant/1.0",
-                    },
-                    method="POST",
-                )
-                with urllib.request.urlopen(req, timeout=10) as resp:
-                    cid = json.loads(resp.read()).get("id")
-                if cid and _is_valid_discord_id(cid):
-                    channels.append(str(cid))
-            except Exception as e:
-                logger.warning("Discord DM-Channel fuer %s fehlgeschlagen: %s", discord_user_id, e)
+        channels = _discord_dm_channels(bot_token, config_dir)
 
     if not channels:
         return "kein Ziel-Channel gefunden"
 
-    sent = 0
-    for cid in channels:
+    def _one(cid: str) -> bool:
         try:
-            import uuid as _uuid
-            boundary = f"boundary-{_uuid.uuid4().hex}"
-
-            payload = {
-                "content": "",
-                "attachments": [
-                    {
-                        "id": 0,
-                        "filename": "response.wav",
-                    }
-                ],
-            }
-
-            parts = []
-            parts.append(
-                (
-                    f"--{boundary}\r\n"
-                    f'Content-Disposition: form-data; name="payload_json"\r\n'
-                    f"Content-Type: application/json\r\n\r\n"
-                    f"{json.dumps(payload, ensure_ascii=False)}\r\n"
-                ).encode("utf-8")
-            )
-            parts.append(
-                (
-                    f"--{boundary}\r\n"
-                    f'Content-Disposition: form-data; name="files[0]"; filename="response.wav"\r\n'
-                    f"Content-Type: audio/wav\r\n\r\n"
-                ).encode("utf-8")
-                + wav_bytes
-                + b"\r\n"
-            )
-            parts.append(f"--{boundary}--\r\n".encode("utf-8"))
-
-            body = b"".join(parts)
-
-            send_url = f"https://discord.com/api/v10/channels/{cid}/messages"
-            req = urllib.request.Request(
-                send_url,
-                data=body,
-                headers={
-                    "Authorization": f"Bot {bot_token}",
-                    "Content-Type": f"multipart/form-data; boundary={boundary}",
-                    "User-Agent": "miniassistant/1.0",
-                },
-                method="POST",
-            )
-            urllib.request.urlopen(req, timeout=30)
-            sent += 1
+            _discord_upload(bot_token, cid, "", "response.wav", "audio/wav", wav_bytes)
+            return True
         except Exception as e:
             logger.warning("Discord Audio -> Channel %s fehlgeschlagen: %s", cid, e)
+            return False
 
+    sent = sum(1 for ok in _fan_out(_one, channels) if ok)
     return f"Audio gesendet an {sent} Channel" if sent else "Audio senden fehlgeschlagen"
 
 
 def _send_discord(dc: dict[str, Any], message: str, config_dir: str | None = None) -> str:
-    """Sendet via Discord Bot API (kein laufender Bot noetig)."""
-    import urllib.request
-    import json
-
+    """Sendet via Discord Bot API (kein laufender Bot noetig). Alle User parallel."""
     bot_token = dc.get("bot_token", "")
     if not bot_token:
         return "bot_token fehlt"
 
     try:
-        from miniassistant.chat_auth import list_authorized
         authorized = list_authorized("discord", config_dir)
     except Exception:
         authorized = []
@@ -602,59 +612,42 @@ def _send_discord(dc: dict[str, Any], message: str, config_dir: str | None = Non
     if not authorized:
         return "keine autorisierten Discord-User"
 
-    sent_to: list[str] = []
+    user_ids: list[str] = []
     for entry in authorized:
         discord_user_id = entry.get("user_id", entry) if isinstance(entry, dict) else entry
-        if not discord_user_id or not isinstance(discord_user_id, str):
-            continue
-        if not _is_valid_discord_id(discord_user_id):
-            continue
-        try:
-            # DM-Channel erstellen
-            create_url = "https://discord.com/api/v10/users/@me/channels"
-            create_data = json.dumps({"recipient_id": discord_user_id}).encode()
-            req = urllib.request.Request(
-                create_url,
-                data=create_data,
-                headers={
-                    "Authorization": f"Bot {bot_token}",
-                    "Content-Type": "application/json",
-                    "User-Agent": "miniassistant/1.0",
-                },
-                method="POST",
-            )
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                channel_id = json.loads(resp.read()).get("id")
-
-            if not channel_id or not _is_valid_discord_id(channel_id):
-                continue
+        if discord_user_id and isinstance(discord_user_id, str) and _is_valid_discord_id(discord_user_id):
+            user_ids.append(discord_user_id)
 
-            # Nachricht senden
-            send_url = f"https://discord.com/api/v10/channels/{channel_id}/messages"
-            body = json.dumps({"content": message}).encode()
-            req = urllib.request.Request(
-                send_url,
-                data=body,
-                headers={
-                    "Authorization": f"Bot {bot_token}",
-                    "Content-Type": "application/json",
-                    "User-Agent": "miniassistant/1.0",
-                },
-                method="POST",
-            )
-            urllib.request.urlopen(req, timeout=10)
-            sent_to.append(discord_user_id)
+    def _one(discord_user_id: str) -> bool:
+        try:
+            for attempt in range(2):
+                # DM-Channel holen (gecacht) bzw. erstellen
+                channel_id = _discord_dm_channel(bot_token, discord_user_id)
+                if not channel_id:
+                    return False
+                # Nachricht senden
+                resp = _http().post(
+                    f"{_DISCORD_API}/channels/{channel_id}/messages",
+                    json={"content": message},
+                    headers=_discord_headers(bot_token),
+                )
+                if resp.status_code == 404 and attempt == 0:
+                    # Gecachter Channel existiert nicht mehr → einmal neu anlegen und wiederholen
+                    _forget_dm_channel(channel_id)
+                    continue
+                resp.raise_for_status()
+                return True
+            return False
         except Exception as e:
             logger.warning("Discord -> %s fehlgeschlagen: %s", discord_user_id, e)
+            return False
 
-    return f"gesendet an {len(sent_to)} User" if sent_to else "senden fehlgeschlagen"
+    sent = sum(1 for ok in _fan_out(_one, user_ids) if ok)
+    return f"gesendet an {sent} User" if sent else "senden fehlgeschlagen"
 
 
 def _send_discord_to_channel(dc: dict[str, Any], message: str, channel_id: str) -> str:
     """Sendet eine Nachricht direkt in einen bestimmten Discord-Channel."""
-    import urllib.request
-    import json
-
     bot_token = dc.get("bot_token", "")
     if not bot_token:
         return "bot_token fehlt"
@@ -663,19 +656,12 @@ def _send_discord_to_channel(dc: dict[str, Any], message: str, channel_id: str)
         return "ungueltige channel_id"
 
     try:
-        send_url = f"https://discord.com/api/v10/channels/{channel_id}/messages"
-        body = json.dumps({"content": message}).encode()
-        req = urllib.request.Request(
-            send_url,
-            data=body,
-            headers={
-                "Authorization": f"Bot {bot_token}",
-                "Content-Type": "application/json",
-                "User-Agent": "miniassistant/1.0",
-            },
-            method="POST",
+        resp = _http().post(
+            f"{_DISCORD_API}/channels/{channel_id}/messages",
+            json={"content": message},
+            headers=_discord_headers(bot_token),
         )
-        urllib.request.urlopen(req, timeout=10)
+        resp.raise_for_status()
         logger.info("Discord -> Channel %s", channel_id)
         return f"gesendet in Channel {channel_id}"
     except Exception as e:
@@ -3,13 +3,39 @@ Ollama-API: Modelle auflisten, Modell-Details/Caps, Chat mit num_ctx, think und
 """
 from __future__ import annotations
 
+import asyncio
+import atexit
+import base64
+import functools
+import hashlib
 import logging
-from typing import Any
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Iterable, Iterator
 
 import httpx
 
+from miniassistant._json import dumps as _json_dumps_raw, loads as _json_loads
+
 _log = logging.getLogger("miniassistant.ollama_client")
 
+def _json_default(obj: Any) -> Any:
+    """Rohe Bild-Bytes erst beim Serialisieren base64-kodieren (kein Zwischen-String im Message-Dict)."""
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return base64.b64encode(obj).decode("ascii")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Chat-Bodies serialisieren; rohe Bild-Bytes werden via _json_default zu base64."""
+    return _json_dumps_raw(obj, default=_json_default)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 def _auth_headers(api_key: str | None) -> dict[str, str]:
     """Erzeugt Authorization-Header wenn api_key gesetzt."""
@@ -18,99 +44,259 @@ def _auth_headers(api_key: str | None) -> dict[str, str]:
     return {}
 
 
+def cache_key_hash(*parts: str | bytes | None) -> str:
+    """Kurzer, stabiler Hash für Cache-Keys (API-Keys, Request-Bodies): Secrets/große Payloads
+    landen nie selbst als Key im Speicher. Teile werden mit NUL getrennt, None zählt als leer."""
+    h = hashlib.blake2b(digest_size=16)
+    for i, part in enumerate(parts):
+        if i:
+            h.update(b"\0")
+        if part:
+            h.update(part.encode("utf-8") if isinstance(part, str) else part)
+    return h.hexdigest()
+
+
+# Prozessweite HTTP-Clients pro (base_url, api_key, http2): Keep-Alive-Pool statt neuem TCP/TLS-Handshake pro Request.
+# httpx.Client ist thread-safe; Timeouts werden pro Request übergeben.
+_CLIENTS: dict[tuple[str, str | None, bool], httpx.Client] = {}
+_CLIENTS_LOCK = threading.Lock()
+_H2_AVAILABLE: bool | None = None
+_H2_WARNED = False
+
+
+def h2_available() -> bool:
+    """True wenn das h2-Paket installiert ist (einmal pro Prozess geprüft, ohne Log)."""
+    global _H2_AVAILABLE
+    if _H2_AVAILABLE is None:
+        import importlib.util
+        _H2_AVAILABLE = importlib.util.find_spec("h2") is not None
+    return _H2_AVAILABLE
+
+
+def http2_enabled(wanted: bool) -> bool:
+    """HTTP/2 nur wenn gewünscht (providers.<name>.http2) UND das h2-Paket installiert ist (pip install httpx[http2]).
+    Warnt einmalig, wenn http2 explizit gesetzt ist, h2 aber fehlt."""
+    global _H2_WARNED
+    if not wanted:
+        return False
+    if not h2_available():
+        if not _H2_WARNED:
+            _H2_WARNED = True
+            _log.warning("http2: true gesetzt, aber Paket 'h2' fehlt (pip install 'httpx[http2]') — nutze HTTP/1.1")
+        return False
+    return True
+
+
+def client_limits(http2: bool) -> httpx.Limits:
+    # HTTP/2 multiplexed viele Streams über eine Verbindung → weniger Verbindungen, längeres Keep-Alive
+    if http2:
+        return httpx.Limits(max_connections=50, max_keepalive_connections=25, keepalive_expiry=30.0)
+    return httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+
+def _get_client(base_url: str, api_key: str | None = None, http2: bool = False) -> httpx.Client:
+    http2 = http2_enabled(http2)
+    key = (base_url.rstrip("/"), api_key, http2)
+    client = _CLIENTS.get(key)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(key)
+            if client is None:
+                client = httpx.Client(
+                    timeout=30.0,
+                    headers=_auth_headers(api_key),
+                    limits=client_limits(http2),
+                    http2=http2,
+                )
+                _CLIENTS[key] = client
+    return client
+
+
+def _close_clients() -> None:
+    with _CLIENTS_LOCK:
+        for client in _CLIENTS.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+        _CLIENTS.clear()
+
+
+atexit.register(_close_clients)
+
+# Async-Gegenstück: httpx.AsyncClient ist an den Event-Loop gebunden → pro Loop ein Satz Clients.
+# WeakKeyDictionary: beendete Loops (z. B. asyncio.run) nehmen ihre Clients mit.
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple[str, str | None, bool], httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_async_client(base_url: str, api_key: str | None = None, http2: bool = False) -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    per_loop = _ASYNC_CLIENTS.get(loop)
+    if per_loop is None:
+        per_loop = _ASYNC_CLIENTS[loop] = {}
+    http2 = http2_enabled(http2)
+    key = (base_url.rstrip("/"), api_key, http2)
+    client = per_loop.get(key)
+    if client is None or client.is_closed:
+        client = per_loop[key] = httpx.AsyncClient(
+            timeout=30.0,
+            headers=_auth_headers(api_key),
+            limits=client_limits(http2),
+            http2=http2,
+        )
+    return client
+
+
+# /api/show-Cache: (base_url, name, api_key) -> (gültig_bis, Antwort-Dict oder Fehlermeldung als str).
+# Capability-Checks (thinking/tools/vision) fragen pro Turn mehrfach dasselbe Modell ab.
+# Fehler (404 bei vLLM/llama.cpp, Server down) werden kürzer gecacht → keine Retry-Stürme.
+_SHOW_TTL = 300.0
+_SHOW_NEG_TTL = 60.0
+_SHOW_CACHE: dict[tuple[str, str, str | None], tuple[float, Any]] = {}
+
+
+def clear_show_model_cache(base_url: str | None = None) -> None:
+    """Leert den show_model-Cache (komplett oder nur für base_url)."""
+    if base_url is None:
+        _SHOW_CACHE.clear()
+        return
+    base = base_url.rstrip("/")
+    for key in [k for k in _SHOW_CACHE if k[0] == base]:
+        _SHOW_CACHE.pop(key, None)
+
+
 def list_models(base_url: str, api_key: str | None = None) -> list[dict[str, Any]]:
-    """GET /api/tags – Liste aller Modelle."""
+    """GET /api/tags – Liste aller Modelle. Leert den show_model-Cache dieses Servers (neu gepullte Modelle)."""
+    clear_show_model_cache(base_url)
     url = f"{base_url.rstrip('/')}/api/tags"
-    with httpx.Client(timeout=30.0, headers=_auth_headers(api_key)) as client:
-        r = client.get(url)
-        r.raise_for_status()
-        data = r.json()
+    r = _get_client(base_url, api_key).get(url)
+    r.raise_for_status()
+    data = r.json()
     return data.get("models") or []
 
 
 def show_model(base_url: str, name: str, api_key: str | None = None) -> dict[str, Any]:
-    """POST /api/show – Modell-Details inkl. capabilities."""
-    url = f"{base_url.rstrip('/')}/api/show"
-    with httpx.Client(timeout=30.0, headers=_auth_headers(api_key)) as client:
-        r = client.post(url, json={"name": name})
+    """POST /api/show – Modell-Details inkl. capabilities. Ergebnis 300s gecacht (nur lesen, nicht verändern)."""
+    key = (base_url.rstrip("/"), name, api_key)
+    now = time.monotonic()
+    hit = _SHOW_CACHE.get(key)
+    if hit is not None and hit[0] > now:
+        if isinstance(hit[1], str):
+            # Negativ-Cache hält nur die Meldung: pro Treffer eine frische Exception, kein geteiltes
+            # Objekt mit wachsendem __traceback__ (und daran hängenden Frames) über Threads hinweg
+            raise RuntimeError(f"/api/show fehlgeschlagen (gecacht): {hit[1]}")
+        return hit[1]
+    url = f"{key[0]}/api/show"
+    try:
+        r = _get_client(base_url, api_key).post(url, json={"name": name})
         r.raise_for_status()
-        return r.json()
+        info = r.json()
+    except Exception as e:
+        _SHOW_CACHE[key] = (now + _SHOW_NEG_TTL, f"{type(e).__name__}: {e}")
+        raise
+    _SHOW_CACHE[key] = (now + _SHOW_TTL, info)
+    return info
 
 
-def model_supports_thinking(base_url: str, name: str) -> bool:
-    """True wenn das Modell Reasoning/Thinking unterstützt (für Anzeige in der Modellliste)."""
+show_model.cache_clear = clear_show_model_cache  # type: ignore[attr-defined]
+
+
+# Heuristik: bekannte Vision-Modelle bzw. Modelle die bei Tool-Calls 400/Fehler werfen
+_VISION_PATTERNS = ("llava", "gemma3", "minicpm-v", "llama3.2-vision", "bakllava", "moondream", "nanollava")
+_NO_TOOLS = ("deepseek-r1", "phi4-reasoning")
+# Vorkompiliert: ein Durchlauf über den Namen statt einer `in`-Prüfung pro Muster
+_VISION_RE = re.compile("|".join(map(re.escape, _VISION_PATTERNS)))
+_NO_TOOLS_RE = re.compile("|".join(map(re.escape, _NO_TOOLS)))
+_TOOL_CALLING_RE = re.compile(r"tool[-_]calling")
+# OpenAI o1/o3/o4 (Präfix oder "o1-…" im Namen) sowie r1/reasoning (deepseek-r1, phi4-reasoning, …)
+_THINKING_RE = re.compile(r"^o[134]|o[134]-|r1|reasoning")
+_QWEN3_THINKING_RE = re.compile(r"qwen3.*(?:80k|14b)|(?:80k|14b).*qwen3")
+
+
+def _name_suggests_thinking(n: str) -> bool:
+    """Namens-Heuristik für Reasoning-Modelle (n bereits lowercase)."""
+    return _THINKING_RE.search(n) is not None or _QWEN3_THINKING_RE.search(n) is not None
+
+
+def _name_blocks_tools(n: str) -> bool:
+    """True wenn der Name auf der Tool-Blocklist steht (n bereits lowercase)."""
+    if _NO_TOOLS_RE.search(n) is None:
+        return False
+    # Ausnahme: Community-Varianten mit explizitem Tool-Support
+    return _TOOL_CALLING_RE.search(n) is None
+
+
+def get_model_caps(base_url: str, name: str, api_key: str | None = None) -> dict[str, bool]:
+    """Alle Capabilities eines Modells aus EINEM /api/show (gecacht) plus Namens-Heuristiken:
+    {"thinking": …, "tools": …, "vision": …}. Schlägt /api/show fehl (vLLM, OpenAI API) → nur Heuristik."""
     n = (name or "").lower()
-    
-    # OpenAI Reasoning-Modelle automatisch erkennen
-    if "o1-" in n or n.startswith("o1"):
-        return True
-    if "o3-" in n or n.startswith("o3"):
-        return True
-    if "o4-" in n or n.startswith("o4"):
-        return True
-    
-    # Heuristik: bekannte Reasoning-Modelle (funktioniert für Ollama, vLLM, llama.cpp, etc.)
-    if "r1" in n or "reasoning" in n or "deepseek-r1" in n:
-        return True
-    if "qwen3" in n and ("80k" in n or "14b" in n):
-        return True
-    if "phi4-reasoning" in n:
-        return True
-    
-    # Nur für Ollama: /api/show aufrufen
+    caps: list[Any] = []
     try:
-        info = show_model(base_url, name)
-        caps = info.get("capabilities") or []
-        if isinstance(caps, list) and ("thinking" in caps or "reasoning" in caps):
-            return True
+        info_caps = show_model(base_url, name, api_key).get("capabilities") or []
+        if isinstance(info_caps, list):
+            caps = info_caps
     except Exception:
-        # show_model schlägt fehl (z.B. bei vLLM, OpenAI API) → Heuristik verwenden
         pass
-    return False
+    return {
+        "thinking": _name_suggests_thinking(n) or "thinking" in caps or "reasoning" in caps,
+        # Default True — die meisten Modelle (qwen3, gemma3, llama3, mistral, etc.) können Tools,
+        # melden es aber nicht in capabilities. Nur explizit bekannte Ausnahmen werden geblockt.
+        "tools": not _name_blocks_tools(n),
+        "vision": "vision" in caps or "image" in caps or _VISION_RE.search(n) is not None,
+    }
+
+
+_CAPS_PROBE_WORKERS = 8
+
+
+def list_models_with_caps(base_url: str, api_key: str | None = None) -> list[dict[str, Any]]:
+    """list_models + Capabilities aller Modelle. Die /api/show-Abfragen laufen parallel (geteilter Client)
+    und landen im show_model-Cache — folgende model_supports_*-Aufrufe kosten keinen Request mehr.
+    Jeder Eintrag bekommt zusätzlich "caps": {"thinking", "tools", "vision"}."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    models = list_models(base_url, api_key)
+    names = [m.get("name") or m.get("model") or "" for m in models]
+
+    def _probe(name: str) -> None:
+        if not name:
+            return
+        try:
+            show_model(base_url, name, api_key)
+        except Exception:
+            pass  # Fehler ist negativ gecacht; get_model_caps fällt auf die Heuristik zurück
+
+    if len(names) > 1:
+        with ThreadPoolExecutor(max_workers=min(_CAPS_PROBE_WORKERS, len(names))) as pool:
+            list(pool.map(_probe, names))
+    return [{**m, "caps": get_model_caps(base_url, n, api_key)} for m, n in zip(models, names)]
+
+
+def model_supports_thinking(base_url: str, name: str) -> bool:
+    """True wenn das Modell Reasoning/Thinking unterstützt (für Anzeige in der Modellliste)."""
+    # Namens-Heuristik zuerst — spart /api/show bei bekannten Reasoning-Modellen
+    if _name_suggests_thinking((name or "").lower()):
+        return True
+    return get_model_caps(base_url, name)["thinking"]
 
 
 def model_supports_tools(base_url: str, name: str) -> bool:
     """True wenn das Modell Tool/Function-Calling unterstützt. Sonst Tools nicht mitschicken (z. B. DeepSeek-R1 offiziell → 400).
     Default: True — die meisten modernen Modelle unterstützen Tools, melden es aber nicht in capabilities.
-    Nur explizit bekannte Ausnahmen werden geblockt."""
-    n = (name or "").lower()
-    # Blocklist: Modelle die bei Tool-Calls 400/Fehler werfen
-    _NO_TOOLS = ("deepseek-r1", "phi4-reasoning")
-    for pattern in _NO_TOOLS:
-        if pattern in n:
-            # Ausnahme: Community-Varianten mit explizitem Tool-Support
-            if "tool-calling" in n or "tool_calling" in n:
-                return True
-            return False
-    try:
-        info = show_model(base_url, name)
-        caps = info.get("capabilities") or []
-        if isinstance(caps, list) and ("tool_use" in caps or "tools" in caps):
-            return True
-    except Exception:
-        pass
-    # Default True — die meisten Modelle (qwen3, gemma3, llama3, mistral, etc.) können Tools
-    return True
+    Nur explizit bekannte Ausnahmen werden geblockt — reine Namens-Heuristik, kein /api/show nötig
+    (base_url bleibt für API-Kompatibilität; get_model_caps liefert denselben Wert)."""
+    return not _name_blocks_tools((name or "").lower())
 
 
 def model_supports_vision(base_url: str, name: str) -> bool:
     """True wenn das Modell Vision/Bildanalyse unterstützt (z.B. llava, gemma3, minicpm-v)."""
-    try:
-        info = show_model(base_url, name)
-        caps = info.get("capabilities") or []
-        if isinstance(caps, list) and ("vision" in caps or "image" in caps):
-            return True
-    except Exception:
-        pass
-    # Heuristik: bekannte Vision-Modelle
-    n = (name or "").lower()
-    _VISION_PATTERNS = ("llava", "gemma3", "minicpm-v", "llama3.2-vision", "bakllava", "moondream", "nanollava")
-    return any(p in n for p in _VISION_PATTERNS)
+    return get_model_caps(base_url, name)["vision"]
 
 
-def get_vision_models(config: dict[str, Any]) -> list[str]:
-    """Gibt die Liste der Vision-Modelle zurück (kann leer sein)."""
-    val = config.get("vision") or []
+def _coerce_model_list(val: Any) -> list[str]:
+    """Normalisiert eine Modell-Referenz aus der Config (Liste, {model: …}-Dict oder String) zu einer Liste."""
     if isinstance(val, list):
         return val
     if isinstance(val, dict):
@@ -121,17 +307,14 @@ def get_vision_models(config: dict[str, Any]) -> list[str]:
     return []
 
 
+def get_vision_models(config: dict[str, Any]) -> list[str]:
+    """Gibt die Liste der Vision-Modelle zurück (kann leer sein)."""
+    return _coerce_model_list(config.get("vision"))
+
+
 def get_image_generation_models(config: dict[str, Any]) -> list[str]:
     """Gibt die Liste der Image-Generation-Modelle zurück (kann leer sein)."""
-    val = config.get("image_generation") or []
-    if isinstance(val, list):
-        return val
-    if isinstance(val, dict):
-        m = (val.get("model") or "").strip()
-        return [m] if m else []
-    if isinstance(val, str) and val.strip():
-        return [val.strip()]
-    return []
+    return _coerce_model_list(config.get("image_generation"))
 
 
 def _find_provider(providers: dict[str, Any], name: str) -> str | None:
@@ -149,13 +332,14 @@ def _find_provider(providers: dict[str, Any], name: str) -> str | None:
 
 def _split_provider_prefix(model: str) -> tuple[str | None, str]:
     """Extrahiert Provider-Präfix aus Modellname. 'ollama2/llama3:8b' → ('ollama2', 'llama3:8b'). 'qwen3:14b' → (None, 'qwen3:14b')."""
-    if not model or "/" not in model:
+    i = model.find("/") if model else -1
+    if i < 0:
         return None, model or ""
-    prefix, _, name = model.partition("/")
+    prefix = model[:i]
     # Nur als Provider werten wenn kein Punkt/Doppelpunkt im Prefix (sonst ist es z.B. ein Registry-Pfad)
     if "." in prefix or ":" in prefix:
         return None, model
-    return prefix, name
+    return prefix, model[i + 1:]
 
 
 def get_provider_config(config: dict[str, Any], model: str | None = None) -> tuple[dict[str, Any], str | None]:
@@ -163,6 +347,14 @@ def get_provider_config(config: dict[str, Any], model: str | None = None) -> tup
     'ollama2/llama3:8b' → (providers['ollama2'], 'llama3:8b')
     'qwen3:14b' → (providers['ollama'], 'qwen3:14b')
     None → (providers['ollama'], None)"""
+    if not model:
+        return _lookup_provider_config(config, model)
+    entry = _resolved_model(config, model)
+    return entry.provider, entry.clean
+
+
+def _lookup_provider_config(config: dict[str, Any], model: str | None) -> tuple[dict[str, Any], str | None]:
+    """Ungecachte Auflösung für get_provider_config (läuft einmal pro Modellname, siehe build_alias_index)."""
     providers = config.get("providers") or {}
     if not model:
         default_name = next(iter(providers), "ollama")
@@ -177,10 +369,174 @@ def get_provider_config(config: dict[str, Any], model: str | None = None) -> tup
     return providers.get(default_name) or {}, model
 
 
+@dataclass(slots=True)
+class ResolvedModel:
+    """Vorberechnete Provider-Daten eines Modellnamens: ein dict-get statt Provider-Walk pro Helper-Aufruf."""
+    provider: dict[str, Any]
+    clean: str | None
+    provider_type: str
+    options: dict[str, Any]
+    num_ctx: int
+    think: Any
+    base_url: str
+    api_key: str | None
+
+
+@dataclass(slots=True)
+class AliasIndex:
+    """Flache Tabelle Modellname → ResolvedModel. providers = das dict, aus dem sie gebaut wurde
+    (Identitäts-Check: neue Config → neuer Index). Unbekannte Namen werden beim ersten Lookup ergänzt."""
+    providers: Any
+    models: dict[str, ResolvedModel] = field(default_factory=dict)
+    resolved: dict[str, str | None] = field(default_factory=dict)
+    # Modellname → erster Provider (Config-Reihenfolge), der ihn als default/alias/list führt
+    owners: dict[str, str] = field(default_factory=dict)
+    canonical: dict[str, str] = field(default_factory=dict)
+
+
+def _merge_model_options(prov: dict[str, Any], clean: str | None, model_name: str) -> dict[str, Any]:
+    """Provider-globale options + model_options[model], ohne MA-interne Keys und ohne num_ctx=0."""
+    base = dict(prov.get("options") or {})
+    per_model = prov.get("model_options") or {}
+    lookup_name = clean or model_name
+    if isinstance(per_model, dict) and lookup_name:
+        overlay = per_model.get(lookup_name)
+        if isinstance(overlay, dict):
+            base = {**base, **overlay}
+    # 'think' ist kein Ollama-Option sondern Top-Level-Parameter → nicht in options mitschicken
+    base.pop("think", None)
+    # 'slot_cache' ist ein MA-internes Flag — nicht an Ollama/llama.cpp senden
+    base.pop("slot_cache", None)
+    # 'image_edit_strength' ist MA-intern (Image-Edit) — kein Chat-Option
+    base.pop("image_edit_strength", None)
+    # num_ctx=0 bedeutet "nicht setzen, Server-Default nutzen"
+    if "num_ctx" in base and not base["num_ctx"]:
+        base.pop("num_ctx")
+    return base
+
+
+def _build_resolved(config: dict[str, Any], model_name: str | None) -> ResolvedModel:
+    prov, clean = _lookup_provider_config(config, model_name)
+    options = _merge_model_options(prov, clean, model_name or "")
+    # num_ctx: model_options[model].num_ctx, sonst Provider-num_ctx, sonst 32768 (0 = nicht gesetzt)
+    num_ctx = 32768
+    for num in (options.get("num_ctx"), prov.get("num_ctx")):
+        try:
+            if num is not None and int(num) > 0:
+                num_ctx = int(num)
+                break
+        except (TypeError, ValueError):
+            continue
+    per_model = prov.get("model_options") or {}
+    lookup = clean or model_name
+    model_cfg = per_model.get(lookup) if isinstance(per_model, dict) and lookup else None
+    think = model_cfg.get("think") if isinstance(model_cfg, dict) else None
+    if think is None:
+        think = prov.get("think")
+    return ResolvedModel(
+        provider=prov,
+        clean=clean,
+        provider_type=str(prov.get("type", "ollama")).lower().strip(),
+        options=options,
+        num_ctx=num_ctx,
+        think=think,
+        base_url=prov.get("base_url", "http://127.0.0.1:11434"),
+        api_key=prov.get("api_key") or None,
+    )
+
+
+def build_alias_index(config: dict[str, Any]) -> AliasIndex:
+    """Läuft einmal über alle Provider und löst jeden bekannten Namen (default, aliases, list, model_options —
+    mit und ohne Provider-Präfix) vorab auf. Gecacht pro providers-dict in get_alias_index."""
+    index = AliasIndex(providers=config.get("providers"))
+    providers = config.get("providers") or {}
+    names: set[str] = set()
+    for pname, pcfg in providers.items():
+        if not isinstance(pcfg, dict):
+            continue
+        pm = pcfg.get("models") or {}
+        known: set[str] = set()
+        if pm.get("default"):
+            known.add(pm["default"])
+        aliases = pm.get("aliases") or {}
+        known.update(aliases.keys())
+        known.update(v for v in aliases.values() if isinstance(v, str))
+        known.update(n for n in (pm.get("list") or []) if isinstance(n, str))
+        for n in known:
+            if isinstance(n, str):
+                index.owners.setdefault(n, pname)
+        known.update(pcfg.get("model_options") or {})
+        for n in known:
+            if n and isinstance(n, str):
+                names.add(n)
+                names.add(f"{pname}/{n}")
+    for n in names:
+        try:
+            index.models[n] = _build_resolved(config, n)
+            index.resolved[n] = _resolve_model(config, n)
+        except Exception:
+            # Kaputte Einträge erst beim tatsächlichen Lookup melden (wie bisher)
+            index.models.pop(n, None)
+    return index
+
+
+# Alias-Indizes außerhalb des Config-dicts (das bleibt JSON-serialisierbar), keyed per id(providers).
+# Der Index hält seine providers-Referenz → die id kann nicht wiederverwendet werden, solange er im Cache
+# liegt; der Identitäts-Check schützt zusätzlich. Shallow-Copies aus load_config teilen providers → einen Index.
+_ALIAS_INDEXES: "OrderedDict[int, AliasIndex]" = OrderedDict()
+_ALIAS_INDEXES_LOCK = threading.Lock()
+_ALIAS_INDEXES_MAX = 8
+
+
+def get_alias_index(config: dict[str, Any]) -> AliasIndex:
+    """Alias-Index für die Provider dieser Config (bei Bedarf gebaut)."""
+    providers = config.get("providers")
+    key = id(providers)
+    with _ALIAS_INDEXES_LOCK:
+        idx = _ALIAS_INDEXES.get(key)
+        if idx is not None and idx.providers is providers:
+            _ALIAS_INDEXES.move_to_end(key)
+            return idx
+    idx = build_alias_index(config)
+    with _ALIAS_INDEXES_LOCK:
+        _ALIAS_INDEXES[key] = idx
+        _ALIAS_INDEXES.move_to_end(key)
+        while len(_ALIAS_INDEXES) > _ALIAS_INDEXES_MAX:
+            _ALIAS_INDEXES.popitem(last=False)
+    return idx
+
+
+def forget_alias_index(providers: Any) -> None:
+    """Index zu diesem providers-dict verwerfen (nach In-place-Änderung, z. B. save_config)."""
+    with _ALIAS_INDEXES_LOCK:
+        idx = _ALIAS_INDEXES.get(id(providers))
+        if idx is not None and idx.providers is providers:
+            del _ALIAS_INDEXES[id(providers)]
+
+
+def _resolved_model(config: dict[str, Any], model_name: str | None) -> ResolvedModel:
+    if not model_name:
+        return _build_resolved(config, model_name)
+    models = get_alias_index(config).models
+    entry = models.get(model_name)
+    if entry is None:
+        entry = models[model_name] = _build_resolved(config, model_name)
+    return entry
+
+
 def resolve_model(config: dict[str, Any], model: str | None, _depth: int = 0) -> str | None:
     """Ersetzt Alias durch echten Modellnamen. Provider-Präfix wird durchgereicht (z.B. 'ollama2/big' → 'ollama2/llama3.3:70b').
     Ohne Prefix: sucht Alias in ALLEN Providern. Bei Duplikat → Default-Provider gewinnt.
     _depth: recursion guard against circular aliases (max 10)."""
+    if not model or _depth:
+        return _resolve_model(config, model, _depth)
+    resolved = get_alias_index(config).resolved
+    if model not in resolved:
+        resolved[model] = _resolve_model(config, model)
+    return resolved[model]
+
+
+def _resolve_model(config: dict[str, Any], model: str | None, _depth: int = 0) -> str | None:
     if _depth > 10:
         _log.warning("resolve_model: max recursion depth reached for model=%s (circular alias?)", model)
         return model
@@ -190,7 +546,7 @@ def resolve_model(config: dict[str, Any], model: str | None, _depth: int = 0) ->
         if not default:
             return None
         # Default kann selbst ein Alias sein → auflösen
-        return resolve_model(config, default, _depth + 1)
+        return _resolve_model(config, default, _depth + 1)
     prefix, clean = _split_provider_prefix(model)
     providers = config.get("providers") or {}
     if prefix:
@@ -209,7 +565,7 @@ def resolve_model(config: dict[str, Any], model: str | None, _depth: int = 0) ->
         resolved = default_aliases[model]
         # Guard against circular aliases (alias points back to itself or to another alias chain)
         if resolved != model:
-            return resolve_model(config, resolved, _depth + 1)
+            return _resolve_model(config, resolved, _depth + 1)
         return resolved
     # Dann alle anderen Provider durchsuchen
     for prov_name, prov_cfg in providers.items():
@@ -233,57 +589,33 @@ def canonical_model_name(config: dict[str, Any], model: str | None) -> str:
     unverändert."""
     if not model:
         return model or ""
+    index = get_alias_index(config)
+    name = index.canonical.get(model)
+    if name is None:
+        name = index.canonical[model] = _canonical_model_name(config, model, index)
+    return name
+
+
+def _canonical_model_name(config: dict[str, Any], model: str, index: AliasIndex) -> str:
     resolved = resolve_model(config, model) or model
-    providers = config.get("providers") or {}
     prefix, clean = _split_provider_prefix(resolved)
     if prefix:
-        real = _find_provider(providers, prefix)
+        real = _find_provider(config.get("providers") or {}, prefix)
         return f"{real}/{clean}" if real else resolved
-
-    def _owns(prov_cfg: dict[str, Any], name: str) -> bool:
-        pm = prov_cfg.get("models") or {}
-        names: set[str] = set()
-        if pm.get("default"):
-            names.add(pm["default"])
-        al = pm.get("aliases") or {}
-        names.update(al.keys())
-        names.update(al.values())
-        names.update(pm.get("list") or [])
-        return name in names
-
-    # Besitzer-Provider suchen (Default zuerst, da Insertion-Order)
-    for pname, pcfg in providers.items():
-        if isinstance(pcfg, dict) and _owns(pcfg, clean):
-            return f"{pname}/{clean}"
-    return resolved  # unbekannt (z.B. TTS-Stimme) → unverändert
+    # Besitzer-Provider (Default zuerst, da Insertion-Order) — vorberechnet in build_alias_index
+    owner = index.owners.get(clean)
+    return f"{owner}/{clean}" if owner else resolved  # unbekannt (z.B. TTS-Stimme) → unverändert
 
 
 def get_provider_type(config: dict[str, Any], model_name: str) -> str:
     """Provider-Typ für ein Modell: 'ollama' (default), 'claude-code', etc."""
-    prov, _ = get_provider_config(config, model_name)
-    return str(prov.get("type", "ollama")).lower().strip()
+    return _resolved_model(config, model_name).provider_type
 
 
 def get_options_for_model(config: dict[str, Any], model_name: str) -> dict[str, Any]:
     """Optionen für ein Modell: Provider-globale options + model_options[model]. Provider wird aus Präfix aufgelöst."""
-    prov, clean = get_provider_config(config, model_name)
-    base = dict(prov.get("options") or {})
-    per_model = prov.get("model_options") or {}
-    lookup_name = clean or model_name
-    if isinstance(per_model, dict) and lookup_name:
-        overlay = per_model.get(lookup_name)
-        if isinstance(overlay, dict):
-            base = {**base, **overlay}
-    # 'think' ist kein Ollama-Option sondern Top-Level-Parameter → nicht in options mitschicken
-    base.pop("think", None)
-    # 'slot_cache' ist ein MA-internes Flag — nicht an Ollama/llama.cpp senden
-    base.pop("slot_cache", None)
-    # 'image_edit_strength' ist MA-intern (Image-Edit) — kein Chat-Option
-    base.pop("image_edit_strength", None)
-    # num_ctx=0 bedeutet "nicht setzen, Server-Default nutzen"
-    if "num_ctx" in base and not base["num_ctx"]:
-        base.pop("num_ctx")
-    return base
+    # Kopie: Aufrufer dürfen das Ergebnis verändern, der Index bleibt unberührt
+    return dict(_resolved_model(config, model_name).options)
 
 
 def get_image_edit_strength_for_model(config: dict[str, Any], model_name: str) -> float:
@@ -314,52 +646,33 @@ def get_image_edit_strength_for_model(config: dict[str, Any], model_name: str) -
 
 def get_base_url_for_model(config: dict[str, Any], model_name: str) -> str:
     """Base-URL des Providers für ein Modell. Provider wird aus Präfix aufgelöst."""
-    prov, _ = get_provider_config(config, model_name)
-    return prov.get("base_url", "http://127.0.0.1:11434")
+    return _resolved_model(config, model_name).base_url
 
 
 def get_api_key_for_model(config: dict[str, Any], model_name: str) -> str | None:
     """API-Key des Providers für ein Modell. None wenn kein Key konfiguriert."""
-    prov, _ = get_provider_config(config, model_name)
-    return prov.get("api_key") or None
+    return _resolved_model(config, model_name).api_key
 
 
 def get_num_ctx_for_model(config: dict[str, Any], model_name: str) -> int:
     """Context-Größe (num_ctx) für ein Modell: model_options[model].num_ctx, sonst Provider-num_ctx, sonst 32768.
     0 bedeutet 'nicht gesetzt / Server-Default' und wird ignoriert."""
-    opts = get_options_for_model(config, model_name)
-    num = opts.get("num_ctx")
-    if num is not None and int(num) > 0:
-        return int(num)
-    prov, _ = get_provider_config(config, model_name)
-    num = prov.get("num_ctx")
-    if num is not None and int(num) > 0:
-        return int(num)
-    return 32768
+    return _resolved_model(config, model_name).num_ctx
 
 
 def get_think_for_model(config: dict[str, Any], model_name: str) -> bool | None:
     """Think-Modus für ein Modell: model_options[model].think überschreibt Provider.think. None = nicht gesetzt.
     Bei think=True wird zusätzlich geprüft ob das Modell Thinking unterstützt."""
-    # Erst aus model_options lesen (think dort wurde schon aus options entfernt, direkt aus model_options holen)
-    prov, clean = get_provider_config(config, model_name)
-    per_model = prov.get("model_options") or {}
-    lookup = clean or model_name
-    model_cfg = per_model.get(lookup) if isinstance(per_model, dict) and lookup else None
-    val = None
-    if isinstance(model_cfg, dict):
-        val = model_cfg.get("think")
-    if val is None:
-        val = prov.get("think")
+    entry = _resolved_model(config, model_name)
+    val = entry.think
     if val is None:
         return None
     if val is False:
         # Explizit deaktiviert → immer senden (z.B. für deepseek-r1)
         return False
     # think=True: nur senden wenn Modell Thinking unterstützt
-    base_url = prov.get("base_url", "http://127.0.0.1:11434")
-    api_name = clean or model_name
-    if not model_supports_thinking(base_url, api_name):
+    api_name = entry.clean or model_name
+    if not model_supports_thinking(entry.base_url, api_name):
         return None
     return True
 
@@ -372,356 +685,542 @@ def get_tools_schema(config: dict[str, Any], *, allow: set[str] | None = None) -
         for p in (config.get("providers") or {}).values()
         if isinstance(p, dict)
     )
-    schema = _tools_schema(
-        config,
-        config.get("scheduler"),
-        subagents=any_subagents,
-    )
+    scheduler_cfg = config.get("scheduler")
+    key = _tools_schema_key(config, scheduler_cfg, any_subagents)
+    with _SCHEMA_CACHE_LOCK:
+        schema = _SCHEMA_CACHE.get(key)
+    if schema is None:
+        schema = _tools_schema(config, scheduler_cfg, subagents=any_subagents)
+        with _SCHEMA_CACHE_LOCK:
+            if len(_SCHEMA_CACHE) >= _SCHEMA_CACHE_MAX:
+                _SCHEMA_CACHE.clear()
+            _SCHEMA_CACHE[key] = schema
+    # Neue Liste, damit Aufrufer den Cache-Eintrag nicht per append verändern; Tool-Dicts werden geteilt (nur lesen!)
     if allow is not None:
-        schema = [t for t in schema if t.get("function", {}).get("name") in allow]
-    return schema
+        return [t for t in schema if t.get("function", {}).get("name") in allow]
+    return list(schema)
 
 
-def _tools_schema(
-    config: dict[str, Any],
-    scheduler_cfg: dict[str, Any] | None = None,
+# Tool-Schema-Cache: get_tools_schema läuft bei jeder Chat-Runde, die Config ändert sich selten.
+# Schlüssel = alle Config-Werte, von denen _tools_schema abhängt (siehe _tools_schema_key).
+_SCHEMA_CACHE: dict[tuple, list[dict[str, Any]]] = {}
+_SCHEMA_CACHE_LOCK = threading.Lock()
+_SCHEMA_CACHE_MAX = 32
+
+
+def _tools_schema_key(config: dict[str, Any], scheduler_cfg: Any, subagents: bool) -> tuple:
+    """Fingerprint der Config-Teile, die das Tool-Schema bestimmen (Reihenfolge der Engines zählt: Default = erste)."""
+    from miniassistant.config import get_voice_tts_url
+    from miniassistant.tools import _get_email_account_names
+    scheduler_on = scheduler_cfg in (None, False) or scheduler_cfg is True or (
+        isinstance(scheduler_cfg, dict) and bool(scheduler_cfg.get("enabled", True))
+    )
+    wh_cfg = config.get("webhooks")
+    mp_cfg = config.get("mempalace") or {}
+    return (
+        tuple(config.get("search_engines") or ()),
+        config.get("default_search_engine"),
+        config.get("search_engine_strategy"),
+        scheduler_on,
+        isinstance(wh_cfg, dict) and bool(wh_cfg.get("enabled")),
+        bool(mp_cfg.get("enabled", False)) and mp_cfg.get("wing", "miniassistant"),
+        tuple(_get_email_account_names(config)),
+        bool(get_voice_tts_url(config)),
+        _has_chat_clients(config),
+        bool(subagents),
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _web_search_desc(
+    engine_ids: tuple[str, ...],
+    default_engine: str | None,
+    strategy: str | None,
     *,
-    subagents: bool = False,
-) -> list[dict[str, Any]]:
-    """Ollama-kompatibles Tool-Schema für exec, optional web_search, schedule, invoke_model (Subagenten)."""
-    schema = [
-        {
-            "type": "function",
-            "function": {
-                "name": "exec",
-                "description": "Execute a shell command. Use for file operations, package management, services, system queries. Do not use sudo when running as root.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "command": {"type": "string", "description": "Shell command to run (e.g. ls -la, cat /etc/hostname)"},
-                    },
-                    "required": ["command"],
-                },
+    routing_hint: bool = True,
+) -> str:
+    """web_search-Beschreibung je Engine-Liste/Strategie — einmal gebaut, danach aus dem Cache.
+    routing_hint: VPN-/Proxy-Hinweis anhängen (nur Hauptagent, nicht Subagenten)."""
+    default_id = default_engine or (engine_ids[0] if engine_ids else None)
+    strategy = (strategy or "first").strip().lower()
+    if strategy == "specific":
+        desc = "Search the web via SearXNG. Use engine '" + (default_id or "") + "' only — do NOT use other engines."
+    elif strategy == "random":
+        desc = "Search the web via SearXNG. Available engines: " + ", ".join(engine_ids) + ". A random engine is selected automatically — omit the engine parameter unless the user explicitly requests one."
+    else:  # first (default)
+        desc = "Search the web via SearXNG. Available engines: " + ", ".join(engine_ids) + ". Default is '" + (default_id or "") + "'. Only specify engine if the user explicitly requests a different one."
+    if routing_hint and any("vpn" in k.lower() for k in engine_ids):
+        desc += (
+            " **Connection/routing preference:** When the user says to use a specific connection or VPN"
+            " (e.g. 'use vpn1', 'search via VPN', 'use this connection'), treat it as a session-wide preference:"
+            " apply the matching engine to ALL subsequent web_search calls AND the matching proxy to ALL read_url calls"
+            " until the user says otherwise. Engine and proxy names correspond (e.g. 'vpn'/'vpn1' engine↔proxy,"
+            " 'vpn2' engine↔proxy, 'main'/'direct' engine↔proxy)."
+        )
+    return desc
+
+
+def _has_chat_clients(config: dict[str, Any]) -> bool:
+    """True wenn Matrix oder Discord aktiv und mit Token konfiguriert ist (chat_clients.* oder Top-Level-Key)."""
+    cc = config.get("chat_clients") or {}
+    for k in ("matrix", "discord"):
+        c = cc.get(k) or config.get(k) or {}
+        if c.get("enabled", True) and (c.get("token") or c.get("bot_token")):
+            return True
+    return False
+
+
+# Statische Tool-Definitionen (ohne Config-Werte): einmal beim Import gebaut, _tools_schema hängt nur Referenzen an.
+# Werden geteilt — niemals verändern (Ollama/OpenAI-Clients lesen sie nur).
+_EXEC_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "exec",
+        "description": "Execute a shell command. Use for file operations, package management, services, system queries. Do not use sudo when running as root.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "command": {"type": "string", "description": "Shell command to run (e.g. ls -la, cat /etc/hostname)"},
             },
+            "required": ["command"],
         },
-        {
-            "type": "function",
-            "function": {
-                "name": "wait",
-                "description": (
-                    "Pause for a specified number of seconds within the current session, then automatically continue. "
-                    "Use ONLY after starting a background process via `exec` (build, download, slow command) when you need "
-                    "to give it time before checking results. The user sees a live countdown. "
-                    "After the wait you receive a prompt to continue — check progress, retry, or proceed. "
-                    "Maximum: 600 seconds (10 minutes). "
-                    "Do NOT use to delay a direct answer to the user. "
-                    "NEVER use after invoke_model, web_search, read_url, or check_url — these tools are SYNCHRONOUS: "
-                    "their results are returned immediately as tool output in the same round. There is nothing running "
-                    "in the background to wait for. Process the tool results directly. "
-                    "Unknown duration → `watch`. Future/recurring → `schedule`."
-                ),
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "seconds": {"type": "integer", "description": "Seconds to wait (1–600)"},
-                        "reason": {"type": "string", "description": "What you are waiting for (shown as status, e.g. 'Build fertig', 'Download abgeschlossen')"},
-                    },
-                    "required": ["seconds"],
-                },
+    },
+}
+
+_WAIT_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "wait",
+        "description": (
+            "Pause for a specified number of seconds within the current session, then automatically continue. "
+            "Use ONLY after starting a background process via `exec` (build, download, slow command) when you need "
+            "to give it time before checking results. The user sees a live countdown. "
+            "After the wait you receive a prompt to continue — check progress, retry, or proceed. "
+            "Maximum: 600 seconds (10 minutes). "
+            "Do NOT use to delay a direct answer to the user. "
+            "NEVER use after invoke_model, web_search, read_url, or check_url — these tools are SYNCHRONOUS: "
+            "their results are returned immediately as tool output in the same round. There is nothing running "
+            "in the background to wait for. Process the tool results directly. "
+            "Unknown duration → `watch`. Future/recurring → `schedule`."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "seconds": {"type": "integer", "description": "Seconds to wait (1–600)"},
+                "reason": {"type": "string", "description": "What you are waiting for (shown as status, e.g. 'Build fertig', 'Download abgeschlossen')"},
             },
+            "required": ["seconds"],
         },
-    ]
-    search_engines = config.get("search_engines") or {}
-    if search_engines:
-        engine_ids = list(search_engines.keys())
-        default_id = config.get("default_search_engine") or (engine_ids[0] if engine_ids else None)
-        strategy = (config.get("search_engine_strategy") or "first").strip().lower()
-        if strategy == "specific":
-            desc = "Search the web via SearXNG. Use engine '" + (default_id or "") + "' only — do NOT use other engines."
-        elif strategy == "random":
-            desc = "Search the web via SearXNG. Available engines: " + ", ".join(engine_ids) + ". A random engine is selected automatically — omit the engine parameter unless the user explicitly requests one."
-        else:  # first (default)
-            desc = "Search the web via SearXNG. Available engines: " + ", ".join(engine_ids) + ". Default is '" + (default_id or "") + "'. Only specify engine if the user explicitly requests a different one."
-        if any("vpn" in k.lower() for k in engine_ids):
-            desc += (
-                " **Connection/routing preference:** When the user says to use a specific connection or VPN"
-                " (e.g. 'use vpn1', 'search via VPN', 'use this connection'), treat it as a session-wide preference:"
-                " apply the matching engine to ALL subsequent web_search calls AND the matching proxy to ALL read_url calls"
-                " until the user says otherwise. Engine and proxy names correspond (e.g. 'vpn'/'vpn1' engine↔proxy,"
-                " 'vpn2' engine↔proxy, 'main'/'direct' engine↔proxy)."
-            )
-        schema.append({
-            "type": "function",
-            "function": {
-                "name": "web_search",
-                "description": desc,
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "query": {"type": "string", "description": "Search query"},
-                        "engine": {"type": "string", "description": "Optional. Engine id (e.g. main, vpn). Omit to use default."},
-                        "categories": {"type": "string", "description": "Optional. SearXNG category: 'images', 'videos', 'news', 'music', 'files'. Use 'images' to find pictures — results include img_src (direct image URL) which you can download with exec (wget/curl) and send via send_image."},
-                    },
-                    "required": ["query"],
-                },
+    },
+}
+
+_CHECK_URL_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "check_url",
+        "description": "Check if a URL is reachable (HTTP request, follows redirects). Use this tool ONLY when the user explicitly asks to verify, check or test links/URLs (e.g. 'check these links', 'verify the URLs'). Do not use for every link you mention; only when link verification is requested.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "Full URL to check (e.g. https://example.org). Do not add www unless the user gave it."},
             },
-        })
-    schema.append({
-        "type": "function",
-        "function": {
-            "name": "check_url",
-            "description": "Check if a URL is reachable (HTTP request, follows redirects). Use this tool ONLY when the user explicitly asks to verify, check or test links/URLs (e.g. 'check these links', 'verify the URLs'). Do not use for every link you mention; only when link verification is requested.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "Full URL to check (e.g. https://example.org). Do not add www unless the user gave it."},
-                },
-                "required": ["url"],
+            "required": ["url"],
+        },
+    },
+}
+
+_READ_URL_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "read_url",
+        "description": (
+            "Read the content of a URL and return it as clean text. "
+            "Use for: web pages, docs, wikis, research, tracking results, any URL. HTML is auto-converted to text. "
+            "Set js=true if the page returns empty/minimal content (SPA/React) — try without js first. "
+            "Many tracking/lookup sites have direct URLs (e.g. site.com/tracking/NUMBER) — "
+            "always try read_url with the FULL URL including the query/number FIRST. "
+            "CANNOT fill forms or click buttons. Only if the site truly REQUIRES filling a form: "
+            "escalate to exec+Playwright (read docs/WEB_FETCHING.md). "
+            "Never guess URLs from memory — verify with web_search first. "
+            "Output is capped at max_chars (default 8000) and bounded by your context window. "
+            "If you see a '[... chars shown … remain …]' marker and need more, read the NEXT part by re-calling "
+            "with the same url and offset set to where the previous part ended — do NOT pull a whole large "
+            "document at once. Read only as much as the task actually needs."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "Full URL to read (e.g. https://en.wikipedia.org/wiki/Topic)"},
+                "proxy": {"type": "string", "description": "Proxy name to use (from configured proxies). Omit to use the default proxy or direct connection."},
+                "js": {"type": "boolean", "description": "Set true for JS-heavy pages (SPAs, React/Vue/Angular apps) that need browser rendering. Only use when plain fetch returns empty or minimal content. Requires Playwright to be installed."},
+                "max_chars": {"type": "integer", "description": "Max characters per call (default 8000). Capped to what fits the model's context window. For large documents read in successive chunks via offset, not one giant call."},
+                "offset": {"type": "integer", "description": "Character offset to start from (default 0). Use the value shown in the truncation marker to read the next part of a large document."},
             },
+            "required": ["url"],
         },
-    })
-    schema.append({
-        "type": "function",
-        "function": {
-            "name": "read_url",
-            "description": (
-                "Read the content of a URL and return it as clean text. "
-                "Use for: web pages, docs, wikis, research, tracking results, any URL. HTML is auto-converted to text. "
-                "Set js=true if the page returns empty/minimal content (SPA/React) — try without js first. "
-                "Many tracking/lookup sites have direct URLs (e.g. site.com/tracking/NUMBER) — "
-                "always try read_url with the FULL URL including the query/number FIRST. "
-                "CANNOT fill forms or click buttons. Only if the site truly REQUIRES filling a form: "
-                "escalate to exec+Playwright (read docs/WEB_FETCHING.md). "
-                "Never guess URLs from memory — verify with web_search first. "
-                "Output is capped at max_chars (default 8000) and bounded by your context window. "
-                "If you see a '[... chars shown … remain …]' marker and need more, read the NEXT part by re-calling "
-                "with the same url and offset set to where the previous part ended — do NOT pull a whole large "
-                "document at once. Read only as much as the task actually needs."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "Full URL to read (e.g. https://en.wikipedia.org/wiki/Topic)"},
-                    "proxy": {"type": "string", "description": "Proxy name to use (from configured proxies). Omit to use the default proxy or direct connection."},
-                    "js": {"type": "boolean", "description": "Set true for JS-heavy pages (SPAs, React/Vue/Angular apps) that need browser rendering. Only use when plain fetch returns empty or minimal content. Requires Playwright to be installed."},
-                    "max_chars": {"type": "integer", "description": "Max characters per call (default 8000). Capped to what fits the model's context window. For large documents read in successive chunks via offset, not one giant call."},
-                    "offset": {"type": "integer", "description": "Character offset to start from (default 0). Use the value shown in the truncation marker to read the next part of a large document."},
-                },
-                "required": ["url"],
+    },
+}
+
+_DOWNLOAD_FILE_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "download_file",
+        "description": (
+            "Download a binary file (image, PDF, archive, video etc.) from a URL and save it to disk. "
+            "Use this INSTEAD of `exec curl/wget` for binary downloads — sends Safari User-Agent + "
+            "Sec-Fetch headers + auto-Referer for known CDNs (Wikimedia Commons, Imgur, Reddit). "
+            "Bypasses bot-detection on 403/429 via curl_cffi Safari TLS impersonation. "
+            "For Wikimedia Commons images: first call read_url on the MediaWiki API "
+            "(commons.wikimedia.org/w/api.php?action=query&titles=File:NAME&prop=imageinfo&iiprop=url&format=json) "
+            "to get the real upload.wikimedia.org URL — never guess hash subdirs."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "Direct URL to the file (must end in the file's real path, not a viewer/gallery page)."},
+                "path": {"type": "string", "description": "Save path. Relative paths land inside the workspace. Absolute paths must already be inside workspace. Include extension (.jpg/.pdf/etc)."},
+                "referer": {"type": "string", "description": "Optional Referer header. Auto-set for upload.wikimedia.org/imgur.com/redditmedia.com — only set manually if a CDN demands a specific source page."},
+                "max_bytes": {"type": "integer", "description": "Max bytes to accept (default 50 MB). Reject larger files."},
+                "timeout": {"type": "number", "description": "Timeout seconds (default 60)."},
+                "proxy": {"type": "string", "description": "Proxy name from configured proxies. Omit for default/direct."},
             },
+            "required": ["url", "path"],
         },
-    })
-    schema.append({
-        "type": "function",
-        "function": {
-            "name": "download_file",
-            "description": (
-                "Download a binary file (image, PDF, archive, video etc.) from a URL and save it to disk. "
-                "Use this INSTEAD of `exec curl/wget` for binary downloads — sends Safari User-Agent + "
-                "Sec-Fetch headers + auto-Referer for known CDNs (Wikimedia Commons, Imgur, Reddit). "
-                "Bypasses bot-detection on 403/429 via curl_cffi Safari TLS impersonation. "
-                "For Wikimedia Commons images: first call read_url on the MediaWiki API "
-                "(commons.wikimedia.org/w/api.php?action=query&titles=File:NAME&prop=imageinfo&iiprop=url&format=json) "
-                "to get the real upload.wikimedia.org URL — never guess hash subdirs."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "url": {"type": "string", "description": "Direct URL to the file (must end in the file's real path, not a viewer/gallery page)."},
-                    "path": {"type": "string", "description": "Save path. Relative paths land inside the workspace. Absolute paths must already be inside workspace. Include extension (.jpg/.pdf/etc)."},
-                    "referer": {"type": "string", "description": "Optional Referer header. Auto-set for upload.wikimedia.org/imgur.com/redditmedia.com — only set manually if a CDN demands a specific source page."},
-                    "max_bytes": {"type": "integer", "description": "Max bytes to accept (default 50 MB). Reject larger files."},
-                    "timeout": {"type": "number", "description": "Timeout seconds (default 60)."},
-                    "proxy": {"type": "string", "description": "Proxy name from configured proxies. Omit for default/direct."},
-                },
-                "required": ["url", "path"],
+    },
+}
+
+_SCHEDULE_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "schedule",
+        "description": "Manage scheduled tasks (geplante Jobs, Benachrichtigungen, Erinnerungen). ALWAYS use this instead of cron/crontab! action='create': new job. action='list': show all. action='remove': delete by id. To edit/change a schedule: list → remove old → create new (never leave old job running). To remove by time or description: first list to find the ID, then remove.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "action": {"type": "string", "enum": ["create", "list", "remove"], "description": "create (default), list, or remove"},
+                "prompt": {"type": "string", "description": "Plain language task to execute at the scheduled time. Examples: 'List open issues from GitHub repo OWNER/REPO' or 'Search weather for City X from 3 sources and summarize'. NEVER put shell commands or exec:/tool syntax here — write WHAT to do, not HOW. NEVER paste a pre-written answer."},
+                "command": {"type": "string", "description": "Shell command to run (optional). Output is included in prompt context if both set."},
+                "when": {"type": "string", "description": "Cron 5 fields in local system time (e.g. '30 7 * * *' = 7:30) or 'in 30 minutes' / 'in 1 hour'"},
+                "client": {"type": "string", "description": "Delivery target: 'matrix', 'discord', or 'none' (run but don't send anywhere). Omit to inherit current context (Matrix Room ID / Discord Channel ID shown in system prompt). If Platform is 'web' or 'api': ask the user which room/channel to deliver to, or use 'none' if they don't want a notification."},
+                "once": {"type": "boolean", "description": "true = run once then delete (use for reminders, one-time notifications, 'einmalig', 'remind me once'). false = recurring. 'in N minutes/hours' is always once."},
+                "model": {"type": "string", "description": "Model name or alias for the prompt (e.g. 'qwen3', 'ollama-online/kimi-k2.5'). Default: current default model. Use this to control cost and capability."},
+                "id": {"type": "string", "description": "Job ID (or prefix) for action='remove'."},
             },
+            "required": [],
         },
-    })
-    if scheduler_cfg in (None, False) or scheduler_cfg is True or (isinstance(scheduler_cfg, dict) and scheduler_cfg.get("enabled", True)):
-        schema.append({
-            "type": "function",
-            "function": {
-                "name": "schedule",
-                "description": "Manage scheduled tasks (geplante Jobs, Benachrichtigungen, Erinnerungen). ALWAYS use this instead of cron/crontab! action='create': new job. action='list': show all. action='remove': delete by id. To edit/change a schedule: list → remove old → create new (never leave old job running). To remove by time or description: first list to find the ID, then remove.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "action": {"type": "string", "enum": ["create", "list", "remove"], "description": "create (default), list, or remove"},
-                        "prompt": {"type": "string", "description": "Plain language task to execute at the scheduled time. Examples: 'List open issues from GitHub repo OWNER/REPO' or 'Search weather for City X from 3 sources and summarize'. NEVER put shell commands or exec:/tool syntax here — write WHAT to do, not HOW. NEVER paste a pre-written answer."},
-                        "command": {"type": "string", "description": "Shell command to run (optional). Output is included in prompt context if both set."},
-                        "when": {"type": "string", "description": "Cron 5 fields in local system time (e.g. '30 7 * * *' = 7:30) or 'in 30 minutes' / 'in 1 hour'"},
-                        "client": {"type": "string", "description": "Delivery target: 'matrix', 'discord', or 'none' (run but don't send anywhere). Omit to inherit current context (Matrix Room ID / Discord Channel ID shown in system prompt). If Platform is 'web' or 'api': ask the user which room/channel to deliver to, or use 'none' if they don't want a notification."},
-                        "once": {"type": "boolean", "description": "true = run once then delete (use for reminders, one-time notifications, 'einmalig', 'remind me once'). false = recurring. 'in N minutes/hours' is always once."},
-                        "model": {"type": "string", "description": "Model name or alias for the prompt (e.g. 'qwen3', 'ollama-online/kimi-k2.5'). Default: current default model. Use this to control cost and capability."},
-                        "id": {"type": "string", "description": "Job ID (or prefix) for action='remove'."},
-                    },
-                    "required": [],
-                },
+    },
+}
+
+_SEARCH_CHAT_HISTORY_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "search_chat_history",
+        "description": (
+            "Search the chat history of the CURRENT room/channel for a keyword or phrase. "
+            "Use ONLY when the user explicitly asks to find/search something in past messages "
+            "('such in chat nach X', 'find Y in history', 'was hat Alice über Z gesagt'). "
+            "Returns matching messages with ±2 lines of context. "
+            "For regex search: wrap query in slashes like `/pattern/` (case-insensitive). "
+            "Do NOT use this proactively or for greetings — only on explicit search requests."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Keyword or phrase to find. Wrap in /…/ for regex."},
+                "max_scan": {"type": "integer", "description": "How many past messages to scan (10–500, default 200). Higher = slower but catches older mentions."},
             },
-        })
-    schema.append({
-        "type": "function",
-        "function": {
-            "name": "search_chat_history",
-            "description": (
-                "Search the chat history of the CURRENT room/channel for a keyword or phrase. "
-                "Use ONLY when the user explicitly asks to find/search something in past messages "
-                "('such in chat nach X', 'find Y in history', 'was hat Alice über Z gesagt'). "
-                "Returns matching messages with ±2 lines of context. "
-                "For regex search: wrap query in slashes like `/pattern/` (case-insensitive). "
-                "Do NOT use this proactively or for greetings — only on explicit search requests."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "Keyword or phrase to find. Wrap in /…/ for regex."},
-                    "max_scan": {"type": "integer", "description": "How many past messages to scan (10–500, default 200). Higher = slower but catches older mentions."},
-                },
-                "required": ["query"],
+            "required": ["query"],
+        },
+    },
+}
+
+_GET_USER_PROFILE_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "get_user_profile",
+        "description": (
+            "Fetch a user's display name and profile picture (avatar) by their platform ID. "
+            "GROUP-ROOMS ONLY (matrix/discord). Use when the user asks about another participant's "
+            "avatar/profile picture or asks you to use someone's avatar as image-edit source. "
+            "Pass the FULL platform ID: matrix → `@user:server.tld`, discord → numeric user ID string. "
+            "Returns display_name + avatar_path (e.g. `/workspace/avatars/<id>.png`) — pass that path "
+            "to `invoke_model(image_path=…)` for editing. Returns 'no avatar set' if user has none."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "user_id": {"type": "string", "description": "Platform ID (matrix: @user:server, discord: numeric)"},
             },
+            "required": ["user_id"],
         },
-    })
-    schema.append({
-        "type": "function",
-        "function": {
-            "name": "get_user_profile",
-            "description": (
-                "Fetch a user's display name and profile picture (avatar) by their platform ID. "
-                "GROUP-ROOMS ONLY (matrix/discord). Use when the user asks about another participant's "
-                "avatar/profile picture or asks you to use someone's avatar as image-edit source. "
-                "Pass the FULL platform ID: matrix → `@user:server.tld`, discord → numeric user ID string. "
-                "Returns display_name + avatar_path (e.g. `/workspace/avatars/<id>.png`) — pass that path "
-                "to `invoke_model(image_path=…)` for editing. Returns 'no avatar set' if user has none."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "user_id": {"type": "string", "description": "Platform ID (matrix: @user:server, discord: numeric)"},
-                },
-                "required": ["user_id"],
+    },
+}
+
+_READ_RECENT_MESSAGES_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "read_recent_messages",
+        "description": (
+            "Fetch the last N messages of the CURRENT chat room/channel (Matrix or Discord). "
+            "Use when the user references prior context you did not see ('was sagst du dazu', 'lies das oben', "
+            "'was haben wir gerade besprochen', 'about that topic'). "
+            "Returns oldest→newest with sender, display name, body, and timestamp. "
+            "In group rooms with auto-context already enabled, call only if you need MORE than the auto-context provided. "
+            "Encrypted Matrix rooms without keys → body is empty; tell the user."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "limit": {"type": "integer", "description": "How many messages to fetch (1–100, default 20)."},
             },
+            "required": [],
         },
-    })
-    schema.append({
-        "type": "function",
-        "function": {
-            "name": "read_recent_messages",
-            "description": (
-                "Fetch the last N messages of the CURRENT chat room/channel (Matrix or Discord). "
-                "Use when the user references prior context you did not see ('was sagst du dazu', 'lies das oben', "
-                "'was haben wir gerade besprochen', 'about that topic'). "
-                "Returns oldest→newest with sender, display name, body, and timestamp. "
-                "In group rooms with auto-context already enabled, call only if you need MORE than the auto-context provided. "
-                "Encrypted Matrix rooms without keys → body is empty; tell the user."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "limit": {"type": "integer", "description": "How many messages to fetch (1–100, default 20)."},
-                },
-                "required": [],
+    },
+}
+
+_GET_ROOM_LAST_FIRE_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "get_room_last_fire",
+        "description": (
+            "Fetch the last automated fire (webhook or schedule) in the CURRENT chat room/channel, "
+            "including its full saved output. "
+            "Use when the user references something from a prior automated message in this room "
+            "('das von vorhin', 'die letzte Mail', 'antworte drauf', 'was war das Wetter') and you need "
+            "the original content to answer. "
+            "The system prompt 'Recent fires in this room' section shows pointers — call this tool to load "
+            "the actual output. Returns 'No recent ... fire in this room.' if nothing found."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "kind": {"type": "string", "enum": ["any", "webhook", "schedule"], "description": "'any' (default, picks most recent), 'webhook' only, or 'schedule' only"},
             },
+            "required": [],
         },
-    })
-    schema.append({
-        "type": "function",
-        "function": {
-            "name": "get_room_last_fire",
-            "description": (
-                "Fetch the last automated fire (webhook or schedule) in the CURRENT chat room/channel, "
-                "including its full saved output. "
-                "Use when the user references something from a prior automated message in this room "
-                "('das von vorhin', 'die letzte Mail', 'antworte drauf', 'was war das Wetter') and you need "
-                "the original content to answer. "
-                "The system prompt 'Recent fires in this room' section shows pointers — call this tool to load "
-                "the actual output. Returns 'No recent ... fire in this room.' if nothing found."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "kind": {"type": "string", "enum": ["any", "webhook", "schedule"], "description": "'any' (default, picks most recent), 'webhook' only, or 'schedule' only"},
-                },
-                "required": [],
+    },
+}
+
+_WEBHOOK_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "webhook",
+        "description": (
+            "Manage HTTP-triggered autonomous tasks. "
+            "Actions: 'create' (new webhook+token), 'list', 'remove' (by id/name), 'info' (config + recent runs), 'last_output' (read latest file). "
+            "The optional default 'prompt' runs on each fire; callers may also send 'prompt' or prepend 'extra_context' per HTTP request. "
+            "If default prompt is empty: webhook is 'open' — every POST must supply its own prompt. "
+            "BEFORE creating, if anything is unclear from the user request — ASK the user instead of guessing: "
+            "(1) default prompt or open (caller-supplied each call)? "
+            "(2) target — which Matrix room / Discord channel should receive the result, or silent (file-only)? "
+            "(3) name (slug) — used for URL/output dir, optional. "
+            "PROMPT WORDING: never write 'send it', 'post it', 'reply via matrix' etc. — the bot's response text is AUTOMATICALLY delivered to the configured chat (no send_email/send_image needed). Just describe WHAT to produce: e.g. 'Summarize as bullets', 'Format as table', 'Return JSON with fields x,y'. "
+            "Confirm what was created and show the token + POST URL exactly once. After remove/edit also confirm. "
+            "Read WEBHOOKS.md for body schema and examples."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "action": {"type": "string", "enum": ["create", "list", "remove", "info", "last_output"], "description": "create (default), list, remove, info, last_output"},
+                "name": {"type": "string", "description": "Optional slug ^[a-z0-9][a-z0-9_-]{0,63}$ — used as directory and human handle"},
+                "prompt": {"type": "string", "description": "Optional default prompt executed on each fire. Empty = open webhook (caller must supply prompt per POST). Plain language WHAT to produce — never 'send it'/'post it'/'reply via X' since the response is auto-delivered."},
+                "client": {"type": "string", "description": "Default delivery target: 'matrix', 'discord', or 'none'. If omitted: inherits current chat context."},
+                "model": {"type": "string", "description": "Model name/alias for the webhook task. Default: server default."},
+                "silent": {"type": "boolean", "description": "true = no chat push, output only saved to file. false = push to chat."},
+                "save_output": {"type": "boolean", "description": "true = also save output to file (default true)"},
+                "id": {"type": "string", "description": "Webhook id (or name) for action='remove'/'info'/'last_output'"},
             },
+            "required": [],
         },
-    })
-    wh_cfg = config.get("webhooks")
-    if isinstance(wh_cfg, dict) and wh_cfg.get("enabled"):
-        schema.append({
-            "type": "function",
-            "function": {
-                "name": "webhook",
-                "description": (
-                    "Manage HTTP-triggered autonomous tasks. "
-                    "Actions: 'create' (new webhook+token), 'list', 'remove' (by id/name), 'info' (config + recent runs), 'last_output' (read latest file). "
-                    "The optional default 'prompt' runs on each fire; callers may also send 'prompt' or prepend 'extra_context' per HTTP request. "
-                    "If default prompt is empty: webhook is 'open' — every POST must supply its own prompt. "
-                    "BEFORE creating, if anything is unclear from the user request — ASK the user instead of guessing: "
-                    "(1) default prompt or open (caller-supplied each call)? "
-                    "(2) target — which Matrix room / Discord channel should receive the result, or silent (file-only)? "
-                    "(3) name (slug) — used for URL/output dir, optional. "
-                    "PROMPT WORDING: never write 'send it', 'post it', 'reply via matrix' etc. — the bot's response text is AUTOMATICALLY delivered to the configured chat (no send_email/send_image needed). Just describe WHAT to produce: e.g. 'Summarize as bullets', 'Format as table', 'Return JSON with fields x,y'. "
-                    "Confirm what was created and show the token + POST URL exactly once. After remove/edit also confirm. "
-                    "Read WEBHOOKS.md for body schema and examples."
-                ),
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "action": {"type": "string", "enum": ["create", "list", "remove", "info", "last_output"], "description": "create (default), list, remove, info, last_output"},
-                        "name": {"type": "string", "description": "Optional slug ^[a-z0-9][a-z0-9_-]{0,63}$ — used as directory and human handle"},
-                        "prompt": {"type": "string", "description": "Optional default prompt executed on each fire. Empty = open webhook (caller must supply prompt per POST). Plain language WHAT to produce — never 'send it'/'post it'/'reply via X' since the response is auto-delivered."},
-                        "client": {"type": "string", "description": "Default delivery target: 'matrix', 'discord', or 'none'. If omitted: inherits current chat context."},
-                        "model": {"type": "string", "description": "Model name/alias for the webhook task. Default: server default."},
-                        "silent": {"type": "boolean", "description": "true = no chat push, output only saved to file. false = push to chat."},
-                        "save_output": {"type": "boolean", "description": "true = also save output to file (default true)"},
-                        "id": {"type": "string", "description": "Webhook id (or name) for action='remove'/'info'/'last_output'"},
-                    },
-                    "required": [],
-                },
+    },
+}
+
+_WATCH_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "watch",
+        "description": (
+            "Monitor a condition in the background and notify when it's met. "
+            "Use this when you start a long-running background task (nohup, download, build, etc.) "
+            "and want to notify the user when it finishes — instead of saying 'I'll notify you' and doing nothing. "
+            "Check types: 'file_exists:/path' (file appears), 'file_size_stable:/path' (download complete — size unchanged between checks), "
+            "'pid_done:1234' (process exits), 'exec:shell_cmd' (command returns exit 0). "
+            "The result is sent to the user automatically when the condition is met."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "check": {"type": "string", "description": "What to monitor. Examples: 'file_size_stable:/tmp/bigfile.iso', 'pid_done:4231', 'exec:test -f /tmp/done.flag'"},
+                "message": {"type": "string", "description": "Message to send the user when condition is met (e.g. 'Download fertig! Datei liegt in /tmp/bigfile.iso')"},
+                "context": {"type": "string", "description": "Short summary of what was happening (e.g. 'nohup wget https://... -O /tmp/bigfile.iso started at 14:32'). Helps the watch job understand its purpose."},
+                "interval_minutes": {"type": "integer", "description": "How often to check in minutes (default: 2). Choose based on expected duration — e.g. 1 for short tasks, 5-10 for long ones."},
+                "timeout_hours": {"type": "number", "description": "Give up after this many hours and notify user (default: 2). Set higher for very long tasks."},
+                "recurring": {"type": "boolean", "description": "If true, keep watching and notify every time the condition is met (default: false = one-shot, self-deletes after first trigger)."},
             },
-        })
-    if scheduler_cfg in (None, False) or scheduler_cfg is True or (isinstance(scheduler_cfg, dict) and scheduler_cfg.get("enabled", True)):
+            "required": ["check", "message"],
+        },
+    },
+}
+
+_SAVE_CONFIG_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "save_config",
+        "description": "CALL THIS FUNCTION to actually update the config. Writing YAML in your response text does NOT save anything — you MUST call this function. Your YAML is deep-merged into the existing config (existing keys are preserved). Validates, creates .bak backups, then writes. After saving, tell user to restart. Structure: providers.ollama.models.aliases for model aliases, providers.ollama.models.default for default model, providers.ollama.model_options.<model>.think for per-model thinking, chat_clients.matrix/discord for bots, search_engines for SearXNG, voice for Wyoming STT/TTS. Read CONFIG_REFERENCE.md for full structure.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "yaml_content": {"type": "string", "description": "YAML with only the keys to add or change. Example for aliases: 'providers:\\n  ollama:\\n    models:\\n      aliases:\\n        fast: llama3.2\\n        coder: qwen2.5-coder:14b'"},
+            },
+            "required": ["yaml_content"],
+        },
+    },
+}
+
+_SEND_IMAGE_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "send_image",
+        "description": "Send an image file to the current chat (Matrix room or Discord channel). Use after generating or downloading an image. The image is uploaded via the bot client (E2EE-capable). For Web-UI: returns the file path instead. IMPORTANT: When this tool succeeds, the user already sees the image — do NOT send an additional text confirmation. The image IS the response. Only reply with text if the tool fails.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "image_path": {"type": "string", "description": "Absolute path to the image file on disk"},
+                "caption": {"type": "string", "description": "Optional caption/description for the image"},
+            },
+            "required": ["image_path"],
+        },
+    },
+}
+
+_SEND_AUDIO_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "send_audio",
+        "description": "Synthesize text to speech via Wyoming TTS and send as audio message to the current chat. Call this DIRECTLY — do NOT read config files or docs first, all configuration is handled automatically. IMPORTANT: When this tool succeeds, send NOTHING — no text, no confirmation, no technical note, no status message. Silence. The audio IS the complete response. Only reply with text if the tool explicitly fails.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "text": {"type": "string", "description": "The text to synthesize and send as audio"},
+            },
+            "required": ["text"],
+        },
+    },
+}
+
+_STATUS_UPDATE_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "status_update",
+        "description": "Send an intermediate status message to the user in the current chat. Use during multi-step tasks or plan execution to report progress, ask for input, or share interim findings. The message is sent immediately — do NOT wait until the end. Keep updates short.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "message": {"type": "string", "description": "Status message to send (Markdown supported)"},
+            },
+            "required": ["message"],
+        },
+    },
+}
+
+_INVOKE_MODEL_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "invoke_model",
+        "description": "Delegate a task to another model (subagent) by name or alias. Use e.g. for compiling (qwen-coder), code review, or specialized tasks. Returns the other model's reply. For image generation models: pass the image prompt as message. For image EDITING (img2img): pass image_path with the source image and the edit prompt as message.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "model": {"type": "string", "description": "Model name or alias (e.g. qwen2.5-coder:14b or alias 'compiler')"},
+                "message": {"type": "string", "description": "Task or question to delegate (e.g. 'Review this code: ...'). Pass the task itself — NEVER a pre-written answer. For image generation/editing: the image prompt describing what to generate or how to edit."},
+                "image_path": {"type": "string", "description": "Path to source image for image EDITING (img2img). When set, the image generation model will edit/transform this image based on the prompt instead of generating from scratch. Use the path from the [Hochgeladenes Bild] info."},
+                "strength": {"type": "number", "description": "How much to change the source image (0.0 = keep original, 1.0 = ignore original). Default depends on backend. Only for image editing."},
+                "size": {"type": "string", "description": "Image size for image generation models (e.g. '512x512', '1024x1024'). Default: 1024x1024."},
+                "steps": {"type": "integer", "description": "Number of diffusion steps. Only pass when the user explicitly requests a specific step count."},
+                "cfg_scale": {"type": "number", "description": "CFG scale. Only pass when the user explicitly requests it."},
+                "guidance": {"type": "number", "description": "Distilled guidance scale (Flux models). Only pass when explicitly requested."},
+                "seed": {"type": "integer", "description": "RNG seed for reproducible results. Only pass when explicitly requested. -1 = random."},
+                "negative_prompt": {"type": "string", "description": "Negative prompt — what to avoid. Only pass when the user specifies what to avoid."},
+                "sampler": {"type": "string", "description": "Sampling method (euler, euler_a, dpm++2m, lcm, etc.). Only pass when explicitly requested."},
+                "scheduler": {"type": "string", "description": "Scheduler (discrete, karras, simple, etc.). Only pass when explicitly requested."},
+            },
+            "required": ["model", "message"],
+        },
+    },
+}
+
+_DEBATE_TOOL: dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "debate",
+        "description": "Start a structured multi-round debate/discussion between two AI perspectives. "
+            "USE THIS when the user says: 'diskutiere mit subworker', 'halte eine Diskussion', 'debattiere', "
+            "'lass zwei Modelle diskutieren', 'hole zwei Meinungen ein', or similar. "
+            "Both sides are argued by subagent(s). Transcript saved to Markdown file. "
+            "Between rounds, arguments are summarized so small models keep context.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "topic": {"type": "string", "description": "The debate topic or question"},
+                "perspective_a": {"type": "string", "description": "Position/viewpoint of side A (e.g. 'Pro Kernenergie')"},
+                "perspective_b": {"type": "string", "description": "Position/viewpoint of side B (e.g. 'Contra Kernenergie')"},
+                "model": {"type": "string", "description": "Subagent model for side A (and B if model_b not set)"},
+                "model_b": {"type": "string", "description": "Optional: different subagent model for side B. Defaults to model."},
+                "rounds": {"type": "integer", "description": "Number of back-and-forth rounds (1-10, default 3)"},
+                "language": {"type": "string", "description": "Response language (default: Deutsch)"},
+            },
+            "required": ["topic", "perspective_a", "perspective_b", "model"],
+        },
+    },
+}
+
+
+def _tools_schema(
+    config: dict[str, Any],
+    scheduler_cfg: dict[str, Any] | None = None,
+    *,
+    subagents: bool = False,
+) -> list[dict[str, Any]]:
+    """Ollama-kompatibles Tool-Schema für exec, optional web_search, schedule, invoke_model (Subagenten)."""
+    schema = [_EXEC_TOOL, _WAIT_TOOL]
+    search_engines = config.get("search_engines") or {}
+    if search_engines:
+        desc = _web_search_desc(
+            tuple(search_engines),
+            config.get("default_search_engine"),
+            config.get("search_engine_strategy"),
+        )
         schema.append({
             "type": "function",
             "function": {
-                "name": "watch",
-                "description": (
-                    "Monitor a condition in the background and notify when it's met. "
-                    "Use this when you start a long-running background task (nohup, download, build, etc.) "
-                    "and want to notify the user when it finishes — instead of saying 'I'll notify you' and doing nothing. "
-                    "Check types: 'file_exists:/path' (file appears), 'file_size_stable:/path' (download complete — size unchanged between checks), "
-                    "'pid_done:1234' (process exits), 'exec:shell_cmd' (command returns exit 0). "
-                    "The result is sent to the user automatically when the condition is met."
-                ),
+                "name": "web_search",
+                "description": desc,
                 "parameters": {
                     "type": "object",
                     "properties": {
-                        "check": {"type": "string", "description": "What to monitor. Examples: 'file_size_stable:/tmp/bigfile.iso', 'pid_done:4231', 'exec:test -f /tmp/done.flag'"},
-                        "message": {"type": "string", "description": "Message to send the user when condition is met (e.g. 'Download fertig! Datei liegt in /tmp/bigfile.iso')"},
-                        "context": {"type": "string", "description": "Short summary of what was happening (e.g. 'nohup wget https://... -O /tmp/bigfile.iso started at 14:32'). Helps the watch job understand its purpose."},
-                        "interval_minutes": {"type": "integer", "description": "How often to check in minutes (default: 2). Choose based on expected duration — e.g. 1 for short tasks, 5-10 for long ones."},
-                        "timeout_hours": {"type": "number", "description": "Give up after this many hours and notify user (default: 2). Set higher for very long tasks."},
-                        "recurring": {"type": "boolean", "description": "If true, keep watching and notify every time the condition is met (default: false = one-shot, self-deletes after first trigger)."},
+                        "query": {"type": "string", "description": "Search query"},
+                        "engine": {"type": "string", "description": "Optional. Engine id (e.g. main, vpn). Omit to use default."},
+                        "categories": {"type": "string", "description": "Optional. SearXNG category: 'images', 'videos', 'news', 'music', 'files'. Use 'images' to find pictures — results include img_src (direct image URL) which you can download with exec (wget/curl) and send via send_image."},
                     },
-                    "required": ["check", "message"],
+                    "required": ["query"],
                 },
             },
         })
-    schema.append({
-        "type": "function",
-        "function": {
-            "name": "save_config",
-            "description": "CALL THIS FUNCTION to actually update the config. Writing YAML in your response text does NOT save anything — you MUST call this function. Your YAML is deep-merged into the existing config (existing keys are preserved). Validates, creates .bak backups, then writes. After saving, tell user to restart. Structure: providers.ollama.models.aliases for model aliases, providers.ollama.models.default for default model, providers.ollama.model_options.<model>.think for per-model thinking, chat_clients.matrix/discord for bots, search_engines for SearXNG, voice for Wyoming STT/TTS. Read CONFIG_REFERENCE.md for full structure.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "yaml_content": {"type": "string", "description": "YAML with only the keys to add or change. Example for aliases: 'providers:\\n  ollama:\\n    models:\\n      aliases:\\n        fast: llama3.2\\n        coder: qwen2.5-coder:14b'"},
-                },
-                "required": ["yaml_content"],
-            },
-        },
-    })
+    schema.append(_CHECK_URL_TOOL)
+    schema.append(_READ_URL_TOOL)
+    schema.append(_DOWNLOAD_FILE_TOOL)
+    if scheduler_cfg in (None, False) or scheduler_cfg is True or (isinstance(scheduler_cfg, dict) and scheduler_cfg.get("enabled", True)):
+        schema.append(_SCHEDULE_TOOL)
+    schema.append(_SEARCH_CHAT_HISTORY_TOOL)
+    schema.append(_GET_USER_PROFILE_TOOL)
+    schema.append(_READ_RECENT_MESSAGES_TOOL)
+    schema.append(_GET_ROOM_LAST_FIRE_TOOL)
+    wh_cfg = config.get("webhooks")
+    if isinstance(wh_cfg, dict) and wh_cfg.get("enabled"):
+        schema.append(_WEBHOOK_TOOL)
+    if scheduler_cfg in (None, False) or scheduler_cfg is True or (isinstance(scheduler_cfg, dict) and scheduler_cfg.get("enabled", True)):
+        schema.append(_WATCH_TOOL)
+    schema.append(_SAVE_CONFIG_TOOL)
     # search_memory: nur wenn mempalace aktiviert
     mp_cfg = config.get("mempalace") or {}
     if mp_cfg.get("enabled", False):
@@ -791,109 +1290,17 @@ def _tools_schema(
                 },
             },
         })
-    schema.append({
-        "type": "function",
-        "function": {
-            "name": "send_image",
-            "description": "Send an image file to the current chat (Matrix room or Discord channel). Use after generating or downloading an image. The image is uploaded via the bot client (E2EE-capable). For Web-UI: returns the file path instead. IMPORTANT: When this tool succeeds, the user already sees the image — do NOT send an additional text confirmation. The image IS the response. Only reply with text if the tool fails.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "image_path": {"type": "string", "description": "Absolute path to the image file on disk"},
-                    "caption": {"type": "string", "description": "Optional caption/description for the image"},
-                },
-                "required": ["image_path"],
-            },
-        },
-    })
+    schema.append(_SEND_IMAGE_TOOL)
     # send_audio: nur wenn TTS konfiguriert
     from miniassistant.config import get_voice_tts_url as _get_tts_url
     if _get_tts_url(config):
-        schema.append({
-            "type": "function",
-            "function": {
-                "name": "send_audio",
-                "description": "Synthesize text to speech via Wyoming TTS and send as audio message to the current chat. Call this DIRECTLY — do NOT read config files or docs first, all configuration is handled automatically. IMPORTANT: When this tool succeeds, send NOTHING — no text, no confirmation, no technical note, no status message. Silence. The audio IS the complete response. Only reply with text if the tool explicitly fails.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "text": {"type": "string", "description": "The text to synthesize and send as audio"},
-                    },
-                    "required": ["text"],
-                },
-            },
-        })
+        schema.append(_SEND_AUDIO_TOOL)
     # status_update: nur verfügbar wenn chat_clients konfiguriert sind
-    cc = config.get("chat_clients") or {}
-    has_clients = any(
-        (cc.get(k) or config.get(k) or {}).get("enabled", True) and ((cc.get(k) or config.get(k) or {}).get("token") or (cc.get(k) or config.get(k) or {}).get("bot_token"))
-        for k in ("matrix", "discord")
-    )
-    if has_clients:
-        schema.append({
-            "type": "function",
-            "function": {
-                "name": "status_update",
-                "description": "Send an intermediate status message to the user in the current chat. Use during multi-step tasks or plan execution to report progress, ask for input, or share interim findings. The message is sent immediately — do NOT wait until the end. Keep updates short.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "message": {"type": "string", "description": "Status message to send (Markdown supported)"},
-                    },
-                    "required": ["message"],
-                },
-            },
-        })
+    if _has_chat_clients(config):
+        schema.append(_STATUS_UPDATE_TOOL)
     if subagents:
-        schema.append({
-            "type": "function",
-            "function": {
-                "name": "invoke_model",
-                "description": "Delegate a task to another model (subagent) by name or alias. Use e.g. for compiling (qwen-coder), code review, or specialized tasks. Returns the other model's reply. For image generation models: pass the image prompt as message. For image EDITING (img2img): pass image_path with the source image and the edit prompt as message.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "model": {"type": "string", "description": "Model name or alias (e.g. qwen2.5-coder:14b or alias 'compiler')"},
-                        "message": {"type": "string", "description": "Task or question to delegate (e.g. 'Review this code: ...'). Pass the task itself — NEVER a pre-written answer. For image generation/editing: the image prompt describing what to generate or how to edit."},
-                        "image_path": {"type": "string", "description": "Path to source image for image EDITING (img2img). When set, the image generation model will edit/transform this image based on the prompt instead of generating from scratch. Use the path from the [Hochgeladenes Bild] info."},
-                        "strength": {"type": "number", "description": "How much to change the source image (0.0 = keep original, 1.0 = ignore original). Default depends on backend. Only for image editing."},
-                        "size": {"type": "string", "description": "Image size for image generation models (e.g. '512x512', '1024x1024'). Default: 1024x1024."},
-                        "steps": {"type": "integer", "description": "Number of diffusion steps. Only pass when the user explicitly requests a specific step count."},
-                        "cfg_scale": {"type": "number", "description": "CFG scale. Only pass when the user explicitly requests it."},
-                        "guidance": {"type": "number", "description": "Distilled guidance scale (Flux models). Only pass when explicitly requested."},
-                        "seed": {"type": "integer", "description": "RNG seed for reproducible results. Only pass when explicitly requested. -1 = random."},
-                        "negative_prompt": {"type": "string", "description": "Negative prompt — what to avoid. Only pass when the user specifies what to avoid."},
-                        "sampler": {"type": "string", "description": "Sampling method (euler, euler_a, dpm++2m, lcm, etc.). Only pass when explicitly requested."},
-                        "scheduler": {"type": "string", "description": "Scheduler (discrete, karras, simple, etc.). Only pass when explicitly requested."},
-                    },
-                    "required": ["model", "message"],
-                },
-            },
-        })
-        schema.append({
-            "type": "function",
-            "function": {
-                "name": "debate",
-                "description": "Start a structured multi-round debate/discussion between two AI perspectives. "
-                    "USE THIS when the user says: 'diskutiere mit subworker', 'halte eine Diskussion', 'debattiere', "
-                    "'lass zwei Modelle diskutieren', 'hole zwei Meinungen ein', or similar. "
-                    "Both sides are argued by subagent(s). Transcript saved to Markdown file. "
-                    "Between rounds, arguments are summarized so small models keep context.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "topic": {"type": "string", "description": "The debate topic or question"},
-                        "perspective_a": {"type": "string", "description": "Position/viewpoint of side A (e.g. 'Pro Kernenergie')"},
-                        "perspective_b": {"type": "string", "description": "Position/viewpoint of side B (e.g. 'Contra Kernenergie')"},
-                        "model": {"type": "string", "description": "Subagent model for side A (and B if model_b not set)"},
-                        "model_b": {"type": "string", "description": "Optional: different subagent model for side B. Defaults to model."},
-                        "rounds": {"type": "integer", "description": "Number of back-and-forth rounds (1-10, default 3)"},
-                        "language": {"type": "string", "description": "Response language (default: Deutsch)"},
-                    },
-                    "required": ["topic", "perspective_a", "perspective_b", "model"],
-                },
-            },
-        })
+        schema.append(_INVOKE_MODEL_TOOL)
+        schema.append(_DEBATE_TOOL)
     return schema
 
 
@@ -917,15 +1324,12 @@ def get_subagent_tools_schema(config: dict[str, Any]) -> list[dict[str, Any]]:
     ]
     search_engines = config.get("search_engines") or {}
     if search_engines:
-        engine_ids = list(search_engines.keys())
-        default_id = config.get("default_search_engine") or (engine_ids[0] if engine_ids else None)
-        strategy = (config.get("search_engine_strategy") or "first").strip().lower()
-        if strategy == "specific":
-            desc = "Search the web via SearXNG. Use engine '" + (default_id or "") + "' only — do NOT use other engines."
-        elif strategy == "random":
-            desc = "Search the web via SearXNG. Available engines: " + ", ".join(engine_ids) + ". A random engine is selected automatically — omit the engine parameter unless the user explicitly requests one."
-        else:
-            desc = "Search the web via SearXNG. Available engines: " + ", ".join(engine_ids) + ". Default is '" + (default_id or "") + "'. Only specify engine if the user explicitly requests a different one."
+        desc = _web_search_desc(
+            tuple(search_engines),
+            config.get("default_search_engine"),
+            config.get("search_engine_strategy"),
+            routing_hint=False,
+        )
         schema.append({
             "type": "function",
             "function": {
@@ -983,27 +1387,62 @@ def get_subagent_tools_schema(config: dict[str, Any]) -> list[dict[str, Any]]:
     return schema
 
 
-def _normalize_images(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    """Konvertiert Bilder im internen Format {mime_type, data} zu reinen base64-Strings für Ollama."""
-    out: list[dict[str, Any]] = []
+def _normalize_images(
+    messages: list[dict[str, Any]],
+    head: list[dict[str, Any]] | None = None,
+) -> list[dict[str, Any]]:
+    """Konvertiert Bilder im internen Format {mime_type, data} zu reinen base64-Strings für Ollama.
+    Rohe Bytes dürfen stehen bleiben — _json_dumps kodiert sie beim Serialisieren.
+    head: Nachrichten, die vorangestellt werden (System-Prompt) — in derselben Liste, keine zweite Kopie.
+    Ohne Bilder und ohne head (Normalfall) wird die Liste unverändert zurückgegeben — keine Kopie."""
+    if not any(m.get("images") for m in messages):
+        return head + messages if head else messages
+    out: list[dict[str, Any]] = list(head) if head else []
     for msg in messages:
         images = msg.get("images")
-        if not images:
+        # Bereits reine base64-Strings (oder Bytes, kodiert _json_dumps) → Nachricht unverändert übernehmen
+        if not images or all(isinstance(img, (str, bytes)) for img in images):
             out.append(msg)
             continue
-        converted: list[str] = []
+        converted: list[str | bytes] = []
         for img in images:
             if isinstance(img, dict):
                 converted.append(img.get("data") or "")
-            elif isinstance(img, str):
+            elif isinstance(img, (str, bytes)):
                 converted.append(img)
-        if converted:
-            msg = dict(msg)
-            msg["images"] = converted
-        out.append(msg)
+        out.append({**msg, "images": converted} if converted else msg)
+    return out
+
+
+def _drain_ndjson(buf: bytearray) -> list[dict[str, Any]]:
+    """Parst alle vollständigen NDJSON-Zeilen aus buf und entfernt sie; ein angefangener Rest bleibt stehen.
+    Direkt auf Bytes (orjson/json.loads lesen UTF-8) — kein Zwischen-str pro Zeile wie bei iter_lines."""
+    out: list[dict[str, Any]] = []
+    start = 0
+    while True:
+        nl = buf.find(b"\n", start)
+        if nl < 0:
+            break
+        if nl > start:
+            line = bytes(buf[start:nl])
+            if line.strip():
+                out.append(_json_loads(line))
+        start = nl + 1
+    if start:
+        del buf[:start]
     return out
 
 
+def _iter_ndjson(chunks: Iterable[bytes]) -> Iterator[dict[str, Any]]:
+    """NDJSON-Objekte aus einem Byte-Chunk-Iterator (response.iter_bytes)."""
+    buf = bytearray()
+    for chunk in chunks:
+        buf += chunk
+        yield from _drain_ndjson(buf)
+    if buf.strip():
+        yield _json_loads(bytes(buf))
+
+
 def _chat_body(
     model: str,
     messages: list[dict[str, Any]],
@@ -1016,9 +1455,8 @@ def _chat_body(
     stream: bool = False,
 ) -> dict[str, Any]:
     """Baut den Request-Body für /api/chat. System-Prompt als system-role Message (Ollama /api/chat Standard)."""
-    msgs = _normalize_images(list(messages))
-    if system:
-        msgs = [{"role": "system", "content": system}] + msgs
+    # Body wird nur serialisiert, nie verändert → die Nachrichtenliste des Aufrufers darf direkt hinein
+    msgs = _normalize_images(messages, [{"role": "system", "content": system}] if system else None)
     body: dict[str, Any] = {"model": model, "messages": msgs, "stream": stream}
     opts: dict[str, Any] = dict(options) if options else {}
     if num_ctx is not None:
@@ -1033,6 +1471,40 @@ def _chat_body(
     return body
 
 
+@functools.lru_cache(maxsize=16)
+def _chat_timeout(read: float) -> httpx.Timeout:
+    """Timeout-Objekt je read-Timeout nur einmal bauen (Aufrufer nutzen eine Handvoll fester Werte).
+    connect: Verbindung zu Ollama; read: max. Pause zwischen Tokens; pool=600: Modell-Pulls bis 10min."""
+    return httpx.Timeout(connect=30.0, read=read, write=60.0, pool=600.0)
+
+
+# Antwort-Cache für deterministische Non-Streaming-Chats (temperature=0, keine Tools) oder explizit cache=True.
+# Schlüssel = BLAKE2b über base_url + serialisierten Request-Body; gespeichert werden die rohen Antwort-Bytes,
+# jeder Treffer parst neu → Aufrufer bekommen ein eigenes Dict. Nur im RAM, LRU + TTL.
+_RESP_CACHE: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+_RESP_CACHE_LOCK = threading.Lock()
+_RESP_CACHE_MAX = 256
+_RESP_CACHE_TTL = 3600.0
+_RESP_CACHE_MAX_BYTES = 1024 * 1024  # größere Antworten nicht cachen
+
+
+def _response_cacheable(body: dict[str, Any]) -> bool:
+    """Auto-Modus: nur temperature=0 ohne Tools (Tool-Calls hängen vom Laufzeitzustand ab)."""
+    if body.get("tools"):
+        return False
+    temp = (body.get("options") or {}).get("temperature")
+    try:
+        return temp is not None and float(temp) == 0.0
+    except (TypeError, ValueError):
+        return False
+
+
+def clear_response_cache() -> None:
+    """Leert den chat()-Antwort-Cache."""
+    with _RESP_CACHE_LOCK:
+        _RESP_CACHE.clear()
+
+
 def chat(
     base_url: str,
     messages: list[dict[str, Any]],
@@ -1045,19 +1517,37 @@ def chat(
     options: dict[str, Any] | None = None,
     api_key: str | None = None,
     timeout: float = 600.0,
+    http2: bool = False,
+    cache: bool | None = None,
 ) -> dict[str, Any]:
     """
     POST /api/chat (non-streaming). Gibt die komplette JSON-Antwort zurück.
+    cache: True = Antwort-Cache nutzen, False = nie, None (Default) = nur bei temperature=0 ohne Tools.
     """
-    import json as _json
     url = f"{base_url.rstrip('/')}/api/chat"
     body = _chat_body(model=model, messages=messages, system=system, num_ctx=num_ctx, think=think, tools=tools, options=options, stream=False)
-    # pool=600: langsame Modell-Pulls bei Ollama dürfen bis 10min warten
-    _timeout = httpx.Timeout(connect=30.0, read=timeout, write=60.0, pool=600.0)
-    with httpx.Client(timeout=_timeout, headers=_auth_headers(api_key)) as client:
-        r = client.post(url, json=body)
-        r.raise_for_status()
-        return r.json()
+    payload = _json_dumps(body)
+    cache_key: str | None = None
+    if cache or (cache is None and _response_cacheable(body)):
+        cache_key = cache_key_hash(url, payload)
+        now = time.monotonic()
+        with _RESP_CACHE_LOCK:
+            hit = _RESP_CACHE.get(cache_key)
+            if hit is not None and hit[0] > now:
+                _RESP_CACHE.move_to_end(cache_key)
+                return _json_loads(hit[1])
+    _timeout = _chat_timeout(timeout)
+    r = _get_client(base_url, api_key, http2).post(url, content=payload, headers=_JSON_HEADERS, timeout=_timeout)
+    r.raise_for_status()
+    data = r.content
+    result = _json_loads(data)
+    if cache_key is not None and len(data) <= _RESP_CACHE_MAX_BYTES:
+        with _RESP_CACHE_LOCK:
+            _RESP_CACHE[cache_key] = (time.monotonic() + _RESP_CACHE_TTL, data)
+            _RESP_CACHE.move_to_end(cache_key)
+            while len(_RESP_CACHE) > _RESP_CACHE_MAX:
+                _RESP_CACHE.popitem(last=False)
+    return result
 
 
 def chat_stream(
@@ -1072,17 +1562,42 @@ def chat_stream(
     options: dict[str, Any] | None = None,
     api_key: str | None = None,
     timeout: float = 300.0,
+    http2: bool = False,
 ):
     """POST /api/chat mit stream=True. Generiert Chunk-Dicts (NDJSON)."""
-    import json as _json
     url = f"{base_url.rstrip('/')}/api/chat"
     body = _chat_body(model=model, messages=messages, system=system, num_ctx=num_ctx, think=think, tools=tools, options=options, stream=True)
-    # connect: Verbindung zu Ollama; read: max. Pause zwischen Tokens; pool=600: Modell-Pulls bis 10min
-    _timeout = httpx.Timeout(connect=30.0, read=timeout, write=60.0, pool=600.0)
-    with httpx.Client(timeout=_timeout, headers=_auth_headers(api_key)) as client:
-        with client.stream("POST", url, json=body) as response:
-            response.raise_for_status()
-            for line in response.iter_lines():
-                if not line:
-                    continue
-                yield _json.loads(line)
+    _timeout = _chat_timeout(timeout)
+    with _get_client(base_url, api_key, http2).stream("POST", url, content=_json_dumps(body), headers=_JSON_HEADERS, timeout=_timeout) as response:
+        response.raise_for_status()
+        yield from _iter_ndjson(response.iter_bytes())
+
+
+async def chat_stream_async(
+    base_url: str,
+    messages: list[dict[str, Any]],
+    *,
+    model: str,
+    system: str | None = None,
+    num_ctx: int | None = None,
+    think: bool | None = None,
+    tools: list[dict[str, Any]] | None = None,
+    options: dict[str, Any] | None = None,
+    api_key: str | None = None,
+    timeout: float = 300.0,
+    http2: bool = False,
+) -> AsyncIterator[dict[str, Any]]:
+    """Async-Variante von chat_stream (httpx.AsyncClient + aiter_bytes → _drain_ndjson): blockiert keinen Thread
+    zwischen den Tokens, mehrere Streams teilen sich einen Event-Loop. Gleiche Parameter und Chunk-Dicts (NDJSON)."""
+    url = f"{base_url.rstrip('/')}/api/chat"
+    body = _chat_body(model=model, messages=messages, system=system, num_ctx=num_ctx, think=think, tools=tools, options=options, stream=True)
+    _timeout = _chat_timeout(timeout)
+    async with _get_async_client(base_url, api_key, http2).stream("POST", url, content=_json_dumps(body), headers=_JSON_HEADERS, timeout=_timeout) as response:
+        response.raise_for_status()
+        buf = bytearray()
+        async for chunk in response.aiter_bytes():
+            buf += chunk
+            for obj in _drain_ndjson(buf):
+                yield obj
+        if buf.strip():
+            yield _json_loads(bytes(buf))
@@ -11,27 +11,98 @@ Unterstützt:
 
 Auth: API-Key als Bearer Token (Authorization: Bearer sk-...).
 Kompatibel mit OpenAI-kompatiblen APIs (Together, Groq, Perplexity, etc.) via base_url.
+
+Messages und Responses bleiben bewusst plain dicts (Message/Response-Aliase unten): orjson
+serialisiert/parst sie direkt ohne Zwischenschicht. Keine pydantic-Modelle in den Hot-Path
+(Konvertierung, Streaming) ohne vorherigen Benchmark (TypeAdapter, model_dump(mode="python")).
 """
 from __future__ import annotations
 
+import atexit
 import base64
+import functools
+import gzip
 import json
 import logging
-from typing import Any, Generator
+import re
+import threading
+import time
+from typing import Any, Generator, Iterable, Iterator
 
 import httpx
 
+from miniassistant._json import dumps as _json_dumps, dumps_str as _json_dumps_str, loads as _json_loads
+from miniassistant.ollama_client import cache_key_hash, client_limits, http2_enabled
+
 _log = logging.getLogger("miniassistant.openai_client")
 
+# Interne Formate (einheitlich mit ollama_client): plain dicts, siehe Modul-Docstring
+Message = dict[str, Any]
+Response = dict[str, Any]
+
 # OpenAI API Defaults
 OPENAI_API_URL = "https://api.openai.com"
 _TIMEOUT = 120
 
+# Prozessweite HTTP-Clients pro (base_url, Key-Hash, http2): Keep-Alive-Pool statt neuem TCP/TLS-Handshake
+# pro Request; Auth-/Content-Type-Header sitzen einmal am Client. httpx.Client ist thread-safe.
+_CLIENTS: dict[tuple[str, str, bool], httpx.Client] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _get_client(base_url: str, api_key: str | None = None, http2: bool = False) -> httpx.Client:
+    http2 = http2_enabled(http2)
+    key = (base_url.rstrip("/"), cache_key_hash(api_key), http2)
+    client = _CLIENTS.get(key)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(key)
+            if client is None:
+                # API-Wurzel (inkl. /v1) einmal am Client → Requests nutzen relative Pfade wie "/chat/completions"
+                client = httpx.Client(
+                    base_url=_api_url(base_url, ""),
+                    timeout=_TIMEOUT,
+                    headers=_api_headers(api_key),
+                    limits=client_limits(http2),
+                    http2=http2,
+                )
+                _CLIENTS[key] = client
+    return client
+
+
+def _close_clients() -> None:
+    with _CLIENTS_LOCK:
+        for client in _CLIENTS.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+        _CLIENTS.clear()
+
+
+atexit.register(_close_clients)
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Auth + Helpers
 # ═══════════════════════════════════════════════════════════════════════════
 
+# Ab dieser Größe lohnt gzip für Bild-Bodies (base64 komprimiert gut); compresslevel=1 für Tempo
+_GZIP_MIN_BYTES = 64_000
+_GZIP_HEADERS = {"Content-Encoding": "gzip"}
+
+
+def _request_payload(
+    body: dict[str, Any], messages: list[dict[str, Any]], gzip_requests: bool,
+) -> tuple[bytes, dict[str, str] | None]:
+    """Serialisiert body; mit gzip_requests (providers.<name>.gzip_requests) werden große Bild-Requests
+    gzip-komprimiert. Opt-in, da viele OpenAI-kompatible Server Content-Encoding im Request nicht kennen."""
+    payload = _json_dumps(body)
+    if gzip_requests and len(payload) > _GZIP_MIN_BYTES and any(m.get("images") for m in messages):
+        return gzip.compress(payload, compresslevel=1), _GZIP_HEADERS
+    return payload, None
+
+
 def _api_headers(api_key: str | None) -> dict[str, str]:
     """Standard-Header für OpenAI-kompatible APIs. Ohne api_key wird kein Auth-Header gesendet."""
     headers: dict[str, str] = {"Content-Type": "application/json"}
@@ -50,42 +121,59 @@ def _api_url(base_url: str, path: str) -> str:
     return f"{base}/v1{path}"
 
 
+# o-Serie (o1, o3, o3-mini, o4-mini, ...) und GPT-5.x und neuer
+_MCT_PREFIXES = ("o1", "o3", "o4", "gpt-5", "gpt-6")
+
+
+@functools.lru_cache(maxsize=256)
 def _uses_max_completion_tokens(model: str) -> bool:
     """Erkennt Modelle die max_completion_tokens statt max_tokens benötigen.
     Betrifft: o-Serie (o1, o3, o4-mini, ...), GPT-5.x+, und alle neueren Modelle.
-    Bei unbekannten Modellen: lieber max_completion_tokens (ist der neuere Standard)."""
+    Bei unbekannten Modellen: lieber max_completion_tokens (ist der neuere Standard).
+    Reine Funktion des Modellnamens → pro Name nur einmal ausgewertet."""
     m = model.lower().strip()
-    # o-Serie: o1, o3, o3-mini, o4-mini, ...
-    if m.startswith(("o1", "o3", "o4")):
-        return True
-    # GPT-5.x und neuer
-    if m.startswith("gpt-5") or m.startswith("gpt-6"):
-        return True
-    # chatgpt-4o-latest und ähnliche wrapper-Modelle
-    if "chatgpt" in m:
-        return True
-    # GPT-4o bleibt bei max_tokens (Abwärtskompatibilität)
-    return False
+    # chatgpt-4o-latest und ähnliche wrapper-Modelle; GPT-4o bleibt bei max_tokens (Abwärtskompatibilität)
+    return m.startswith(_MCT_PREFIXES) or "chatgpt" in m
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Models
 # ═══════════════════════════════════════════════════════════════════════════
 
+# Modell-Listen pro (base_url, Key-Hash) → (Zeitstempel, Liste). Der Key selbst wird nicht im Cache gehalten.
+_MODELS_CACHE: dict[tuple[str, str], tuple[float, list[dict[str, Any]]]] = {}
+_MODELS_CACHE_LOCK = threading.Lock()
+
+
+def _models_cache_key(base_url: str, api_key: str | None) -> tuple[str, str]:
+    return (base_url.rstrip("/"), cache_key_hash(api_key))
+
+
 def api_list_models(
     api_key: str,
     base_url: str = OPENAI_API_URL,
+    *,
+    http2: bool = False,
+    cache_ttl: float = 60,
+    force_refresh: bool = False,
 ) -> list[dict[str, Any]]:
     """
     Listet verfügbare Modelle über GET /v1/models.
     Returns: Liste von {name, owned_by} Dicts.
+    Ergebnis wird cache_ttl Sekunden pro (base_url, api_key) gecacht; cache_ttl=0 oder
+    force_refresh=True fragen die API direkt ab.
     """
     # api_key ist optional für OpenAI-kompatible APIs (z.B. vLLM, llama.cpp)
-    url = _api_url(base_url, "/models")
+    cache_key = _models_cache_key(base_url, api_key)
+    if cache_ttl > 0 and not force_refresh:
+        with _MODELS_CACHE_LOCK:
+            cached = _MODELS_CACHE.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < cache_ttl:
+            return [dict(m) for m in cached[1]]
     try:
-        r = httpx.get(url, headers=_api_headers(api_key), timeout=_TIMEOUT)
+        r = _get_client(base_url, api_key, http2).get("/models", timeout=_TIMEOUT)
         r.raise_for_status()
-        data = r.json()
+        data = _json_loads(r.content)
         models = data.get("data") or []
         out: list[dict[str, Any]] = []
         for m in models:
@@ -98,6 +186,9 @@ def api_list_models(
             })
         # Alphabetisch sortieren
         out.sort(key=lambda x: x["name"])
+        if cache_ttl > 0:
+            with _MODELS_CACHE_LOCK:
+                _MODELS_CACHE[cache_key] = (time.monotonic(), [dict(m) for m in out])
         return out
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 401:
@@ -113,10 +204,138 @@ def api_list_models(
 # Message Conversion
 # ═══════════════════════════════════════════════════════════════════════════
 
+_DATA_URL_PREFIX: dict[str, str] = {
+    m: f"data:{m};base64,"
+    for m in ("image/png", "image/jpeg", "image/webp", "image/gif")
+}
+
+
+def _data_url(data: str | bytes, mime: str = "image/png") -> str:
+    """base64-Bilddaten als data-URL. Bereits fertige data-URLs gehen unverändert durch
+    (keine zweite Kopie des MB-großen Strings); Roh-Bytes werden base64-kodiert.
+    ValueError bei fehlenden Daten (None) oder unbekanntem Typ."""
+    if isinstance(data, (bytes, bytearray)):
+        data = base64.b64encode(data).decode("ascii")
+    elif not isinstance(data, str):
+        raise ValueError(f"Bilddaten fehlen oder haben unbekannten Typ: {type(data).__name__}")
+    elif data.startswith("data:"):
+        return data
+    prefix = _DATA_URL_PREFIX.get(mime) or f"data:{mime};base64,"
+    return prefix + data
+
+
+def _conv_system(msg: dict[str, Any], api_msgs: list[dict[str, Any]], counter: int) -> tuple[dict[str, Any], int]:
+    # Zusätzliche System-Messages durchreichen
+    return {"role": "system", "content": msg.get("content", "")}, counter
+
+
+def _conv_tool(msg: dict[str, Any], api_msgs: list[dict[str, Any]], counter: int) -> tuple[dict[str, Any], int]:
+    get = msg.get
+    # Prüfen ob die vorherige assistant-Nachricht tool_calls hat.
+    # Bei no_api_tools (XML-Tool-Calls) hat sie keines → tool-Result als user senden,
+    # da vLLM ohne passendes tool_calls-Array im assistant die role:tool-Message ablehnt.
+    prev_assistant = next((m for m in reversed(api_msgs) if m.get("role") == "assistant"), None)
+    if not (prev_assistant and prev_assistant.get("tool_calls")):
+        tool_name = get("tool_name", "tool")
+        return {
+            "role": "user",
+            "content": f"<tool_response>\n<tool_name>{tool_name}</tool_name>\n<content>{get('content', '')}</content>\n</tool_response>",
+        }, counter
+    # Standard OpenAI tool_call_id matching
+    tool_call_id = get("tool_call_id", "")
+    if not tool_call_id:
+        counter += 1
+        tool_call_id = f"call_{counter}"
+    return {
+        "role": "tool",
+        "tool_call_id": tool_call_id,
+        "content": get("content", ""),
+    }, counter
+
+
+def _conv_assistant(msg: dict[str, Any], api_msgs: list[dict[str, Any]], counter: int) -> tuple[dict[str, Any], int]:
+    out_msg: dict[str, Any] = {
+        "role": "assistant",
+        "content": msg.get("content") or "",
+    }
+    # Tool-Calls durchreichen wenn vorhanden
+    tool_calls = msg.get("tool_calls")
+    if tool_calls:
+        openai_tcs = []
+        for tc in tool_calls:
+            fn = tc.get("function") or {}
+            tc_id = tc.get("id", "")
+            if not tc_id:
+                counter += 1
+                tc_id = f"call_{counter}"
+            args = fn.get("arguments")
+            if isinstance(args, dict):
+                args = _json_dumps_str(args)
+            openai_tcs.append({
+                "id": tc_id,
+                "type": "function",
+                "function": {
+                    "name": fn.get("name", ""),
+                    "arguments": args or "{}",
+                },
+            })
+        out_msg["tool_calls"] = openai_tcs
+        # OpenAI: wenn tool_calls vorhanden, content kann null sein
+        if not out_msg["content"]:
+            out_msg["content"] = None
+    return out_msg, counter
+
+
+def _conv_user(msg: dict[str, Any], api_msgs: list[dict[str, Any]], counter: int) -> tuple[dict[str, Any], int]:
+    get = msg.get
+    images = get("images")
+    content_text = get("content", "")
+    if not images:
+        return {"role": "user", "content": content_text}, counter
+    # Multi-Part Content (Text + Bilder)
+    parts: list[dict[str, Any]] = []
+    if content_text:
+        parts.append({"type": "text", "text": content_text})
+    for img in images:
+        if isinstance(img, dict):
+            data = img.get("data")
+            if not data:
+                _log.warning("Bild ohne Daten übersprungen")
+                continue
+            parts.append({
+                "type": "image_url",
+                "image_url": {"url": _data_url(data, img.get("mime_type") or "image/png")},
+            })
+        elif isinstance(img, (str, bytes)):
+            parts.append({
+                "type": "image_url",
+                "image_url": {"url": _data_url(img)},
+            })
+    return {"role": "user", "content": parts}, counter
+
+
+# Rolle → Konverter (msg, bisherige api_msgs, tool_call_counter) → (api_msg, tool_call_counter).
+# Unbekannte Rollen werden wie user behandelt.
+_ROLE_HANDLERS = {
+    "system": _conv_system,
+    "tool": _conv_tool,
+    "assistant": _conv_assistant,
+    "user": _conv_user,
+}
+
+
+def _convert_text_message(msg: dict[str, Any]) -> dict[str, Any]:
+    """Schnellpfad von _convert_messages für Messages ohne Bilder/Tool-Calls (gleiche Ausgabe wie die Handler)."""
+    role = msg.get("role", "user")
+    if role == "assistant":
+        return {"role": "assistant", "content": msg.get("content") or ""}
+    return {"role": "system" if role == "system" else "user", "content": msg.get("content", "")}
+
+
 def _convert_messages(
-    messages: list[dict[str, Any]],
+    messages: list[Message],
     system: str | None = None,
-) -> list[dict[str, Any]]:
+) -> list[Message]:
     """Konvertiert interne Messages ins OpenAI Chat Completions Format.
     Internes Format: {role: user/assistant/system/tool, content: str, images: [...], tool_calls: [...]}
     OpenAI Format: {role: system/user/assistant/tool, content: str|[{type:text,...},{type:image_url,...}]}
@@ -129,102 +348,33 @@ def _convert_messages(
     if system:
         api_msgs.append({"role": "system", "content": system})
 
-    _tool_call_counter = 0
+    # Reiner Text-Verlauf (häufigster Fall): keine Bilder, keine Tool-Calls → nur role/content kopieren
+    if not any(m.get("images") or m.get("tool_calls") or m.get("role") == "tool" for m in messages):
+        api_msgs.extend(_convert_text_message(m) for m in messages)
+        return api_msgs
 
+    _tool_call_counter = 0
+    handlers = _ROLE_HANDLERS
+    append = api_msgs.append
     for msg in messages:
-        role = msg.get("role", "user")
-
-        if role == "system":
-            # Zusätzliche System-Messages durchreichen
-            api_msgs.append({"role": "system", "content": msg.get("content", "")})
-            continue
-
-        if role == "tool":
-            # Prüfen ob die vorherige assistant-Nachricht tool_calls hat.
-            # Bei no_api_tools (XML-Tool-Calls) hat sie keines → tool-Result als user senden,
-            # da vLLM ohne passendes tool_calls-Array im assistant die role:tool-Message ablehnt.
-            prev_assistant = next((m for m in reversed(api_msgs) if m.get("role") == "assistant"), None)
-            if not (prev_assistant and prev_assistant.get("tool_calls")):
-                tool_name = msg.get("tool_name", "tool")
-                api_msgs.append({
-                    "role": "user",
-                    "content": f"<tool_response>\n<tool_name>{tool_name}</tool_name>\n<content>{msg.get('content', '')}</content>\n</tool_response>",
-                })
-            else:
-                # Standard OpenAI tool_call_id matching
-                tool_call_id = msg.get("tool_call_id", "")
-                if not tool_call_id:
-                    _tool_call_counter += 1
-                    tool_call_id = f"call_{_tool_call_counter}"
-                api_msgs.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call_id,
-                    "content": msg.get("content", ""),
-                })
-            continue
-
-        if role == "assistant":
-            out_msg: dict[str, Any] = {
-                "role": "assistant",
-                "content": msg.get("content") or "",
-            }
-            # Tool-Calls durchreichen wenn vorhanden
-            tool_calls = msg.get("tool_calls")
-            if tool_calls:
-                openai_tcs = []
-                for i, tc in enumerate(tool_calls):
-                    fn = tc.get("function") or {}
-                    tc_id = tc.get("id", "")
-                    if not tc_id:
-                        _tool_call_counter += 1
-                        tc_id = f"call_{_tool_call_counter}"
-                    args = fn.get("arguments")
-                    if isinstance(args, dict):
-                        args = json.dumps(args)
-                    openai_tcs.append({
-                        "id": tc_id,
-                        "type": "function",
-                        "function": {
-                            "name": fn.get("name", ""),
-                            "arguments": args or "{}",
-                        },
-                    })
-                out_msg["tool_calls"] = openai_tcs
-                # OpenAI: wenn tool_calls vorhanden, content kann null sein
-                if not out_msg["content"]:
-                    out_msg["content"] = None
-            api_msgs.append(out_msg)
-            continue
-
-        # User-Message
-        images = msg.get("images") or []
-        content_text = msg.get("content", "")
-
-        if images:
-            # Multi-Part Content (Text + Bilder)
-            parts: list[dict[str, Any]] = []
-            if content_text:
-                parts.append({"type": "text", "text": content_text})
-            for img in images:
-                if isinstance(img, dict):
-                    mime = img.get("mime_type", "image/png")
-                    data = img.get("data", "")
-                    parts.append({
-                        "type": "image_url",
-                        "image_url": {"url": f"data:{mime};base64,{data}"},
-                    })
-                elif isinstance(img, str):
-                    parts.append({
-                        "type": "image_url",
-                        "image_url": {"url": f"data:image/png;base64,{img}"},
-                    })
-            api_msgs.append({"role": "user", "content": parts})
-        else:
-            api_msgs.append({"role": "user", "content": content_text})
+        handler = handlers.get(msg.get("role", "user"), _conv_user)
+        api_msg, _tool_call_counter = handler(msg, api_msgs, _tool_call_counter)
+        append(api_msg)
 
     return api_msgs
 
 
+_OPENAI_FN_KEYS = frozenset(("name", "description", "parameters"))
+
+
+def _is_openai_tool(tool: dict[str, Any]) -> bool:
+    """True wenn tool exakt dem Ergebnis von _convert_tools entspricht (keine Umbauten nötig)."""
+    if tool.keys() != {"type", "function"} or tool["type"] != "function":
+        return False
+    fn = tool["function"]
+    return isinstance(fn, dict) and fn.keys() == _OPENAI_FN_KEYS and bool(fn["name"]) and bool(fn["parameters"])
+
+
 def _convert_tools(tools: list[dict[str, Any]]) -> list[dict[str, Any]] | None:
     """Konvertiert Ollama-kompatibles Tool-Schema ins OpenAI Format.
     Ollama: [{type: function, function: {name, description, parameters}}]
@@ -232,20 +382,21 @@ def _convert_tools(tools: list[dict[str, Any]]) -> list[dict[str, Any]] | None:
     """
     if not tools:
         return None
-    out: list[dict[str, Any]] = []
-    for tool in tools:
-        fn = tool.get("function") or {}
-        name = fn.get("name", "")
-        if not name:
-            continue
-        out.append({
+    # Schon im Zielformat (Normalfall: get_tools_schema) → Liste unverändert durchreichen, der Body wird nur serialisiert
+    if all(_is_openai_tool(tool) for tool in tools):
+        return tools
+    out = [
+        {
             "type": "function",
             "function": {
-                "name": name,
+                "name": fn["name"],
                 "description": fn.get("description", ""),
                 "parameters": fn.get("parameters") or {"type": "object", "properties": {}},
             },
-        })
+        }
+        for fn in (tool.get("function") or {} for tool in tools)
+        if fn.get("name")
+    ]
     return out if out else None
 
 
@@ -253,55 +404,56 @@ def _convert_tools(tools: list[dict[str, Any]]) -> list[dict[str, Any]] | None:
 # Response Parsing
 # ═══════════════════════════════════════════════════════════════════════════
 
-def _parse_response(resp: dict[str, Any]) -> dict[str, Any]:
+def _safe_json_loads(args: Any) -> Any:
+    """Tool-Argumente als JSON-String → Objekt; kaputtes JSON → {}, Nicht-Strings unverändert."""
+    if not isinstance(args, str):
+        return args
+    try:
+        return _json_loads(args)
+    except json.JSONDecodeError:
+        return {}
+
+
+def _parse_response(resp: Response) -> Response:
     """Parst OpenAI Chat Completions Response → einheitliches Format (kompatibel mit Ollama).
     Extrahiert content, tool_calls, reasoning aus choices[0].message.
     """
-    choices = resp.get("choices") or []
+    choices = resp.get("choices")
     if not choices:
-        error = resp.get("error") or {}
-        if error:
-            err_msg = error.get("message", str(error))
-            return {
-                "message": {"role": "assistant", "content": f"[OpenAI Error: {err_msg}]", "thinking": ""},
-                "model": resp.get("model", ""),
-                "done": True,
-                "provider": "openai",
-            }
+        error = resp.get("error")
+        if isinstance(error, dict):
+            err_msg = error.get("message", str(error)) if error else ""
+        else:
+            err_msg = str(error) if error else ""
         return {
-            "message": {"role": "assistant", "content": "", "thinking": ""},
+            "message": {
+                "role": "assistant",
+                "content": f"[OpenAI Error: {err_msg}]" if err_msg else "",
+                "thinking": "",
+            },
             "model": resp.get("model", ""),
             "done": True,
             "provider": "openai",
         }
 
     choice = choices[0]
-    msg = choice.get("message") or {}
-
-    content = msg.get("content") or ""
-    thinking = ""
+    msg = choice.get("message")
+    if not msg:
+        msg = {}
+    get = msg.get
 
+    content = get("content") or ""
     # Reasoning-Modelle (o1, o3, o4-mini) können reasoning_content haben
-    if msg.get("reasoning_content"):
-        thinking = msg["reasoning_content"]
+    thinking = get("reasoning_content") or ""
 
     # Tool-Calls konvertieren
-    tool_calls: list[dict[str, Any]] = []
-    for tc in msg.get("tool_calls") or []:
-        fn = tc.get("function") or {}
-        args = fn.get("arguments", "{}")
-        if isinstance(args, str):
-            try:
-                args = json.loads(args)
-            except json.JSONDecodeError:
-                args = {}
-        tool_calls.append({
+    tool_calls = [
+        {
             "id": tc.get("id", ""),
-            "function": {
-                "name": fn.get("name", ""),
-                "arguments": args,
-            },
-        })
+            "function": {"name": fn.get("name", ""), "arguments": _safe_json_loads(fn.get("arguments", "{}"))},
+        }
+        for tc, fn in ((tc, tc.get("function") or {}) for tc in get("tool_calls") or ())
+    ]
 
     message: dict[str, Any] = {
         "role": "assistant",
@@ -339,6 +491,8 @@ def api_chat(
     base_url: str = OPENAI_API_URL,
     timeout: int = _TIMEOUT,
     extra_body: dict[str, Any] | None = None,
+    http2: bool = False,
+    gzip_requests: bool = False,
 ) -> dict[str, Any]:
     """
     OpenAI Chat Completions API – POST /v1/chat/completions.
@@ -353,13 +507,13 @@ def api_chat(
         tools: Tool-Schema (Ollama-Format, wird konvertiert)
         options: Zusätzliche Optionen (temperature, top_p, etc.)
         base_url: API Base-URL (für OpenAI-kompatible APIs)
+        http2: HTTP/2 für den gepoolten Client (providers.<name>.http2, braucht h2)
+        gzip_requests: große Bild-Requests gzip-komprimiert senden (providers.<name>.gzip_requests)
 
     Returns: Einheitliches Response-Dict.
     """
     # api_key ist optional für OpenAI-kompatible APIs (z.B. vLLM, llama.cpp)
 
-    url = _api_url(base_url, "/chat/completions")
-
     # Messages konvertieren (System-Prompt wird in Messages eingebaut)
     api_msgs = _convert_messages(messages, system=system)
 
@@ -420,13 +574,16 @@ def api_chat(
         for _k, _v in extra_body.items():
             body.setdefault(_k, _v)
 
-    headers = _api_headers(api_key)
-    _log.debug("OpenAI API: model=%s, msgs=%d, thinking=%s", model, len(api_msgs), thinking)
+    if _log.isEnabledFor(logging.DEBUG):
+        _log.debug("OpenAI API: model=%s, msgs=%d, thinking=%s", model, len(api_msgs), thinking)
 
     try:
-        r = httpx.post(url, headers=headers, json=body, timeout=timeout)
+        payload, extra_headers = _request_payload(body, messages, gzip_requests)
+        r = _get_client(base_url, api_key, http2).post(
+            "/chat/completions", content=payload, headers=extra_headers, timeout=timeout,
+        )
         r.raise_for_status()
-        resp = r.json()
+        resp = _json_loads(r.content)
     except httpx.HTTPStatusError as e:
         status = e.response.status_code
         detail = ""
@@ -455,6 +612,49 @@ def api_chat(
 # Chat (Streaming)
 # ═══════════════════════════════════════════════════════════════════════════
 
+# Schnellpfad für reine Text-Deltas: nur der content-String wird dekodiert statt des ganzen Events.
+# Alles mit Tool-Calls, Reasoning, Timings oder gefüllter usage geht über den vollen JSON-Parse.
+_CONTENT_RE = re.compile(rb'"content"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_FULL_PARSE_MARKERS = (b'"tool_calls"', b'"reasoning_content"', b'"timings"')
+
+
+def _fast_sse_content(data: bytes) -> str | None:
+    """content eines reinen Text-Deltas ohne vollen JSON-Parse; None → Event voll parsen."""
+    for marker in _FULL_PARSE_MARKERS:
+        if marker in data:
+            return None
+    if b'"usage"' in data and b'"usage":null' not in data:
+        return None
+    m = _CONTENT_RE.search(data)
+    if m is None:
+        return None
+    try:
+        return _json_loads(b'"' + m.group(1) + b'"')
+    except json.JSONDecodeError:
+        return None
+
+
+def _iter_sse_data(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Payloads der SSE-"data: "-Zeilen aus einem Byte-Chunk-Iterator (response.iter_bytes).
+    Bleibt auf Bytes (orjson/json.loads lesen UTF-8) — kein str-Decode pro Zeile wie bei iter_lines.
+    Andere SSE-Felder (event:, id:, Kommentare) werden übersprungen."""
+    buf = bytearray()
+    for chunk in chunks:
+        buf += chunk
+        start = 0
+        while True:
+            nl = buf.find(b"\n", start)
+            if nl < 0:
+                break
+            if buf.startswith(b"data: ", start):
+                yield bytes(buf[start + 6:nl]).rstrip(b"\r")
+            start = nl + 1
+        if start:
+            del buf[:start]
+    if buf.startswith(b"data: "):
+        yield bytes(buf[6:]).rstrip(b"\r")
+
+
 def api_chat_stream(
     messages: list[dict[str, Any]],
     *,
@@ -468,6 +668,8 @@ def api_chat_stream(
     base_url: str = OPENAI_API_URL,
     timeout: int = _TIMEOUT,
     extra_body: dict[str, Any] | None = None,
+    http2: bool = False,
+    gzip_requests: bool = False,
 ) -> Generator[dict[str, Any], None, None]:
     """
     OpenAI Chat Completions API mit Streaming (SSE).
@@ -475,7 +677,6 @@ def api_chat_stream(
     """
     # api_key ist optional für OpenAI-kompatible APIs (z.B. vLLM, llama.cpp)
 
-    url = _api_url(base_url, "/chat/completions")
     api_msgs = _convert_messages(messages, system=system)
 
     _use_mct = _uses_max_completion_tokens(model)
@@ -525,36 +726,34 @@ def api_chat_stream(
         for _k, _v in extra_body.items():
             body.setdefault(_k, _v)
 
-    headers = _api_headers(api_key)
-
-    # Akkumulierte Tool-Calls für Streaming (OpenAI streamt sie in Teilen)
-    _tool_calls_acc: dict[int, dict[str, Any]] = {}
+    # Akkumulierte Tool-Calls für Streaming (OpenAI streamt sie in Teilen): parallele Listen pro Slot,
+    # Argument-Fragmente werden gesammelt und erst bei [DONE] einmal gejoint (kein O(n²) via +=).
+    _tc_slot: dict[int, int] = {}  # tool_call index → Slot in den Listen
+    _tc_ids: list[str] = []
+    _tc_names: list[str] = []
+    _tc_args: list[list[str]] = []
     # Usage/Timings aus Stream-Chunks sammeln (llama.cpp, OpenAI, vLLM)
     _usage: dict[str, Any] | None = None
     _timings: dict[str, Any] | None = None
 
-    with httpx.stream("POST", url, headers=headers, json=body, timeout=timeout) as resp:
+    payload, extra_headers = _request_payload(body, messages, gzip_requests)
+    with _get_client(base_url, api_key, http2).stream(
+        "POST", "/chat/completions", content=payload, headers=extra_headers, timeout=timeout,
+    ) as resp:
         resp.raise_for_status()
-        for line in resp.iter_lines():
-            if not line or not line.startswith("data: "):
-                continue
-            data_str = line[6:]
-            if data_str.strip() == "[DONE]":
+        for data in _iter_sse_data(resp.iter_bytes()):
+            if data.strip() == b"[DONE]":
                 # Akkumulierte Tool-Calls als finalen Chunk senden
-                if _tool_calls_acc:
+                if _tc_slot:
                     tcs = []
-                    for idx in sorted(_tool_calls_acc.keys()):
-                        tc = _tool_calls_acc[idx]
-                        args_str = tc.get("arguments", "")
-                        try:
-                            args = json.loads(args_str) if args_str else {}
-                        except json.JSONDecodeError:
-                            args = {}
+                    for idx in sorted(_tc_slot):
+                        slot = _tc_slot[idx]
+                        args_str = "".join(_tc_args[slot])
                         tcs.append({
-                            "id": tc.get("id", ""),
+                            "id": _tc_ids[slot],
                             "function": {
-                                "name": tc.get("name", ""),
-                                "arguments": args,
+                                "name": _tc_names[slot],
+                                "arguments": _safe_json_loads(args_str) if args_str else {},
                             },
                         })
                     yield {"message": {"tool_calls": tcs}, "done": False}
@@ -565,46 +764,65 @@ def api_chat_stream(
                     _done["timings"] = _timings
                 yield _done
                 break
+            content = _fast_sse_content(data)
+            if content is not None:
+                if content:
+                    yield {"message": {"content": content}, "done": False}
+                continue
             try:
-                event = json.loads(data_str)
+                event = _json_loads(data)
             except json.JSONDecodeError:
                 continue
 
             # Usage/Timings aus jedem Chunk sammeln — OpenAI/vLLM senden usage
             # im finalen Chunk (choices=[]), llama.cpp sendet zusätzlich timings
-            if event.get("usage"):
-                _usage = event["usage"]
-            if event.get("timings"):
-                _timings = event["timings"]
-
-            choices = event.get("choices") or []
+            ev_get = event.get
+            usage = ev_get("usage")
+            if usage:
+                _usage = usage
+            timings = ev_get("timings")
+            if timings:
+                _timings = timings
+
+            choices = ev_get("choices")
             if not choices:
                 continue
-            delta = choices[0].get("delta") or {}
+            delta = choices[0].get("delta")
+            if not delta:
+                continue
 
             # Content
-            if delta.get("content"):
-                yield {"message": {"content": delta["content"]}, "done": False}
+            content = delta.get("content")
+            if content:
+                yield {"message": {"content": content}, "done": False}
 
             # Reasoning Content (o1/o3/o4-mini)
-            if delta.get("reasoning_content"):
-                yield {"message": {"thinking": delta["reasoning_content"]}, "done": False}
+            reasoning = delta.get("reasoning_content")
+            if reasoning:
+                yield {"message": {"thinking": reasoning}, "done": False}
 
             # Tool-Calls (gestreamt in Teilen)
-            for tc in delta.get("tool_calls") or []:
+            tool_calls = delta.get("tool_calls")
+            if not tool_calls:
+                continue
+            for tc in tool_calls:
                 idx = tc.get("index", 0)
-                if idx not in _tool_calls_acc:
-                    _tool_calls_acc[idx] = {"id": "", "name": "", "arguments": ""}
+                slot = _tc_slot.get(idx)
+                if slot is None:
+                    slot = _tc_slot[idx] = len(_tc_ids)
+                    _tc_ids.append("")
+                    _tc_names.append("")
+                    _tc_args.append([])
                 if tc.get("id"):
-                    _tool_calls_acc[idx]["id"] = tc["id"]
+                    _tc_ids[slot] = tc["id"]
                 fn = tc.get("function") or {}
                 if fn.get("name"):
-                    _tool_calls_acc[idx]["name"] = fn["name"]
+                    _tc_names[slot] = fn["name"]
                 if fn.get("arguments"):
-                    _tool_calls_acc[idx]["arguments"] += fn["arguments"]
+                    _tc_args[slot].append(fn["arguments"])
 
             # Kein frühes done bei finish_reason — immer auf [DONE] warten.
-            # Grund: Tool-Calls werden in _tool_calls_acc akkumuliert und erst
+            # Grund: Tool-Calls werden in _tc_* akkumuliert und erst
             # beim [DONE]-Sentinel geliefert. Ein früher Ausstieg bei finish_reason
             # würde sie verlieren (race condition bei vLLM mit tool-call-parser).
 
@@ -680,6 +898,7 @@ def api_generate_image(
     scheduler: str | None = None,
     seed: int | None = None,
     negative_prompt: str | None = None,
+    http2: bool = False,
 ) -> dict[str, Any]:
     """
     OpenAI Image Generation – POST /v1/images/generations.
@@ -689,7 +908,6 @@ def api_generate_image(
     Für DALL-E: nur size/quality/response_format (OpenAI-Standard).
     """
     # api_key ist optional für OpenAI-kompatible APIs (z.B. LocalAI, llama.cpp)
-    url = _api_url(base_url, "/images/generations")
     is_openai = OPENAI_API_URL in base_url
 
     # Für lokale Backends: Parameter als <sd_cpp_extra_args> in Prompt einbetten,
@@ -763,13 +981,14 @@ def api_generate_image(
         }
 
     try:
-        r = httpx.post(url, headers=_api_headers(api_key), json=body, timeout=timeout)
+        client = _get_client(base_url, api_key, http2)
+        r = client.post("/images/generations", content=_json_dumps(body), timeout=timeout)
         if r.status_code == 422 and not is_openai:
             # Backend rejected response_format — retry without it
             body.pop("response_format", None)
-            r = httpx.post(url, headers=_api_headers(api_key), json=body, timeout=timeout)
+            r = client.post("/images/generations", content=_json_dumps(body), timeout=timeout)
         r.raise_for_status()
-        return _parse(r.json())
+        return _parse(_json_loads(r.content))
     except httpx.HTTPStatusError as e:
         detail = ""
         try:
@@ -896,11 +1115,12 @@ def api_edit_image(
         _hdrs = {}
         if api_key:
             _hdrs["Authorization"] = f"Bearer {api_key}"
-        _log.info("api_edit_image POST %s | form-keys=%s | prompt-tail=%r",
-                  url, sorted(_form.keys()), _prompt[-120:] if len(_prompt) > 120 else _prompt)
+        if _log.isEnabledFor(logging.INFO):
+            _log.info("api_edit_image POST %s | form-keys=%s | prompt-tail=%r",
+                      url, sorted(_form.keys()), _prompt[-120:] if len(_prompt) > 120 else _prompt)
         r = httpx.post(url, headers=_hdrs, data=_form, files=_files, timeout=timeout)
         r.raise_for_status()
-        return _parse(r.json())
+        return _parse(_json_loads(r.content))
 
     def _try_a1111_img2img() -> dict[str, Any]:
         """A1111-kompatibel: POST /sdapi/v1/img2img mit JSON body.
@@ -929,7 +1149,7 @@ def api_edit_image(
                 _body["mask"] = _b64.b64encode(_mp.read_bytes()).decode("utf-8")
         r = httpx.post(_url, headers=_api_headers(api_key), json=_body, timeout=timeout)
         r.raise_for_status()
-        _resp = r.json()
+        _resp = _json_loads(r.content)
         _imgs = _resp.get("images") or []
         return {"b64_json": _imgs[0] if _imgs else "", "url": "", "revised_prompt": "", "mime_type": "image/png"}
 
@@ -963,6 +1183,7 @@ def api_edit_image(
 # Capability Checks
 # ═══════════════════════════════════════════════════════════════════════════
 
+@functools.lru_cache(maxsize=256)
 def model_supports_vision(model: str) -> bool:
     """Die meisten GPT-4-Modelle unterstützen Vision."""
     n = (model or "").lower()
@@ -973,6 +1194,7 @@ def model_supports_vision(model: str) -> bool:
     return False
 
 
+@functools.lru_cache(maxsize=256)
 def model_supports_tools(model: str) -> bool:
     """Die meisten OpenAI-Modelle unterstützen Function Calling."""
     n = (model or "").lower()
@@ -982,12 +1204,14 @@ def model_supports_tools(model: str) -> bool:
     return True
 
 
+@functools.lru_cache(maxsize=256)
 def model_supports_thinking(model: str) -> bool:
     """o1, o3, o4-mini unterstützen Reasoning."""
     n = (model or "").lower()
     return any(x in n for x in ("o1", "o3", "o4"))
 
 
+@functools.lru_cache(maxsize=256)
 def model_supports_image_generation(model: str) -> bool:
     """DALL-E und chatgpt-image Modelle unterstützen Image Generation."""
     n = (model or "").lower()
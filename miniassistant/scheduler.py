@@ -1,6 +1,6 @@
 """
 Scheduler: Jobs zu festen Zeiten (Cron) oder einmalig ("in N Minuten").
-Nutzt APScheduler; Jobs werden in schedules.json persistiert und beim Start geladen.
+Nutzt APScheduler; Jobs werden im Journal schedules.jsonl persistiert und beim Start geladen.
 
 Zwei Job-Typen:
   - command: Shell-Befehl ausfuehren
@@ -8,14 +8,19 @@ Zwei Job-Typen:
 """
 from __future__ import annotations
 
+import functools
 import json
 import logging
+import os
 import re
+import tempfile
+import threading
 import uuid
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
+from miniassistant._json import dumps as _json_dumps, loads as _json_loads
 from miniassistant.config import get_config_dir, load_config
 
 logger = logging.getLogger(__name__)
@@ -63,6 +68,11 @@ def autonomy_prefix(label: str) -> str:
 
 
 def _schedules_path() -> Path:
+    return Path(get_config_dir()) / "schedules.jsonl"
+
+
+def _legacy_schedules_path() -> Path:
+    """Altes Format (komplette Liste als JSON) — wird beim ersten Laden ins Journal migriert."""
     return Path(get_config_dir()) / "schedules.json"
 
 
@@ -77,11 +87,15 @@ def _run_scheduled_job(job_id: str, job_data: str) -> None:
 
     command = data.get("command", "").strip()
     prompt = data.get("prompt", "").strip()
-    client = data.get("client")
-    once = data.get("once", False)
-    model = data.get("model")  # Optional: spezifisches Modell (Name oder Alias)
-    room_id = data.get("room_id")  # Optional: direkt in diesen Matrix-Raum
-    channel_id = data.get("channel_id")  # Optional: direkt in diesen Discord-Channel
+
+    # Wie früher max_instances=1 für den ganzen Lauf: solange der übergebene Prompt-Teil des letzten
+    # Laufs noch wartet/läuft, diesen Tick komplett auslassen (Befehl nicht erneut ausführen)
+    if command and prompt:
+        with _PROMPTS_ACTIVE_LOCK:
+            busy = job_id in _PROMPTS_ACTIVE
+        if busy:
+            logger.warning("Job %s übersprungen — Prompt des vorherigen Laufs läuft noch", job_id[:8])
+            return
 
     # Shell-Befehl ausfuehren (falls gesetzt)
     cmd_output = ""
@@ -96,6 +110,63 @@ def _run_scheduled_job(job_id: str, job_data: str) -> None:
             cmd_output = f"Fehler: {e}"
             logger.exception("Job %s exec fehlgeschlagen", job_id[:8])
 
+    # Befehl + Prompt: der Prompt-Teil (LLM-Aufruf, ggf. minutenlang) gehört nicht in den kleinen
+    # Shell-Pool — er wird als Einmal-Job an den default-Pool übergeben, der auch Buchhaltung/once erledigt.
+    if command and prompt and _handoff_prompt(job_id, job_data, cmd_output):
+        return
+    _run_job_prompt(job_id, data, cmd_output)
+
+
+def _run_scheduled_prompt(job_id: str, job_data: str, cmd_output: str) -> None:
+    """Prompt-Teil eines Jobs mit Befehl + Prompt (läuft im default-Pool, siehe _handoff_prompt)."""
+    try:
+        data = json.loads(job_data)
+    except Exception:
+        logger.error("Job %s ungueltiges JSON", job_id[:8])
+        data = None
+    try:
+        if data is not None:
+            _run_job_prompt(job_id, data, cmd_output)
+    finally:
+        with _PROMPTS_ACTIVE_LOCK:
+            _PROMPTS_ACTIVE.discard(job_id)
+
+
+# Jobs, deren Prompt-Teil übergeben wurde und noch nicht fertig ist (wartend oder laufend)
+_PROMPTS_ACTIVE: set[str] = set()
+_PROMPTS_ACTIVE_LOCK = threading.Lock()
+
+
+def _handoff_prompt(job_id: str, job_data: str, cmd_output: str) -> bool:
+    """Plant den Prompt-Teil sofort im default-Executor ein. False → Aufrufer führt ihn selbst aus."""
+    sched = get_scheduler()
+    if sched is None or not sched.running:
+        return False
+    with _PROMPTS_ACTIVE_LOCK:
+        _PROMPTS_ACTIVE.add(job_id)
+    try:
+        sched.add_job(
+            _PROMPT_FUNC_REF, id=f"{job_id}:prompt", args=[job_id, job_data, cmd_output],
+            replace_existing=True, executor="default", **_JOB_OPTIONS,
+        )
+        return True
+    except Exception:
+        with _PROMPTS_ACTIVE_LOCK:
+            _PROMPTS_ACTIVE.discard(job_id)
+        logger.exception("Job %s Prompt-Übergabe fehlgeschlagen — führe direkt aus", job_id[:8])
+        return False
+
+
+def _run_job_prompt(job_id: str, data: dict[str, Any], cmd_output: str) -> None:
+    """Prompt ausführen bzw. Befehlsausgabe senden, danach last_fired setzen / once-Job entfernen."""
+    command = data.get("command", "").strip()
+    prompt = data.get("prompt", "").strip()
+    client = data.get("client")
+    once = data.get("once", False)
+    model = data.get("model")  # Optional: spezifisches Modell (Name oder Alias)
+    room_id = data.get("room_id")  # Optional: direkt in diesen Matrix-Raum
+    channel_id = data.get("channel_id")  # Optional: direkt in diesen Discord-Channel
+
     # Prompt ausfuehren (Bot aufwecken)
     if prompt:
         try:
@@ -132,24 +203,24 @@ def _run_scheduled_job(job_id: str, job_data: str) -> None:
 
 def _set_last_fired(job_id: str, ts: str) -> None:
     """Setzt last_fired für einen Job. No-op wenn Job nicht gefunden."""
-    jobs = _load_jobs()
-    for j in jobs:
-        if j.get("id") == job_id:
-            j["last_fired"] = ts
-            try:
-                _save_jobs(jobs)
-            except Exception:
-                pass
-            return
+    job = _get_job(job_id)
+    if job is None:
+        return
+    job["last_fired"] = ts
+    try:
+        _append_job(job)
+    except Exception:
+        pass
 
 
 def _remove_job_by_id(job_id: str) -> None:
-    """Entfernt einen Job aus schedules.json und dem Scheduler. Räumt Watch-State-Dateien auf."""
-    jobs = _load_jobs()
-    remaining = [j for j in jobs if j.get("id") != job_id]
-    if len(remaining) < len(jobs):
-        _save_jobs(remaining)
-        logger.info("Job %s entfernt", job_id[:8])
+    """Entfernt einen Job aus schedules.jsonl und dem Scheduler. Räumt Watch-State-Dateien auf."""
+    if _get_job(job_id) is not None:
+        try:
+            _append_tombstone(job_id)
+            logger.info("Job %s entfernt", job_id[:8])
+        except _MigrationPending as e:
+            logger.warning("Job %s: %s", job_id[:8], e)
     sched = get_scheduler()
     if sched:
         try:
@@ -230,13 +301,18 @@ def _send_to_client(message: str, client: str | None, room_id: str | None = None
         logger.exception("Job notify fehlgeschlagen")
 
 
+# "in N minutes" / "in 1 hour" — einmal kompiliert statt pro _parse_when-Aufruf
+_WHEN_RE = re.compile(r"in\s+(\d+)\s*(minute|hour)s?\s*$", re.IGNORECASE)
+
+
 def _parse_when(when: str) -> tuple[str, Any] | None:
     """
     when: Cron (5 Felder, z.B. "0 9 * * *") oder "in N minutes" / "in 1 hour".
     Returns (trigger_type, trigger_args) oder None bei Fehler.
+    Nicht cachebar: relative Angaben hängen von der aktuellen Uhrzeit ab.
     """
     when = (when or "").strip()
-    m = re.match(r"in\s+(\d+)\s*(minute|hour)s?\s*$", when, re.IGNORECASE)
+    m = _WHEN_RE.match(when)
     if m:
         n = int(m.group(1))
         unit = m.group(2).lower()
@@ -251,36 +327,223 @@ def _parse_when(when: str) -> tuple[str, Any] | None:
     return None
 
 
+_SHELL_EXECUTOR = "shell"
+
+
 def get_scheduler():
     """Lazy-Init des BackgroundSchedulers (UTC)."""
     global _scheduler
     if _scheduler is not None:
         return _scheduler
     try:
+        from apscheduler.executors.pool import ThreadPoolExecutor
         from apscheduler.schedulers.background import BackgroundScheduler
     except ImportError:
         logger.warning("apscheduler nicht installiert. pip install apscheduler")
         return None
-    _scheduler = BackgroundScheduler()
+    # Shell-Befehle laufen in einem eigenen Pool: blockierende run_exec-Aufrufe (bis 60s) belegen so
+    # keine Threads der Prompt-Jobs. default bleibt beim APScheduler-Default (10 Threads); Prompt-Teile
+    # von Befehl+Prompt-Jobs landen ebenfalls dort (_handoff_prompt).
+    _scheduler = BackgroundScheduler(executors={
+        "default": ThreadPoolExecutor(),
+        _SHELL_EXECUTOR: ThreadPoolExecutor(8),
+    })
     return _scheduler
 
 
-def _load_jobs() -> list[dict[str, Any]]:
+# Journal: eine JSON-Zeile pro Änderung — Job-Eintrag (Upsert per id) oder Tombstone {"_del": id}.
+# Mutationen hängen nur eine Zeile an statt die ganze Datei neu zu schreiben; kompaktiert wird erst,
+# wenn das Journal mehr als doppelt so viele Zeilen wie lebende Jobs hat. Kein fsync (best effort).
+_JOURNAL_LOCK = threading.Lock()
+_COMPACT_MIN_LINES = 32
+
+# RAM-Index {id: job} des gefalteten Journals, veröffentlicht als ein Tupel (Datei-Stempel, Index)
+# mit Stempel = (path, mtime_ns, size, inode). Copy-on-write: Schreiber bauen unter _JOURNAL_LOCK
+# einen neuen dict und tauschen die Referenz aus; Leser nehmen die Referenz ohne Lock und dürfen
+# den dict nicht verändern. Ändert jemand die Datei von außen, passt der Stempel nicht → Neuladen.
+_JOBS_SNAP: tuple[tuple[str, int, int, int] | None, dict[str, dict[str, Any]]] = (None, {})
+_JOURNAL_LINES = 0  # nur unter _JOURNAL_LOCK
+
+
+def _read_journal() -> tuple[dict[str, dict[str, Any]], int]:
+    """Faltet das Journal zu {id: job}; zweiter Wert = Anzahl gültiger Zeilen."""
     path = _schedules_path()
     if not path.exists():
-        return []
+        legacy = _legacy_schedules_path()
+        if not legacy.exists():
+            return {}, 0
+        if not _migrate_legacy(legacy):
+            # Migration fehlgeschlagen: weiter aus der Altdatei lesen; _append_record verweigert Schreiben,
+            # damit kein neues Journal die Alt-Jobs verdeckt. Nächster Zugriff versucht die Migration erneut.
+            try:
+                return {j["id"]: j for j in _load_legacy(legacy)}, 0
+            except Exception:
+                return {}, 0
+    jobs: dict[str, dict[str, Any]] = {}
+    lines = 0
+    try:
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    rec = _json_loads(line)
+                except ValueError:
+                    continue  # abgebrochene letzte Zeile (Absturz beim Anhängen)
+                if not isinstance(rec, dict):
+                    continue
+                lines += 1
+                if "_del" in rec:
+                    jobs.pop(rec["_del"], None)
+                elif rec.get("id"):
+                    jobs[rec["id"]] = rec
+    except OSError:
+        return {}, 0
+    return jobs, lines
+
+
+class _MigrationPending(RuntimeError):
+    """schedules.json existiert noch, konnte aber nicht nach schedules.jsonl migriert werden."""
+
+
+def _load_legacy(legacy: Path) -> list[dict[str, Any]]:
+    """Jobs aus der alten schedules.json (Liste). Wirft bei unlesbarer/ungültiger Datei."""
+    with open(legacy, "r", encoding="utf-8") as f:
+        jobs = json.load(f)
+    if not isinstance(jobs, list):
+        raise ValueError("schedules.json enthält keine Liste")
+    return [j for j in jobs if isinstance(j, dict) and j.get("id")]
+
+
+def _migrate_legacy(legacy: Path) -> bool:
+    """schedules.json (Liste) → schedules.jsonl; alte Datei bleibt als schedules.json.bak liegen.
+    Returns False wenn die Migration fehlgeschlagen ist (Altdatei bleibt unverändert)."""
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        valid = _load_legacy(legacy)
+        _write_journal(valid)
+        os.replace(legacy, legacy.with_name(legacy.name + ".bak"))
+        logger.info("schedules.json nach schedules.jsonl migriert (%d Jobs)", len(valid))
+        return True
     except Exception:
-        return []
+        logger.exception("Migration von schedules.json fehlgeschlagen")
+        return False
 
 
-def _save_jobs(jobs: list[dict[str, Any]]) -> None:
+def _write_journal(jobs: list[dict[str, Any]]) -> None:
+    """Schreibt das Journal kompakt neu (eine Zeile pro Job), atomar via os.replace."""
     path = _schedules_path()
     path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(jobs, f, ensure_ascii=False, indent=0)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".schedules_tmp_", suffix=".jsonl")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"".join(_json_dumps(job) + b"\n" for job in jobs))
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _journal_stamp(path: Path) -> tuple[str, int, int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (str(path), st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _jobs_snapshot() -> dict[str, dict[str, Any]]:
+    """Aktueller Job-Index (nur lesen!) — ohne Lock, solange das Journal unverändert ist."""
+    stamp, jobs = _JOBS_SNAP
+    if stamp is not None and stamp == _journal_stamp(_schedules_path()):
+        return jobs
+    with _JOURNAL_LOCK:
+        return _jobs_locked()
+
+
+def _jobs_locked() -> dict[str, dict[str, Any]]:
+    """RAM-Index der Jobs; liest/kompaktiert das Journal nur wenn es sich geändert hat. Aufrufer hält _JOURNAL_LOCK."""
+    global _JOBS_SNAP, _JOURNAL_LINES
+    path = _schedules_path()
+    stamp = _journal_stamp(path)
+    if stamp is not None and stamp == _JOBS_SNAP[0]:
+        return _JOBS_SNAP[1]
+    jobs, _JOURNAL_LINES = _read_journal()  # migriert ggf. schedules.json
+    _maybe_compact_locked(jobs)
+    _JOBS_SNAP = (_journal_stamp(path), jobs)
+    return jobs
+
+
+def _maybe_compact_locked(jobs: dict[str, dict[str, Any]]) -> None:
+    """Journal neu schreiben, wenn es mehr als doppelt so viele Zeilen wie lebende Jobs hat."""
+    global _JOURNAL_LINES
+    if _JOURNAL_LINES <= _COMPACT_MIN_LINES or _JOURNAL_LINES <= 2 * len(jobs):
+        return
+    try:
+        _write_journal(list(jobs.values()))
+        _JOURNAL_LINES = len(jobs)
+    except Exception:
+        logger.exception("Kompaktieren von schedules.jsonl fehlgeschlagen")
+
+
+def _append_record(rec: dict[str, Any]) -> None:
+    global _JOBS_SNAP, _JOURNAL_LINES
+    path = _schedules_path()
+    line = _json_dumps(rec) + b"\n"
+    with _JOURNAL_LOCK:
+        jobs = dict(_jobs_locked())  # copy-on-write: Leser behalten ihren alten Index
+        if not path.exists() and _legacy_schedules_path().exists():
+            raise _MigrationPending(
+                "schedules.json konnte nicht nach schedules.jsonl migriert werden — Änderung nicht gespeichert (siehe Log)"
+            )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a+b") as f:
+            # Abgebrochene letzte Zeile (Absturz beim Anhängen) erst abschließen — sonst klebt der neue
+            # Eintrag daran und wird beim nächsten Laden mit ihr verworfen
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+            f.write(line)
+        if "_del" in rec:
+            jobs.pop(rec["_del"], None)
+        else:
+            jobs[rec["id"]] = dict(rec)
+        _JOURNAL_LINES += 1
+        _maybe_compact_locked(jobs)
+        _JOBS_SNAP = (_journal_stamp(path), jobs)
+
+
+def _append_job(entry: dict[str, Any]) -> None:
+    """Job anlegen oder ersetzen (gleiche id)."""
+    _append_record(entry)
+
+
+def _append_tombstone(job_id: str) -> None:
+    """Job als gelöscht markieren."""
+    _append_record({"_del": job_id})
+
+
+def _load_jobs() -> list[dict[str, Any]]:
+    """Alle Jobs als Kopien (Aufrufer dürfen sie verändern, ohne den RAM-Index zu berühren)."""
+    return [dict(j) for j in _jobs_snapshot().values()]
+
+
+def _get_job(job_id: str) -> dict[str, Any] | None:
+    """Einzelner Job per exakter id (Kopie) oder None — O(1) über den RAM-Index."""
+    job = _jobs_snapshot().get(job_id)
+    return dict(job) if job is not None else None
+
+
+def _save_jobs(jobs: list[dict[str, Any]]) -> None:
+    """Ersetzt den kompletten Job-Bestand (kompaktes Journal)."""
+    global _JOBS_SNAP, _JOURNAL_LINES
+    with _JOURNAL_LOCK:
+        _write_journal(jobs)
+        _JOURNAL_LINES = len(jobs)
+        _JOBS_SNAP = (_journal_stamp(_schedules_path()), {j["id"]: dict(j) for j in jobs if j.get("id")})
 
 
 def add_scheduled_job(
@@ -343,7 +606,6 @@ def add_scheduled_job(
         job_data_dict["channel_id"] = channel_id
     job_data_json = json.dumps(job_data_dict, ensure_ascii=False)
 
-    jobs = _load_jobs()
     job_entry: dict[str, Any] = {
         "id": job_id,
         "trigger": trigger_type,
@@ -369,13 +631,17 @@ def add_scheduled_job(
         job_entry["room_id"] = room_id
     if channel_id:
         job_entry["channel_id"] = channel_id
-    jobs.append(job_entry)
-    _save_jobs(jobs)
+    # Serialisierte Job-Daten mitspeichern → Startup reicht sie nur noch durch
+    job_entry["job_data"] = job_data_json
+    try:
+        _append_job(job_entry)
+    except _MigrationPending as e:
+        return False, str(e)
 
     try:
-        _add_to_scheduler(sched, job_id, trigger_type, trigger_args, job_data_json)
+        _add_to_scheduler(sched, job_id, trigger_type, trigger_args, job_data_json, command=bool(command))
     except Exception as e:
-        _save_jobs([j for j in jobs if j["id"] != job_id])
+        _append_tombstone(job_id)
         return False, str(e)
 
     desc = []
@@ -392,8 +658,47 @@ def add_scheduled_job(
     return True, f"{job_id[:8]} ({', '.join(desc)})"
 
 
-def _add_to_scheduler(sched: Any, job_id: str, trigger_type: str, trigger_args: dict, job_data_json: str) -> None:
+# CronTrigger pro Feld-Kombination: Trigger sind zustandslos, gleiche Ausdrücke (z.B. "0 9 * * *")
+# teilen sich ein Objekt — Reload von N Jobs parst/validiert jeden Ausdruck nur einmal.
+# Begrenzt (LRU), da Cron-Ausdrücke frei wählbar sind; date-Trigger (einmalige Zeitpunkte) werden nie gecacht.
+_CRON_FIELDS = ("minute", "hour", "day", "month", "day_of_week")
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_cron_trigger(key: tuple[str, ...]) -> Any:
+    from apscheduler.triggers.cron import CronTrigger
+    return CronTrigger(**dict(zip(_CRON_FIELDS, key)))
+
+
+def _cron_trigger(trigger_args: dict) -> Any:
+    return _cached_cron_trigger(tuple(str(trigger_args.get(f, "*")) for f in _CRON_FIELDS))
+
+
+_JOB_DATA_KEYS = ("command", "prompt", "client", "once", "model", "room_id", "channel_id")
+
+
+def _job_data_json(job: dict[str, Any]) -> str:
+    """job_data-JSON (Args für _run_scheduled_job) aus den Feldern eines Job-Eintrags; "" wenn leer."""
+    data = {k: (True if k == "once" else job[k]) for k in _JOB_DATA_KEYS if job.get(k)}
+    return json.dumps(data, ensure_ascii=False) if data else ""
+
+
+# Textuelle Referenz statt Funktionsobjekt: Jobs bleiben serialisierbar (args sind nur id + JSON-String),
+# falls APScheduler einen persistenten Jobstore bekommt. Quelle der Wahrheit bleibt das Journal.
+_JOB_FUNC_REF = f"{__name__}:_run_scheduled_job"
+_PROMPT_FUNC_REF = f"{__name__}:_run_scheduled_prompt"
+
+
+# Nie zwei Läufe desselben Jobs parallel; nach Suspend/Resume verpasste Läufe zu einem zusammenfassen
+# und bis 5 Minuten Verspätung noch ausführen (APScheduler-Default: 1 s, danach verworfen).
+_JOB_OPTIONS: dict[str, Any] = {"max_instances": 1, "coalesce": True, "misfire_grace_time": 300}
+
+
+def _add_to_scheduler(
+    sched: Any, job_id: str, trigger_type: str, trigger_args: dict, job_data_json: str, *, command: bool = False,
+) -> None:
     job_args = [job_id, job_data_json]
+    executor = _SHELL_EXECUTOR if command else "default"
     if trigger_type == "date":
         from apscheduler.triggers.date import DateTrigger
         run_date = datetime.fromisoformat(trigger_args["run_date"].replace("Z", "+00:00"))
@@ -401,21 +706,13 @@ def _add_to_scheduler(sched: Any, job_id: str, trigger_type: str, trigger_args:
         if run_date <= now:
             raise ValueError("Zeitpunkt liegt in der Vergangenheit.")
         sched.add_job(
-            _run_scheduled_job, DateTrigger(run_date=run_date),
-            id=job_id, args=job_args, replace_existing=True,
+            _JOB_FUNC_REF, DateTrigger(run_date=run_date),
+            id=job_id, args=job_args, replace_existing=True, executor=executor, **_JOB_OPTIONS,
         )
     else:
-        from apscheduler.triggers.cron import CronTrigger
         sched.add_job(
-            _run_scheduled_job,
-            CronTrigger(
-                minute=trigger_args.get("minute", "*"),
-                hour=trigger_args.get("hour", "*"),
-                day=trigger_args.get("day", "*"),
-                month=trigger_args.get("month", "*"),
-                day_of_week=trigger_args.get("day_of_week", "*"),
-            ),
-            id=job_id, args=job_args, replace_existing=True,
+            _JOB_FUNC_REF, _cron_trigger(trigger_args),
+            id=job_id, args=job_args, replace_existing=True, executor=executor, **_JOB_OPTIONS,
         )
 
 
@@ -443,54 +740,42 @@ def start_scheduler_if_enabled() -> bool:
             except Exception:
                 expired_ids.append(jid)
                 continue
-        # Job-Daten rekonstruieren
-        job_data_dict: dict[str, Any] = {}
-        if job.get("command"):
-            job_data_dict["command"] = job["command"]
-        if job.get("prompt"):
-            job_data_dict["prompt"] = job["prompt"]
-        if job.get("client"):
-            job_data_dict["client"] = job["client"]
-        if job.get("once"):
-            job_data_dict["once"] = True
-        if job.get("model"):
-            job_data_dict["model"] = job["model"]
-        if job.get("room_id"):
-            job_data_dict["room_id"] = job["room_id"]
-        if job.get("channel_id"):
-            job_data_dict["channel_id"] = job["channel_id"]
-        if not job_data_dict:
+        # Gespeicherte Job-Daten; ältere Einträge ohne job_data aus den Feldern rekonstruieren
+        job_data_json = job.get("job_data") or _job_data_json(job)
+        if not job_data_json:
             continue
-        job_data_json = json.dumps(job_data_dict, ensure_ascii=False)
         try:
-            _add_to_scheduler(sched, jid, trigger or "cron", args, job_data_json)
+            _add_to_scheduler(sched, jid, trigger or "cron", args, job_data_json, command=bool(job.get("command")))
         except Exception:
             continue
-    # Abgelaufene Jobs aus schedules.json entfernen
+    # Abgelaufene Jobs aus schedules.jsonl entfernen (Startup: gleich kompakt neu schreiben)
     if expired_ids:
         remaining = [j for j in jobs if j.get("id") not in expired_ids]
         _save_jobs(remaining)
         logger.info("%d abgelaufene Jobs entfernt", len(expired_ids))
-    active_count = len(sched.get_jobs()) if sched.get_jobs else 0
     if not sched.running:
         sched.start()
-    active_count = len(sched.get_jobs())
-    logger.info("Gestartet mit %d aktiven Jobs", active_count)
+    logger.info("Gestartet mit %d aktiven Jobs", len(sched.get_jobs()))
     return True
 
 
 def remove_scheduled_job(job_id_prefix: str) -> tuple[bool, str]:
     """Entfernt einen Job anhand der (Teil-)ID."""
-    jobs = _load_jobs()
-    matches = [j for j in jobs if j.get("id", "").startswith(job_id_prefix)]
+    exact = _get_job(job_id_prefix) if job_id_prefix else None
+    if exact is not None:
+        matches = [exact]
+    else:
+        matches = [j for j in _load_jobs() if j.get("id", "").startswith(job_id_prefix)]
     if not matches:
         return False, "Job nicht gefunden."
     if len(matches) > 1:
         return False, f"{len(matches)} Jobs gefunden – ID genauer angeben."
     job = matches[0]
     jid = job["id"]
-    remaining = [j for j in jobs if j["id"] != jid]
-    _save_jobs(remaining)
+    try:
+        _append_tombstone(jid)
+    except _MigrationPending as e:
+        return False, str(e)
     sched = get_scheduler()
     if sched:
         try:
@@ -516,8 +801,7 @@ def update_schedule_prompt(
 ) -> tuple[bool, str]:
     """Aktualisiert Prompt, Modell, Zeitplan und/oder Ziel (Raum/Channel/Client) eines bestehenden Jobs.
     Sentinel-Default ... = Feld unverändert lassen. None = Feld löschen."""
-    jobs = _load_jobs()
-    job = next((j for j in jobs if j.get("id") == job_id), None)
+    job = _get_job(job_id)
     if not job:
         return False, f"Job {job_id[:8]} nicht gefunden"
     if new_prompt:
@@ -543,35 +827,25 @@ def update_schedule_prompt(
         new_trigger_type, new_trigger_args = parsed
         job["trigger"] = new_trigger_type
         job["trigger_args"] = new_trigger_args
-    _save_jobs(jobs)
+    job["job_data"] = _job_data_json(job)
+    try:
+        _append_job(job)
+    except _MigrationPending as e:
+        return False, str(e)
     # APScheduler-Job-Args aktualisieren damit der nächste Run den neuen Prompt hat
     sched = get_scheduler()
     if sched:
         try:
             apjob = sched.get_job(job_id)
             if apjob:
-                data: dict[str, Any] = {}
-                prompt_val = job.get("prompt")
-                if prompt_val:
-                    data["prompt"] = prompt_val
-                for key in ("command", "client", "once", "model", "room_id", "channel_id"):
-                    if job.get(key):
-                        data[key] = job[key]
-                apjob.modify(args=[job_id, json.dumps(data, ensure_ascii=False)])
+                apjob.modify(args=[job_id, job["job_data"]])
                 if new_trigger_type and new_trigger_args:
                     if new_trigger_type == "date":
                         from apscheduler.triggers.date import DateTrigger
                         run_date = datetime.fromisoformat(new_trigger_args["run_date"].replace("Z", "+00:00"))
                         apjob.reschedule(DateTrigger(run_date=run_date))
                     else:
-                        from apscheduler.triggers.cron import CronTrigger
-                        apjob.reschedule(CronTrigger(
-                            minute=new_trigger_args.get("minute", "*"),
-                            hour=new_trigger_args.get("hour", "*"),
-                            day=new_trigger_args.get("day", "*"),
-                            month=new_trigger_args.get("month", "*"),
-                            day_of_week=new_trigger_args.get("day_of_week", "*"),
-                        ))
+                        apjob.reschedule(_cron_trigger(new_trigger_args))
         except Exception as e:
             logger.warning("APScheduler job update failed: %s", e)
     return True, f"Job {job_id[:8]} aktualisiert"
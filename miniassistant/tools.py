@@ -5,11 +5,14 @@ exec führt Befehle aus; Root-Info steht im System-Prompt (KI weiß ob sudo nöt
 """
 from __future__ import annotations
 
+import atexit
+import functools
 import ipaddress
 import re
+import shlex
 import subprocess
 from html.parser import HTMLParser
-from typing import Any
+from typing import Any, Callable
 from urllib.parse import urlparse
 import logging
 import time
@@ -19,6 +22,7 @@ import threading
 import httpx
 
 from miniassistant import anubis
+from miniassistant._json import loads as _json_loads
 
 try:
     from curl_cffi import requests as _curl_requests
@@ -32,6 +36,11 @@ try:
     _BROTLI_AVAILABLE = True
 except ImportError:
     _BROTLI_AVAILABLE = False
+# selectolax (lexbor, C): optional, deutlich schneller als html.parser; Fallback = _HTMLToText
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SLParser
+except ImportError:
+    _SLParser = None  # type: ignore
 
 # Playwright: lazy check — allows installation at runtime without restart
 _sync_playwright = None  # type: ignore
@@ -204,6 +213,82 @@ class SSRFBlocked(httpx.RequestError):
 
 
 _MAX_REDIRECTS = 5
+# Obergrenze für read_url-Bodies: größere Seiten werden beim Streamen abgeschnitten statt komplett
+# in den RAM geladen und geparst. Großzügig, weil der volle Text für offset-Pagination gecacht wird.
+_READ_URL_MAX_BYTES = 5 * 1024 * 1024
+_REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# Gemeinsame Web-Clients (web_search, check_url, read_url, Redirect-Auflösung): Keep-Alive + Pool
+# statt TCP/TLS-Handshake pro Aufruf. Ein Client pro Proxy (httpx kann Proxy nur pro Client).
+# follow_redirects bleibt aus (SSRF-Check pro Hop); Cookie-Jar lehnt alles ab, damit zwischen
+# Sessions/Sites nichts hängen bleibt — wie vorher mit einem frischen Client pro Request.
+_WEB_CLIENTS: dict[str | None, httpx.Client] = {}
+_WEB_CLIENTS_LOCK = threading.Lock()
+
+
+def _web_client(proxy: str | None = None) -> httpx.Client:
+    client = _WEB_CLIENTS.get(proxy)
+    if client is None:
+        with _WEB_CLIENTS_LOCK:
+            client = _WEB_CLIENTS.get(proxy)
+            if client is None:
+                from http.cookiejar import CookieJar, DefaultCookiePolicy
+                from miniassistant.ollama_client import h2_available
+                kwargs: dict[str, Any] = {
+                    "timeout": 15.0,
+                    "follow_redirects": False,
+                    "http2": h2_available(),
+                    "cookies": CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+                    "limits": httpx.Limits(max_connections=32, max_keepalive_connections=16),
+                }
+                if proxy:
+                    kwargs["proxy"] = proxy
+                client = httpx.Client(**kwargs)
+                _WEB_CLIENTS[proxy] = client
+    return client
+
+
+def _close_web_clients() -> None:
+    with _WEB_CLIENTS_LOCK:
+        for client in _WEB_CLIENTS.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+        _WEB_CLIENTS.clear()
+
+
+atexit.register(_close_web_clients)
+
+
+def _is_text_content_type(content_type: str) -> bool:
+    """Content-Types, die read_url als Text verarbeiten kann (HTML, JSON, text/*)."""
+    return "html" in content_type or "json" in content_type or content_type.startswith("text/")
+
+
+def _read_capped(
+    sr: "httpx.Response",
+    max_bytes: int,
+    accept_body: Callable[[str], bool] | None = None,
+) -> "httpx.Response":
+    """Liest höchstens max_bytes (dekodierten) Body aus einer Stream-Response und gibt eine
+    gepufferte Response zurück. max_bytes=0 → nur Status + Header, Body wird nicht übertragen.
+    accept_body(content_type) False → Body wird ebenfalls verworfen (z. B. PDF/Video bei read_url)."""
+    buf = bytearray()
+    if (
+        max_bytes > 0
+        and sr.status_code not in _REDIRECT_CODES
+        and (accept_body is None or accept_body(sr.headers.get("content-type", "")))
+    ):
+        for chunk in sr.iter_bytes():
+            buf += chunk
+            if len(buf) >= max_bytes:
+                _log.info("Body von %s bei %d Bytes abgeschnitten", sr.url, max_bytes)
+                del buf[max_bytes:]
+                break
+    # Body ist bereits dekodiert → Content-Encoding/-Length dürfen nicht erneut angewendet werden
+    headers = [(k, v) for k, v in sr.headers.multi_items() if k.lower() not in ("content-encoding", "content-length")]
+    return httpx.Response(sr.status_code, headers=headers, content=bytes(buf), request=sr.request)
 
 
 def _safe_redirect_loop(
@@ -214,28 +299,32 @@ def _safe_redirect_loop(
     headers: dict[str, str] | None = None,
     proxy: str | None = None,
     max_redirects: int = _MAX_REDIRECTS,
+    max_bytes: int | None = None,
+    accept_body: Callable[[str], bool] | None = None,
 ) -> tuple[str, "httpx.Response"]:
     """Fetch with manual redirect handling — re-checks SSRF on every hop.
 
     Returns (final_url, final_response). Body fully buffered so callers can use
-    r.text / r.content / r.json() after the underlying client is closed.
+    r.text / r.content / r.json() without holding a pooled connection.
+    max_bytes: body is streamed and cut off after that many bytes (0 = headers only).
+    accept_body: with max_bytes, content-type predicate — body is only transferred if it returns True.
     Raises SSRFBlocked if any hop targets an internal/private/metadata host.
     """
     from urllib.parse import urljoin
     current = url
     visited: set[str] = set()
-    base_kwargs: dict[str, Any] = {
-        "timeout": timeout, "follow_redirects": False, "headers": headers or {},
-    }
-    if proxy:
-        base_kwargs["proxy"] = proxy
+    client = _web_client(proxy)
+    req_kwargs: dict[str, Any] = {"timeout": timeout, "headers": headers or {}}
     for _hop in range(max_redirects + 1):
         if _is_ssrf_target(current):
             raise SSRFBlocked(current)
-        with httpx.Client(**base_kwargs) as client:
-            r = client.request(method, current)
-            _ = r.content  # force body read before client closes
-        if r.status_code in (301, 302, 303, 307, 308):
+        if max_bytes is None:
+            r = client.request(method, current, **req_kwargs)
+            _ = r.content  # force body read → Verbindung zurück in den Pool
+        else:
+            with client.stream(method, current, **req_kwargs) as sr:
+                r = _read_capped(sr, max_bytes, accept_body)
+        if r.status_code in _REDIRECT_CODES:
             loc = r.headers.get("location") or ""
             if not loc:
                 return current, r
@@ -263,20 +352,16 @@ def _resolve_url_safely(
     from urllib.parse import urljoin
     current = url
     visited: set[str] = set()
-    base_kwargs: dict[str, Any] = {
-        "timeout": min(timeout, 30.0), "follow_redirects": False, "headers": headers or {},
-    }
-    if proxy:
-        base_kwargs["proxy"] = proxy
+    client = _web_client(proxy)
+    req_timeout = min(timeout, 30.0)
     for _hop in range(max_redirects + 1):
         if _is_ssrf_target(current):
             raise SSRFBlocked(current)
         try:
-            with httpx.Client(**base_kwargs) as client:
-                r = client.head(current)
-                if r.status_code == 405:
-                    # Some servers reject HEAD; tiny ranged GET as fallback
-                    r = client.get(current, headers={**(headers or {}), "Range": "bytes=0-0"})
+            r = client.head(current, headers=headers or {}, timeout=req_timeout)
+            if r.status_code == 405:
+                # Some servers reject HEAD; tiny ranged GET as fallback
+                r = client.get(current, headers={**(headers or {}), "Range": "bytes=0-0"}, timeout=req_timeout)
         except httpx.HTTPError:
             # Network error during resolve — return current; final fetch will fail naturally
             return current
@@ -337,15 +422,67 @@ _USER_AGENT = (
 
 # Fixes unmatched quotes in heredoc delimiters that LLMs commonly produce,
 # e.g.  << 'EOF  (missing closing ')  →  << 'EOF'
-_HEREDOC_BAD_QUOTE = re.compile(r"(<<-?\s*)(['\"])(\w+)\s*$", re.MULTILINE)
-
-
 def _fix_heredoc_quotes(cmd: str) -> str:
     """Close unmatched quotes on heredoc delimiters (e.g. << 'EOF → << 'EOF')."""
-    def _repl(m: re.Match) -> str:
-        prefix, quote, tag = m.group(1), m.group(2), m.group(3)
-        return f"{prefix}{quote}{tag}{quote}"
-    return _HEREDOC_BAD_QUOTE.sub(_repl, cmd)
+    if "<<" not in cmd:
+        return cmd
+    return _fix_heredoc_quotes_cached(cmd)
+
+
+# Scheduler-Jobs und Bot-Retries wiederholen dieselben Befehle → Scan nur einmal pro Befehl
+@functools.lru_cache(maxsize=512)
+def _fix_heredoc_quotes_cached(cmd: str) -> str:
+    lines = cmd.split("\n")
+    changed = False
+    for idx, line in enumerate(lines):
+        if "<<" in line:
+            fixed = _fix_heredoc_line(line)
+            if fixed is not line:
+                lines[idx] = fixed
+                changed = True
+    return "\n".join(lines) if changed else cmd
+
+
+def _fix_heredoc_line(line: str) -> str:
+    """Eine Zeile: ``<<[-] 'TAG`` am Zeilenende (nur Whitespace dahinter) → ``<<[-] 'TAG'``.
+    Nur der letzte ``<<`` der Zeile kann passen, weil danach nur noch Quote + Wortzeichen folgen."""
+    j = line.rfind("<<") + 2
+    if line.startswith("-", j):
+        j += 1
+    rest = line[j:]
+    body = rest.lstrip()
+    if len(body) < 2 or body[0] not in "'\"":
+        return line
+    tag = body[1:].rstrip()
+    if not tag.replace("_", "a").isalnum():  # \w+
+        return line
+    quote = body[0]
+    return f"{line[:j]}{rest[:len(rest) - len(body)]}{quote}{tag}{quote}"
+
+
+# Befehle ohne Shell-Syntax laufen direkt (ohne zusätzliches sh-fork). Alles mit Metazeichen,
+# Variablen-Zuweisung oder Shell-Builtin/Keyword am Anfang geht weiterhin über sh -c, damit
+# Verhalten und Fehlermeldungen identisch bleiben (echo/printf/test: Builtin ≠ /bin-Variante).
+_SHELL_META = frozenset("|&;<>$`(){}[]*?~#!\n\\\"'%")
+_SHELL_FIRST_WORDS = frozenset({
+    ".", ":", "alias", "bg", "break", "case", "cd", "command", "continue", "echo", "eval", "exec",
+    "exit", "export", "false", "fc", "fg", "for", "function", "getopts", "hash", "if", "jobs", "kill",
+    "local", "printf", "pwd", "read", "readonly", "return", "select", "set", "shift", "source", "test",
+    "time", "times", "trap", "true", "type", "ulimit", "umask", "unalias", "unset", "until", "wait", "while",
+})
+
+
+def _simple_argv(command: str) -> list[str] | None:
+    """argv für direkten Aufruf, oder None wenn der Befehl eine Shell braucht."""
+    if any(c in _SHELL_META for c in command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if not argv or argv[0] in _SHELL_FIRST_WORDS or "=" in argv[0]:
+        return None
+    return argv
 
 
 def run_exec(command: str, timeout: int = 60, cwd: str | None = None, extra_env: dict[str, str] | None = None) -> dict[str, Any]:
@@ -369,18 +506,27 @@ def run_exec(command: str, timeout: int = 60, cwd: str | None = None, extra_env:
                 env["HOME"] = pwd.getpwuid(os.getuid()).pw_dir
             except Exception:
                 env["HOME"] = "/root"
-        result = subprocess.run(
-            ["sh", "-c", command],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=cwd or None,
-            env=env,
-        )
+        run_kwargs: dict[str, Any] = {
+            "capture_output": True, "text": True, "timeout": timeout, "cwd": cwd or None, "env": env,
+        }
+        argv = _simple_argv(command)
+        try:
+            result = subprocess.run(argv or ["sh", "-c", command], **run_kwargs)
+        except OSError:
+            if argv is None:
+                raise
+            # Programm nicht gefunden/ausführbar oder Skript ohne Shebang (ENOEXEC) → über sh laufen
+            # lassen (gleiche Meldung, gleicher Exit-Code bzw. Ausführung als sh-Skript wie bisher)
+            result = subprocess.run(["sh", "-c", command], **run_kwargs)
+            argv = None
+        returncode = result.returncode
+        if argv is not None and returncode < 0:
+            # Direkt gestartet und per Signal beendet: subprocess meldet -N, sh meldete 128+N
+            returncode = 128 - returncode
         return {
             "stdout": result.stdout or "",
             "stderr": result.stderr or "",
-            "returncode": result.returncode,
+            "returncode": returncode,
         }
     except subprocess.TimeoutExpired:
         return {
@@ -399,9 +545,8 @@ def run_exec(command: str, timeout: int = 60, cwd: str | None = None, extra_env:
 def web_search(searxng_url: str, query: str, max_results: int = 5, categories: str | None = None) -> dict[str, Any]:
     """SearXNG JSON-API: ?q=...&format=json. Gibt Titel, URL, Snippet zurück.
     categories: Optional SearXNG category (e.g. 'images', 'videos', 'news')."""
-    url = searxng_url.rstrip("/")
-    if "/search" not in url and not url.endswith("/search"):
-        url = f"{url}/search"
+    base = searxng_url.rstrip("/")
+    url = base if base.endswith("/search") else f"{base}/search"
     params: dict[str, str] = {"q": query, "format": "json"}
     if categories:
         params["categories"] = categories
@@ -409,10 +554,9 @@ def web_search(searxng_url: str, query: str, max_results: int = 5, categories: s
     _ws_headers = {"User-Agent": _USER_AGENT}
     for attempt in range(_RETRY_ATTEMPTS):
         try:
-            with httpx.Client(timeout=15.0, headers=_ws_headers) as client:
-                r = client.get(url, params=params)
-                r.raise_for_status()
-                data = r.json()
+            r = _web_client().get(url, params=params, headers=_ws_headers, timeout=15.0)
+            r.raise_for_status()
+            data = _json_loads(r.content)
             break
         except (httpx.TimeoutException, httpx.RemoteProtocolError) as e:
             last_err = e
@@ -597,11 +741,20 @@ def web_search_multi(
     return {"results": [], "used_engines": used, "errors": errors}
 
 
+# check_url-Ergebnisse kurz merken: Bot/Modelle prüfen dieselbe URL oft mehrfach hintereinander.
+# Nur Antworten mit HTTP-Status werden gecacht — Netzwerkfehler sollen beim nächsten Mal neu probiert werden.
+_CHECK_URL_TTL = 60.0
+_CHECK_URL_MAX = 512
+_CHECK_URL_CACHE: dict[str, tuple[float, dict[str, Any]]] = {}
+_CHECK_URL_LOCK = threading.Lock()
+
+
 def check_url(url: str, timeout: float = 10.0) -> dict[str, Any]:
     """
     Prüft, ob eine URL erreichbar ist (HTTP/HTTPS, folgt Redirects).
     Gibt reachable (bool), status_code, final_url (nach Redirects) und ggf. error zurück.
     Kein automatisches Anhängen von www – es wird genau die übergebene URL geprüft.
+    Ergebnisse mit Status-Code werden _CHECK_URL_TTL Sekunden gecacht.
     """
     u = (url or "").strip()
     if not u:
@@ -610,11 +763,31 @@ def check_url(url: str, timeout: float = 10.0) -> dict[str, Any]:
         u = "https://" + u
     if _is_ssrf_target(u):
         return {"reachable": False, "status_code": None, "final_url": None, "error": "Access to internal/private networks is blocked"}
+    now = time.monotonic()
+    with _CHECK_URL_LOCK:
+        hit = _CHECK_URL_CACHE.get(u)
+        if hit is not None and now - hit[0] < _CHECK_URL_TTL:
+            return dict(hit[1])
+    result = _check_url_fetch(u, timeout)
+    if result.get("status_code") is not None:
+        with _CHECK_URL_LOCK:
+            if len(_CHECK_URL_CACHE) >= _CHECK_URL_MAX:
+                for k in [k for k, (ts, _) in _CHECK_URL_CACHE.items() if now - ts >= _CHECK_URL_TTL]:
+                    del _CHECK_URL_CACHE[k]
+                if len(_CHECK_URL_CACHE) >= _CHECK_URL_MAX:
+                    _CHECK_URL_CACHE.pop(next(iter(_CHECK_URL_CACHE)))
+            _CHECK_URL_CACHE[u] = (now, dict(result))
+    return result
+
+
+def _check_url_fetch(u: str, timeout: float) -> dict[str, Any]:
+    """Eigentlicher Check (mit Retries) für eine bereits normalisierte, SSRF-geprüfte URL."""
     last_err: Exception | None = None
     _cu_headers = {"User-Agent": _USER_AGENT}
     for attempt in range(_RETRY_ATTEMPTS):
         try:
-            final_url, r = _safe_redirect_loop("GET", u, timeout=timeout, headers=_cu_headers)
+            # Nur Status relevant → Body gar nicht erst übertragen
+            final_url, r = _safe_redirect_loop("GET", u, timeout=timeout, headers=_cu_headers, max_bytes=0)
             final = final_url
             if r.status_code in _RETRYABLE_STATUS_CODES and attempt < _RETRY_ATTEMPTS - 1:
                 _log.warning("check_url attempt %d/%d got HTTP %d, retrying in %ds …", attempt + 1, _RETRY_ATTEMPTS, r.status_code, _RETRY_DELAY)
@@ -682,24 +855,47 @@ class _HTMLToText(HTMLParser):
             self._parts.append(data)
 
     def get_text(self) -> str:
-        raw = "".join(self._parts)
-        # Mehrfach-Leerzeilen zusammenfassen, Zeilen trimmen
-        lines = [line.strip() for line in raw.splitlines()]
-        collapsed: list[str] = []
-        prev_empty = False
-        for line in lines:
-            if not line:
-                if not prev_empty:
-                    collapsed.append("")
-                prev_empty = True
-            else:
-                collapsed.append(line)
-                prev_empty = False
-        return "\n".join(collapsed).strip()
+        if not self._parts:
+            return ""
+        return _collapse_lines("".join(self._parts))
+
+
+def _collapse_lines(raw: str) -> str:
+    """Mehrfach-Leerzeilen zusammenfassen, Zeilen trimmen — ein Durchlauf, keine Zwischenliste."""
+    collapsed: list[str] = []
+    append = collapsed.append
+    prev_empty = False
+    for line in raw.splitlines():
+        line = line.strip()
+        if line:
+            append(line)
+            prev_empty = False
+        elif not prev_empty:
+            append("")
+            prev_empty = True
+    return "\n".join(collapsed).strip()
+
+
+# Gleiche Block-Regeln wie _HTMLToText: Zeilenumbruch vor Start- bzw. nach End-Tag
+_SL_BREAK_BEFORE = "br,p,div,h1,h2,h3,h4,h5,h6,li,tr"
+_SL_BREAK_AFTER = "p,div,h1,h2,h3,h4,h5,h6,table"
 
 
 def _html_to_text(html: str) -> str:
-    """Konvertiert HTML zu lesbarem Text (ohne externe Libs)."""
+    """Konvertiert HTML zu lesbarem Text (selectolax wenn installiert, sonst html.parser)."""
+    if _SLParser is not None:
+        try:
+            tree = _SLParser(html)
+            tree.strip_tags(["script", "style", "noscript", "svg"])
+            for node in tree.css(_SL_BREAK_BEFORE):
+                node.insert_before("\n")
+            for node in tree.css(_SL_BREAK_AFTER):
+                node.insert_after("\n")
+            # <head> (title, meta) ignorieren wie _HTMLToText
+            root = tree.body if tree.body is not None else tree.root
+            return _collapse_lines(root.text(separator="") if root is not None else "")
+        except Exception as e:
+            _log.debug("selectolax failed, falling back to html.parser: %s", e)
     parser = _HTMLToText()
     parser.feed(html)
     return parser.get_text()
@@ -928,15 +1124,26 @@ def read_url(url: str, max_chars: int | None = 8000, timeout: float = 15.0, conf
             try:
                 _final_url, r = _safe_redirect_loop(
                     "GET", u, timeout=timeout, headers=headers, proxy=proxy_url,
+                    max_bytes=_READ_URL_MAX_BYTES, accept_body=_is_text_content_type,
                 )
                 r.raise_for_status()
                 content_type = r.headers.get("content-type", "")
+                if not _is_text_content_type(content_type):
+                    # Body wurde gar nicht erst übertragen (accept_body)
+                    return {
+                        "ok": False,
+                        "content": "",
+                        "error": f"Unsupported content-type: {content_type}",
+                        "connection": connection_name,
+                    }
+                # Einmal dekodieren; JSON/Text gehen unverändert raus, nur HTML durch den Parser
+                body = r.text
                 if "html" in content_type:
                     # Anubis-PoW-Challenge (kommt als HTTP 200 mit JS-Challenge-Seite)
                     # automatisch lösen, statt die Challenge-Seite als Inhalt zu liefern.
-                    if anubis.looks_like_anubis(r.text):
+                    if anubis.looks_like_anubis(body):
                         solved = anubis.solve_and_fetch(
-                            u, r.text, headers=headers, timeout=max(timeout, 30.0), proxy=proxy_url,
+                            u, body, headers=headers, timeout=max(timeout, 30.0), proxy=proxy_url,
                         )
                         if solved is not None:
                             _log.info("read_url: Anubis-Challenge gelöst für %s", u)
@@ -944,18 +1151,9 @@ def read_url(url: str, max_chars: int | None = 8000, timeout: float = 15.0, conf
                             return {"ok": True, "content": fallback_note + _cache_and_trim(text),
                                     "connection": connection_name, "anubis_solved": True}
                         _log.warning("read_url: Anubis-Challenge erkannt, aber nicht lösbar für %s", u)
-                    text = _html_to_text(r.text)
-                elif "json" in content_type:
-                    text = r.text
-                elif content_type.startswith("text/"):
-                    text = r.text
+                    text = _html_to_text(body)
                 else:
-                    return {
-                        "ok": False,
-                        "content": "",
-                        "error": f"Unsupported content-type: {content_type}",
-                        "connection": connection_name,
-                    }
+                    text = body
                 return {"ok": True, "content": fallback_note + _cache_and_trim(text), "connection": connection_name}
             except SSRFBlocked as e:
                 return {"ok": False, "content": "", "error": str(e), "connection": connection_name}
@@ -1009,6 +1207,35 @@ def read_url(url: str, max_chars: int | None = 8000, timeout: float = 15.0, conf
                 _log.debug("read_url: finish_fetch failed for %s: %s", u, _fe)
 
 
+def read_urls(
+    urls: list[str | dict[str, Any]],
+    max_chars: int | None = 8000,
+    concurrency: int = 8,
+    **kwargs: Any,
+) -> list[dict[str, Any]]:
+    """Mehrere URLs parallel lesen (max. `concurrency` gleichzeitig); Ergebnisse in Eingabe-Reihenfolge.
+    Eintrag = URL-String oder dict mit read_url-Argumenten pro URL (url, max_chars, proxy, js, …);
+    kwargs gelten für alle (z. B. config). Threads statt asyncio: read_url nutzt sync-Fallbacks
+    (curl_cffi, Playwright) und teilt ohnehin den Connection-Pool (_web_client)."""
+    calls = [
+        {"max_chars": max_chars, **kwargs, **item} if isinstance(item, dict)
+        else {"url": item, "max_chars": max_chars, **kwargs}
+        for item in urls
+    ]
+
+    def _one(call: dict[str, Any]) -> dict[str, Any]:
+        try:
+            return read_url(**call)
+        except Exception as e:
+            return {"ok": False, "content": "", "error": str(e)}
+
+    if len(calls) <= 1:
+        return [_one(c) for c in calls]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(calls)))) as ex:
+        return list(ex.map(_one, calls))
+
+
 # ---------------------------------------------------------------------------
 # download_file – Binaer-Download mit Safari-UA + Quirks. Fuer Bilder/PDFs/etc.
 # ---------------------------------------------------------------------------
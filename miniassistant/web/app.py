@@ -2808,19 +2808,11 @@ async def api_schedule_run(request: Request, job_id: str):
     """Führt einen Schedule-Job sofort aus (fire-and-forget). Token erforderlich."""
     _require_token(request)
     try:
-        import json as _json
-        from miniassistant.scheduler import list_scheduled_jobs, _run_scheduled_job
-        jobs = list_scheduled_jobs()
-        job = next((j for j in jobs if j.get("id") == job_id), None)
+        from miniassistant.scheduler import _get_job, _job_data_json, _run_scheduled_job
+        job = _get_job(job_id)
         if not job:
             raise HTTPException(status_code=404, detail="Job nicht gefunden")
-        job_data: dict = {}
-        for key in ("command", "prompt", "client", "model", "room_id", "channel_id"):
-            if job.get(key):
-                job_data[key] = job[key]
-        if job.get("once"):
-            job_data["once"] = True
-        job_data_json = _json.dumps(job_data, ensure_ascii=False)
+        job_data_json = job.get("job_data") or _job_data_json(job) or "{}"
         loop = asyncio.get_event_loop()
         loop.run_in_executor(_chat_executor, _run_scheduled_job, job_id, job_data_json)
         return JSONResponse({"ok": True, "message": f"Job {job_id[:8]} gestartet"})